@@ -0,0 +1,120 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import false
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.counters import increment
+
+# Commandes rattrapées par lot (taille des listes IN)
+BACKFILL_CHUNK_SIZE = 1000
+
+# Jour d'une commande dans les agrégats (date UTC)
+def sales_day(created_at: datetime) -> date:
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+def rollup_orders(
+    db: Session,
+    orders: Sequence[Tuple[int, date, float]],
+    lines: Sequence[Tuple[int, int, int, float]],
+) -> None:
+    """
+    Ajoute des commandes aux agrégats de ventes, dans la transaction en cours.
+    `orders` : (ID, jour, montant total) ; `lines` : (ID de la commande, ID du
+    produit, quantité, prix unitaire). Le marquage `rolled_up` des commandes
+    reste à la charge de l'appelant, dans la même transaction.
+
+    Un produit de plusieurs catégories compte entièrement dans chacune.
+    """
+    shards = settings.SALES_ROLLUP_SHARDS
+    keys = {order_id: (day, order_id % shards) for order_id, day, _ in orders}
+
+    daily: Dict[Tuple[date, int], List[Any]] = defaultdict(lambda: [0, 0, 0.0])
+    for order_id, day, total_amount in orders:
+        daily[keys[order_id]][0] += 1
+        daily[keys[order_id]][2] += total_amount
+
+    by_product: Dict[Tuple[date, int, int], List[Any]] = defaultdict(lambda: [0, 0.0])
+    for order_id, product_id, quantity, unit_price in lines:
+        day, shard = keys[order_id]
+        daily[keys[order_id]][1] += quantity
+        by_product[(day, product_id, shard)][0] += quantity
+        by_product[(day, product_id, shard)][1] += quantity * unit_price
+
+    categories: Dict[int, List[int]] = defaultdict(list)
+    product_ids = sorted({product_id for _, product_id, _, _ in lines})
+    if product_ids:
+        for product_id, category_id in db.query(
+            models.ProductCategory.product_id, models.ProductCategory.category_id
+        ).filter(models.ProductCategory.product_id.in_(product_ids)):
+            categories[product_id].append(category_id)
+
+    by_category: Dict[Tuple[date, int, int], List[Any]] = defaultdict(lambda: [0, 0.0])
+    for order_id, product_id, quantity, unit_price in lines:
+        day, shard = keys[order_id]
+        for category_id in categories[product_id]:
+            by_category[(day, category_id, shard)][0] += quantity
+            by_category[(day, category_id, shard)][1] += quantity * unit_price
+
+    increment(db, models.SalesDaily.__table__, [
+        {"day": day, "shard": shard, "orders": count, "units": units, "revenue": revenue}
+        for (day, shard), (count, units, revenue) in sorted(daily.items())
+    ], ("orders", "units", "revenue"))
+    increment(db, models.SalesProductDaily.__table__, [
+        {"day": day, "product_id": product_id, "shard": shard, "units": units, "revenue": revenue}
+        for (day, product_id, shard), (units, revenue) in sorted(by_product.items())
+    ], ("units", "revenue"))
+    increment(db, models.SalesCategoryDaily.__table__, [
+        {"day": day, "category_id": category_id, "shard": shard, "units": units, "revenue": revenue}
+        for (day, category_id, shard), (units, revenue) in sorted(by_category.items())
+    ], ("units", "revenue"))
+
+def backfill_sales(db: Session, chunk_size: int = BACKFILL_CHUNK_SIZE) -> int:
+    """
+    Ajoute aux agrégats les commandes historiques non encore comptées
+    (`rolled_up` faux), par lots d'IDs croissants, un commit par lot. Peut
+    tourner pendant que des commandes arrivent : un lot est verrouillé, agrégé
+    et marqué dans une même transaction. Retourne le nombre de commandes ajoutées.
+    """
+    count, last_id = 0, 0
+    while True:
+        orders = (
+            db.query(models.Order.id, models.Order.created_at, models.Order.total_amount)
+            .filter(models.Order.id > last_id, models.Order.rolled_up == false())
+            .order_by(models.Order.id)
+            .limit(chunk_size)
+            .with_for_update()
+            .all()
+        )
+        if not orders:
+            return count
+
+        order_ids = [order.id for order in orders]
+        lines = (
+            db.query(
+                models.OrderItem.order_id,
+                models.OrderItem.product_id,
+                models.OrderItem.quantity,
+                models.OrderItem.unit_price,
+            )
+            .filter(models.OrderItem.order_id.in_(order_ids))
+            .all()
+        )
+        rollup_orders(
+            db,
+            [(order.id, sales_day(order.created_at), order.total_amount) for order in orders],
+            [tuple(line) for line in lines],
+        )
+        # updated_at inchangé : le rattrapage ne modifie pas la commande elle-même
+        db.query(models.Order).filter(models.Order.id.in_(order_ids)).update(
+            {models.Order.rolled_up: True, models.Order.updated_at: models.Order.updated_at},
+            synchronize_session=False,
+        )
+        db.commit()
+        count += len(order_ids)
+        last_id = order_ids[-1]
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+# Valeur sentinelle pour distinguer une absence d'une valeur None mise en cache
+MISSING = object()
+
+class TTLCache:
+    """
+    Cache LRU borné avec durée de vie, partagé entre les threads du processus.
+    
+    Les clés sont des tuples dont le premier élément est un espace de noms
+    ("product", "products", ...) afin de pouvoir invalider par groupe.
+    Chaque entrée est datée de la fraîcheur de ses données (`fresh_as_of`,
+    horodatage Unix) : `get(key, since=...)` écarte celles qui sont plus anciennes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # clé -> (expiration, valeur, fraîcheur des données)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrémenté à chaque invalidation pour écarter les écritures concurrentes périmées
+        self._version = 0
+
+    def get(self, key: Hashable, since: Optional[float] = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return MISSING
+            # Données antérieures à `since` : l'entrée reste pour les autres lecteurs
+            if since is not None and entry[2] < since:
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def snapshot(self) -> int:
+        """Version à relire avant une requête en base, puis à passer à `set`."""
+        return self._version
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        version: Optional[int] = None,
+        fresh_as_of: Optional[float] = None,
+    ) -> None:
+        """`fresh_as_of` : date des données (par défaut maintenant)."""
+        if self.maxsize <= 0:
+            return
+        fresh_as_of = time.time() if fresh_as_of is None else fresh_as_of
+        with self._lock:
+            # Une invalidation a eu lieu pendant la lecture : la valeur est peut-être périmée
+            if version is not None and version != self._version:
+                return
+            # Une entrée aux données plus récentes est gardée
+            entry = self._data.get(key)
+            if entry is not None and entry[2] > fresh_as_of and entry[0] >= time.monotonic():
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value, fresh_as_of)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._version += 1
+            self._data.pop(key, None)
+
+    def invalidate(self, *namespaces: str) -> None:
+        with self._lock:
+            self._version += 1
+            for key in [k for k in self._data if k[0] in namespaces]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+# Cache des lectures du catalogue (produits et catégories)
+catalog_cache = TTLCache(
+    maxsize=settings.CATALOG_CACHE_MAX_SIZE,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+)
+
+# Cache des utilisateurs authentifiés, par ID (invalidé par les routes users)
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+# Cache des tokens JWT déjà décodés et vérifiés
+token_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, tuple_, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.counters import increment
+from app.database import AsyncSessionLocal, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Fonction pour lire la quantité réservée par produit
+def held_quantities(db: Session, product_ids: Iterable[int]) -> Dict[int, int]:
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return {}
+    return dict(
+        db.query(models.StockHold.product_id, models.StockHold.held)
+        .filter(models.StockHold.product_id.in_(product_ids))
+        .all()
+    )
+
+# Fonction pour ajouter (ou retirer, quantités négatives) des réservations sans condition
+def shift_holds(db: Session, deltas: Dict[int, int]) -> None:
+    increment(db, models.StockHold.__table__, [
+        {"product_id": product_id, "held": delta}
+        for product_id, delta in sorted(deltas.items()) if delta
+    ], ("held",))
+
+def reserve_hold(db: Session, product_id: int, quantity: int, stock: int) -> bool:
+    """
+    Ajoute `quantity` à la quantité réservée du produit si elle reste couverte
+    par `stock`, en un UPDATE conditionnel de sa ligne de stock_holds : deux
+    réservations concurrentes du même produit se sérialisent sur cette ligne,
+    la seconde voyant la quantité réservée par la première. Retourne False si
+    le stock ne suffit pas.
+
+    `stock` est lu sans verrou : une commande concurrente peut le baisser
+    entre-temps. Le contrôle qui fait foi reste celui de la commande
+    (orders._reserve_stock), qui déduit les réservations ouvertes du stock.
+    """
+    def reserve() -> bool:
+        result = db.execute(
+            update(models.StockHold)
+            .where(models.StockHold.product_id == product_id)
+            .where(models.StockHold.held + quantity <= stock)
+            .values(held=models.StockHold.held + quantity)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    if reserve():
+        return True
+    # Première réservation du produit : ligne créée à 0, puis nouvel essai
+    increment(db, models.StockHold.__table__, [{"product_id": product_id, "held": 0}], ("held",))
+    return reserve()
+
+# Fonction pour vider des lignes d'un panier et libérer leurs réservations (transaction en cours)
+def release_cart_items(db: Session, user_id: int, items: Dict[int, int]) -> None:
+    if not items:
+        return
+    db.execute(
+        delete(models.CartItem)
+        .where(models.CartItem.user_id == user_id)
+        .where(models.CartItem.product_id.in_(list(items)))
+        .execution_options(synchronize_session=False)
+    )
+    shift_holds(db, {product_id: -quantity for product_id, quantity in items.items()})
+
+def release_expired_holds(db: Session, chunk_size: Optional[int] = None) -> int:
+    """
+    Supprime les lignes de panier expirées et libère leurs réservations, par
+    lots de CART_SWEEP_CHUNK_SIZE lignes, un commit par lot. Les lignes
+    verrouillées par une modification du panier en cours (ou par un autre
+    balayage) sont sautées : le balayage ne bloque jamais, plusieurs workers
+    peuvent le lancer en même temps. Retourne le nombre de lignes libérées.
+    """
+    chunk_size = chunk_size or settings.CART_SWEEP_CHUNK_SIZE
+    now = datetime.utcnow()
+    released = 0
+    while True:
+        items: List[Tuple[int, int, int]] = (
+            db.query(models.CartItem.user_id, models.CartItem.product_id, models.CartItem.quantity)
+            .filter(models.CartItem.expires_at <= now)
+            .order_by(models.CartItem.expires_at)
+            .limit(chunk_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not items:
+            return released
+
+        deltas: Dict[int, int] = defaultdict(int)
+        for _, product_id, quantity in items:
+            deltas[product_id] -= quantity
+        db.execute(
+            delete(models.CartItem)
+            .where(tuple_(models.CartItem.user_id, models.CartItem.product_id).in_(
+                [(user_id, product_id) for user_id, product_id, _ in items]
+            ))
+            .execution_options(synchronize_session=False)
+        )
+        shift_holds(db, deltas)
+        db.commit()
+        released += len(items)
+        if len(items) < chunk_size:
+            return released
+
+# Fonction pour un passage de balayage (session synchrone ou asynchrone selon DB_ASYNC)
+async def sweep_expired_holds() -> int:
+    if settings.DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(release_expired_holds)
+
+    def sweep() -> int:
+        with SessionLocal() as db:
+            return release_expired_holds(db)
+    return await run_in_threadpool(sweep)
+
+# Tâche de fond lancée au démarrage : balayage toutes les CART_SWEEP_INTERVAL_SECONDS
+async def run_hold_sweeper() -> None:
+    while True:
+        await asyncio.sleep(settings.CART_SWEEP_INTERVAL_SECONDS)
+        try:
+            released = await sweep_expired_holds()
+            if released:
+                logger.info("%d réservations de panier expirées libérées", released)
+        except Exception:
+            # Base indisponible : nouvel essai au prochain passage
+            logger.warning("Balayage des réservations de panier impossible", exc_info=True)
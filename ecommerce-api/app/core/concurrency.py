@@ -0,0 +1,15 @@
+from typing import Any, Callable, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+T = TypeVar("T")
+
+# Travail bloquant (calcul, sérialisation, E/S disque) d'une route partagée entre les modes
+# sync et async. En mode DB_ASYNC, la route tourne dans la boucle d'événements via
+# `AsyncSession.run_sync` : l'appel part dans le pool de threads et la boucle reste libre.
+# En mode sync, la route est déjà dans le pool de threads : appel direct.
+def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    if in_greenlet():
+        return await_only(run_in_threadpool(func, *args, **kwargs))
+    return func(*args, **kwargs)
@@ -1,13 +1,41 @@
 from pydantic_settings import BaseSettings
-import secrets
-from typing import Any, Dict, List, Optional, Union
+from sqlalchemy.engine import make_url
+from typing import Any, Dict, List, Literal, Optional, Union
+
+# Pilote async correspondant au pilote sync d'une URI
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql+mysqldb": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+# URI async déduite d'une URI sync (même base, pilote async) ; inchangée si déjà async
+def async_database_uri(uri: str) -> str:
+    url = make_url(uri)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
 
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
-    SECRET_KEY: str = secrets.token_urlsafe(32)
+    # Clé de signature des tokens, la même pour toutes les instances : SECRET_KEY, ou
+    # fichier monté (secret Docker / Kubernetes) indiqué par SECRET_KEY_FILE.
+    # Obligatoire : sans clé, le démarrage échoue
+    SECRET_KEY: Optional[str] = None
+    SECRET_KEY_FILE: Optional[str] = None
     # 60 minutes * 24 heures * 8 jours = 8 jours
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
     
+    # Hachage des mots de passe : coût bcrypt et pool dédié borné
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    # Au-delà de ce nombre de hachages en cours ou en attente, réponse 503 immédiate
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    
     # Base de données
     MYSQL_SERVER: str = "localhost"
     MYSQL_USER: str = "root"
@@ -17,6 +45,90 @@ class Settings(BaseSettings):
     # URI de connexion à la base de données
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
     
+    # Pool de connexions (appliqué aux moteurs synchrone et asynchrone)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    # Recyclage avant le wait_timeout de MySQL ; -1 pour désactiver
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Connexions ouvertes au démarrage (0 pour n'en ouvrir qu'à la première requête)
+    DB_POOL_WARMUP_CONNECTIONS: int = 2
+    
+    # Mode asynchrone : moteur AsyncEngine et routes async (auth, users, products).
+    # URI async déduite par défaut de SQLALCHEMY_DATABASE_URI (pilote async équivalent)
+    DB_ASYNC: bool = False
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+    
+    # Réplicas en lecture (liste JSON d'URI) servant les GET du catalogue et des utilisateurs ;
+    # vide : toutes les lectures vont au primaire. Mêmes options de pool que le primaire.
+    # Réplicas async : déduits par défaut des réplicas sync
+    SQLALCHEMY_REPLICA_URIS: List[str] = []
+    SQLALCHEMY_ASYNC_REPLICA_URIS: List[str] = []
+    # Après une écriture réussie, les lectures du même client restent sur le primaire
+    # pendant ce délai (secondes), le temps que les réplicas rattrapent leur retard
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    
+    # Cache des lectures du catalogue (0 pour désactiver)
+    CATALOG_CACHE_MAX_SIZE: int = 1024
+    CATALOG_CACHE_TTL_SECONDS: float = 30.0
+    # En-tête Cache-Control des réponses du catalogue (navigateurs et CDN)
+    CATALOG_CACHE_CONTROL: str = "public, max-age=60"
+    # Premières pages du catalogue chargées dans le cache au démarrage
+    CATALOG_CACHE_WARMUP: bool = True
+    
+    # Import en masse : lignes par INSERT groupé et erreurs détaillées renvoyées au maximum
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000
+    
+    # Export du catalogue : produits lus par morceau depuis le curseur côté serveur
+    EXPORT_CHUNK_SIZE: int = 1000
+    
+    # Lecture groupée de produits (paniers, listes d'envies) : IDs acceptés par requête
+    PRODUCT_BATCH_MAX_IDS: int = 1000
+    
+    # Images des produits : fichiers sous MEDIA_ROOT, servis sous MEDIA_URL par l'application
+    # si MEDIA_SERVE (sinon par le serveur web frontal)
+    MEDIA_ROOT: str = "media"
+    MEDIA_URL: str = "/media"
+    MEDIA_SERVE: bool = True
+    # Les URL des images changent à chaque téléversement : cache long côté navigateur et CDN
+    MEDIA_CACHE_CONTROL: str = "public, max-age=31536000, immutable"
+    IMAGE_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    # Au-delà, l'image est refusée (protection contre les « bombes » de décompression)
+    IMAGE_MAX_PIXELS: int = 40_000_000
+    # Variantes générées (nom -> plus grand côté en pixels), format et qualité d'encodage
+    IMAGE_VARIANTS: Dict[str, int] = {"thumbnail": 150, "medium": 600, "large": 1200}
+    IMAGE_FORMAT: Literal["webp", "jpeg"] = "webp"
+    IMAGE_QUALITY: int = 80
+    # Pool de processus dédié au redimensionnement ; au-delà de IMAGE_MAX_PENDING
+    # traitements en cours ou en attente, le téléversement est refusé (503)
+    IMAGE_WORKERS: int = 2
+    IMAGE_MAX_PENDING: int = 16
+    
+    # Agrégats des ventes : lignes par jour (et par catégorie) entre lesquelles les
+    # commandes simultanées se répartissent
+    SALES_ROLLUP_SHARDS: int = 8
+    # Rapports d'analyse : période par défaut et période maximale (jours)
+    ANALYTICS_DEFAULT_DAYS: int = 30
+    ANALYTICS_MAX_DAYS: int = 731
+    
+    # Panier : durée d'une réservation de stock (prolongée à chaque modification
+    # de la ligne) et nombre maximal de produits différents
+    CART_HOLD_SECONDS: int = 900
+    CART_MAX_ITEMS: int = 100
+    # Balayage des réservations expirées : intervalle (secondes) et lignes par transaction
+    CART_SWEEP_INTERVAL_SECONDS: float = 15.0
+    CART_SWEEP_CHUNK_SIZE: int = 500
+    
+    # Cache des utilisateurs authentifiés et des tokens décodés
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: float = 30.0
+    
+    # Métriques Prometheus (/metrics) et journal des requêtes SQL lentes
+    METRICS_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
 
@@ -25,7 +137,14 @@ class Settings(BaseSettings):
         
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_SERVER}/{self.MYSQL_DB}"
+        if self.SQLALCHEMY_DATABASE_URI is None:
+            self.SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_SERVER}/{self.MYSQL_DB}"
+        if self.SQLALCHEMY_ASYNC_DATABASE_URI is None:
+            self.SQLALCHEMY_ASYNC_DATABASE_URI = async_database_uri(self.SQLALCHEMY_DATABASE_URI)
+        if not self.SQLALCHEMY_ASYNC_REPLICA_URIS:
+            self.SQLALCHEMY_ASYNC_REPLICA_URIS = [
+                async_database_uri(uri) for uri in self.SQLALCHEMY_REPLICA_URIS
+            ]
 
 # Créez votre instance settings
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,86 @@
+import hashlib
+import hmac
+import math
+import time
+from typing import Optional
+
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import get_secret_key
+
+# Cookie portant l'instant (horodatage Unix) jusqu'auquel les lectures vont au primaire,
+# signé : "<instant>.<HMAC-SHA256>"
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Routes d'authentification : une connexion n'écrit rien dans le catalogue
+AUTH_PATH_PREFIX = f"{settings.API_V1_STR}/auth/"
+
+def _signature(value: str) -> str:
+    return hmac.new(get_secret_key().encode(), value.encode(), hashlib.sha256).hexdigest()
+
+def _cookie_value(until: float) -> str:
+    value = f"{until:.3f}"
+    return f"{value}.{_signature(value)}"
+
+def last_write_at(request: Request) -> Optional[float]:
+    """
+    Instant de la dernière écriture du client s'il est encore dans la fenêtre
+    READ_YOUR_WRITES_SECONDS, sinon None (pas de cookie, signature invalide).
+    """
+    cookie = request.cookies.get(READ_PRIMARY_COOKIE)
+    if cookie is None:
+        return None
+    value, _, signature = cookie.rpartition(".")
+    if not hmac.compare_digest(signature, _signature(value)):
+        return None
+    try:
+        until = float(value)
+    except ValueError:
+        return None
+    window = settings.READ_YOUR_WRITES_SECONDS
+    now = time.time()
+    # Borné à maintenant + la fenêtre, même signé (fenêtre raccourcie depuis)
+    until = min(until, now + window)
+    if until <= now:
+        return None
+    return until - window
+
+# Le client a écrit récemment : ses lectures doivent voir sa propre écriture
+def reads_from_primary(request: Request) -> bool:
+    return last_write_at(request) is not None
+
+class ReadYourWritesMiddleware:
+    """
+    Middleware ASGI : après une requête d'écriture réussie (méthode non sûre,
+    statut < 400, hors authentification), pose le cookie signé READ_PRIMARY_COOKIE
+    pour READ_YOUR_WRITES_SECONDS.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or scope["path"].startswith(AUTH_PATH_PREFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.READ_YOUR_WRITES_SECONDS
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{READ_PRIMARY_COOKIE}={_cookie_value(time.time() + window)}; "
+                    f"Max-Age={math.ceil(window)}; Path=/; HttpOnly; SameSite=lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,28 @@
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+def increment(db: Session, table: Table, rows: List[Dict[str, Any]], counters: Sequence[str]) -> None:
+    """
+    Ajoute des valeurs (éventuellement négatives) à des compteurs : INSERT de la
+    ligne, ou addition aux compteurs de la ligne existante (même clé primaire),
+    en une requête par lot. Les lignes sont à passer dans l'ordre de leur clé :
+    deux transactions concurrentes les verrouillent alors dans le même ordre.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql.insert(table)
+        statement = statement.on_duplicate_key_update(
+            {name: table.c[name] + statement.inserted[name] for name in counters}
+        )
+    else:
+        statement = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(table.primary_key.columns),
+            set_={name: table.c[name] + statement.excluded[name] for name in counters},
+        )
+    db.execute(statement, rows)
@@ -1,63 +1,155 @@
+import time
+from dataclasses import dataclass
 from typing import Generator, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import models, schemas
 from app.core import security
+from app.core.cache import MISSING, principal_cache, token_cache
 from app.core.config import settings
-from app.database import get_db
+from app.database import get_async_write_db, get_write_db
 
 # Configuration de OAuth2 pour la récupération du token via le formulaire de connexion
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-# Fonction pour obtenir l'utilisateur courant à partir du token
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> models.User:
-    # Exception en cas d'échec d'authentification
-    credentials_exception = HTTPException(
+@dataclass(frozen=True)
+class Principal:
+    """Utilisateur authentifié, détaché de la session et donc partageable via le cache."""
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    is_admin: bool
+
+    @property
+    def is_superuser(self) -> bool:
+        return self.is_admin
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_active=bool(user.is_active),
+            is_admin=bool(user.is_admin),
+        )
+
+# Invalidation de l'utilisateur en cache après une modification ou une suppression
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.delete(("user", user_id))
+
+# Exception en cas d'échec d'authentification
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Impossible de valider les informations d'identification",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+# Décodage et validation du token JWT (mémoïsé tant que le token n'a pas expiré)
+def _decode_token(token: str) -> schemas.TokenPayload:
+    token_data = token_cache.get(token)
+    if token_data is not MISSING:
+        if token_data.exp is None or token_data.exp > time.time():
+            return token_data
+        token_cache.delete(token)
+        raise _credentials_exception()
     
     try:
         # Décodage du token JWT
         payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=["HS256"]
+            token, security.get_secret_key(), algorithms=["HS256"]
         )
         token_data = schemas.TokenPayload(**payload)
         
         # Vérification de l'expiration
         if token_data.sub is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except (JWTError, ValidationError):
-        raise credentials_exception
+        raise _credentials_exception()
+    
+    token_cache.set(token, token_data)
+    return token_data
+
+def _check_active(user: Principal) -> Principal:
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Utilisateur inactif")
+    return user
+
+def _check_superuser(user: Principal) -> Principal:
+    if not user.is_superuser:
+        raise HTTPException(
+            status_code=400, detail="L'utilisateur n'a pas les privilèges suffisants"
+        )
+    return user
+
+# Fonction pour obtenir l'utilisateur courant à partir du token
+# (lu sur le primaire : une désactivation de compte est vue immédiatement)
+def get_current_user(
+    db: Session = Depends(get_write_db), token: str = Depends(oauth2_scheme)
+) -> Principal:
+    token_data = _decode_token(token)
+    
+    cache_key = ("user", token_data.sub)
+    principal = principal_cache.get(cache_key)
+    if principal is not MISSING:
+        return principal
     
     # Récupération de l'utilisateur en base de données
+    version = principal_cache.snapshot()
     user = db.query(models.User).filter(models.User.id == token_data.sub).first()
     if user is None:
-        raise credentials_exception
-    return user
+        raise _credentials_exception()
+    
+    principal = Principal.from_user(user)
+    principal_cache.set(cache_key, principal, version)
+    return principal
 
 # Fonction pour obtenir l'utilisateur courant actif
 def get_current_active_user(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
-    if not current_user.is_active:
-        raise HTTPException(status_code=400, detail="Utilisateur inactif")
-    return current_user
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
+    return _check_active(current_user)
 
 # Fonction pour obtenir l'utilisateur courant superutilisateur
 def get_current_active_superuser(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
-    if not current_user.is_superuser:
-        raise HTTPException(
-            status_code=400, detail="L'utilisateur n'a pas les privilèges suffisants"
-        )
-    return current_user
\ No newline at end of file
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
+    return _check_superuser(current_user)
+
+# Équivalents asynchrones pour les routes du mode DB_ASYNC
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_write_db), token: str = Depends(oauth2_scheme)
+) -> Principal:
+    token_data = _decode_token(token)
+    
+    cache_key = ("user", token_data.sub)
+    principal = principal_cache.get(cache_key)
+    if principal is not MISSING:
+        return principal
+    
+    version = principal_cache.snapshot()
+    user = await db.get(models.User, token_data.sub)
+    if user is None:
+        raise _credentials_exception()
+    
+    principal = Principal.from_user(user)
+    principal_cache.set(cache_key, principal, version)
+    return principal
+
+async def get_current_active_user_async(
+    current_user: Principal = Depends(get_current_user_async),
+) -> Principal:
+    return _check_active(current_user)
+
+async def get_current_active_superuser_async(
+    current_user: Principal = Depends(get_current_user_async),
+) -> Principal:
+    return _check_superuser(current_user)
\ No newline at end of file
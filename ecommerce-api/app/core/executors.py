@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Type
+
+class BoundedExecutor:
+    """
+    Pool dédié et borné (threads ou processus) pour le travail coûteux en CPU,
+    afin de ne pas bloquer les threads des routes.
+
+    Le nombre de tâches en cours ou en attente est limité : au-delà, `busy_error`
+    est levée immédiatement au lieu d'accumuler les requêtes.
+    """
+
+    busy_error: Type[Exception] = RuntimeError
+    thread_name_prefix: str = "worker"
+
+    def __init__(self, workers: int, max_pending: int, kind: str = "thread"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.kind = kind
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix=self.thread_name_prefix
+                        )
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise self.busy_error()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,105 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+
+class Representation(NamedTuple):
+    """Corps JSON déjà sérialisé d'une réponse, avec ses validateurs HTTP."""
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime] = None
+    headers: Dict[str, str] = {}
+
+# Les dates lues en base sans fuseau sont en UTC
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+# Date de dernière modification la plus récente d'un ensemble de lignes
+def latest_modification(rows: Iterable[Any]) -> Optional[datetime]:
+    dates = [
+        _as_utc(row.updated_at or row.created_at)
+        for row in rows
+        if (row.updated_at or row.created_at) is not None
+    ]
+    return max(dates) if dates else None
+
+# Encodage JSON compact en UTF-8 ; les dictionnaires, listes, dates et nombres sont
+# écrits directement par orjson, le reste (modèles pydantic, Decimal) par jsonable_encoder
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=jsonable_encoder)
+
+# Réponse JSON pour des données déjà au format de sortie (pas de seconde validation)
+def json_response(content: Any, status_code: int = 200) -> Response:
+    return Response(content=dumps(content), status_code=status_code, media_type="application/json")
+
+# Sérialisation unique du contenu et calcul d'un ETag fort à partir des octets
+def render(
+    content: Any,
+    last_modified: Optional[datetime] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Representation:
+    return render_body(dumps(content), last_modified, headers)
+
+# Représentation d'un corps JSON déjà encodé (assemblé à partir d'autres représentations)
+def render_body(
+    body: bytes,
+    last_modified: Optional[datetime] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Representation:
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    if last_modified is not None:
+        last_modified = _as_utc(last_modified)
+    return Representation(body, etag, last_modified, headers or {})
+
+# Comparaison faible des ETags (RFC 9110, If-None-Match)
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since is None:
+        return False
+    # Les dates HTTP sont à la seconde près
+    return last_modified.replace(microsecond=0) <= _as_utc(since)
+
+# Réponse 304 si les validateurs du client correspondent, sinon le corps déjà sérialisé
+def conditional_response(request: Request, representation: Representation) -> Response:
+    headers = {
+        "ETag": representation.etag,
+        "Cache-Control": settings.CATALOG_CACHE_CONTROL,
+        **representation.headers,
+    }
+    if representation.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(representation.last_modified, usegmt=True)
+    
+    # If-Modified-Since n'est pris en compte qu'en l'absence de If-None-Match
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, representation.etag)
+    elif if_modified_since is not None and representation.last_modified is not None:
+        not_modified = _not_modified_since(if_modified_since, representation.last_modified)
+    else:
+        not_modified = False
+    
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=representation.body,
+        media_type="application/json",
+        headers=headers,
+    )
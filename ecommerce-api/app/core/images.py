@@ -0,0 +1,183 @@
+import os
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Any, Callable, Dict, List, Optional
+
+from PIL import Image, ImageOps
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from app.core.config import settings
+from app.core.executors import BoundedExecutor
+
+# Types acceptés au téléversement et extension de l'original enregistré
+IMAGE_CONTENT_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+PIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+class ImageProcessingBusyError(Exception):
+    """Trop d'images en attente de traitement : la requête doit être rejetée (503)."""
+
+class InvalidImageError(ValueError):
+    """Fichier téléversé illisible ou hors limites (taille, nombre de pixels)."""
+
+class ImageTooLargeError(InvalidImageError):
+    pass
+
+# Répertoire des images d'un produit ; une clé par téléversement (URL jamais réutilisée)
+def product_image_dir(product_id: int, key: Optional[str] = None) -> str:
+    path = os.path.join(settings.MEDIA_ROOT, "products", str(product_id))
+    return os.path.join(path, key) if key else path
+
+def _media_url(product_id: int, key: str, filename: str) -> str:
+    return f"{settings.MEDIA_URL}/products/{product_id}/{key}/{filename}"
+
+# URL des variantes d'une image, dans l'ordre de IMAGE_VARIANTS
+def image_urls(product_id: int, key: str) -> Dict[str, str]:
+    return {
+        name: _media_url(product_id, key, f"{name}.{settings.IMAGE_FORMAT}")
+        for name in settings.IMAGE_VARIANTS
+    }
+
+def original_url(product_id: int, key: str, extension: str) -> str:
+    return _media_url(product_id, key, f"original{extension}")
+
+def find_original(target_dir: str) -> Optional[str]:
+    for extension in IMAGE_CONTENT_TYPES.values():
+        path = os.path.join(target_dir, f"original{extension}")
+        if os.path.exists(path):
+            return path
+    return None
+
+# Copie en flux du fichier téléversé, limitée à IMAGE_MAX_UPLOAD_BYTES
+def save_upload(file: IO[bytes], target_dir: str, extension: str) -> str:
+    os.makedirs(target_dir, exist_ok=True)
+    path = os.path.join(target_dir, f"original{extension}")
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            while True:
+                chunk = file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > settings.IMAGE_MAX_UPLOAD_BYTES:
+                    raise ImageTooLargeError(
+                        f"Image trop volumineuse (maximum "
+                        f"{settings.IMAGE_MAX_UPLOAD_BYTES // (1024 * 1024)} Mo)"
+                    )
+                f.write(chunk)
+        check_image(path)
+    except BaseException:
+        shutil.rmtree(target_dir, ignore_errors=True)
+        raise
+    return path
+
+# Lecture de l'en-tête seulement : le décodage complet se fait dans le pool
+def check_image(path: str) -> None:
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+    except (OSError, Image.DecompressionBombError):
+        raise InvalidImageError("Fichier image illisible")
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise InvalidImageError(
+            f"Image trop grande ({width}x{height} pixels, maximum {settings.IMAGE_MAX_PIXELS})"
+        )
+
+def make_variants(
+    source: str,
+    target_dir: str,
+    variants: Dict[str, int],
+    image_format: str,
+    quality: int,
+    max_pixels: int,
+) -> Dict[str, List[int]]:
+    """
+    Génère les variantes redimensionnées de `source` dans `target_dir` et
+    retourne leurs dimensions. Exécutée dans le pool de processus : les
+    paramètres sont passés explicitement plutôt que lus dans `settings`.
+
+    Les variantes sont produites de la plus grande à la plus petite, chacune à
+    partir de la précédente ; un JPEG est décodé directement à l'échelle réduite.
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    sizes: Dict[str, List[int]] = {}
+    with Image.open(source) as original:
+        largest = max(variants.values())
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+        # Une seule image pour les GIF animés ; transparence conservée en WebP
+        keep_alpha = image_format == "webp" and (
+            image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        )
+        image = image.convert("RGBA" if keep_alpha else "RGB")
+
+        for name, size in sorted(variants.items(), key=lambda item: -item[1]):
+            image.thumbnail((size, size), Image.LANCZOS)
+            path = os.path.join(target_dir, f"{name}.{image_format}")
+            # Écriture puis renommage : une URL ne sert jamais un fichier partiel
+            image.save(path + ".tmp", format=PIL_FORMATS[image_format], quality=quality)
+            os.replace(path + ".tmp", path)
+            sizes[name] = list(image.size)
+    return sizes
+
+class ImageProcessor(BoundedExecutor):
+    """
+    Pool de processus borné pour le redimensionnement des images, hors du
+    chemin des requêtes. Le résultat de chaque traitement est transmis à un
+    thread dédié (enregistrement en base), pas au thread de gestion du pool.
+    """
+
+    busy_error = ImageProcessingBusyError
+    thread_name_prefix = "images"
+
+    def __init__(self, workers: int, max_pending: int, kind: str = "process"):
+        super().__init__(workers, max_pending, kind)
+        self._callbacks: Optional[ThreadPoolExecutor] = None
+
+    def _get_callbacks(self) -> ThreadPoolExecutor:
+        if self._callbacks is None:
+            with self._lock:
+                if self._callbacks is None:
+                    self._callbacks = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="images-done"
+                    )
+        return self._callbacks
+
+    def process(self, source: str, target_dir: str, callback: Callable[[Future], Any]) -> Future:
+        callbacks = self._get_callbacks()
+        future = self.submit(
+            make_variants, source, target_dir, dict(settings.IMAGE_VARIANTS),
+            settings.IMAGE_FORMAT, settings.IMAGE_QUALITY, settings.IMAGE_MAX_PIXELS,
+        )
+        future.add_done_callback(lambda done: callbacks.submit(callback, done))
+        return future
+
+    def shutdown(self) -> None:
+        super().shutdown()
+        with self._lock:
+            if self._callbacks is not None:
+                self._callbacks.shutdown(wait=False, cancel_futures=True)
+                self._callbacks = None
+
+image_processor = ImageProcessor(
+    workers=settings.IMAGE_WORKERS,
+    max_pending=settings.IMAGE_MAX_PENDING,
+)
+
+class MediaFiles(StaticFiles):
+    """Fichiers de MEDIA_ROOT, avec l'en-tête Cache-Control MEDIA_CACHE_CONTROL."""
+
+    async def get_response(self, path: str, scope: Scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = settings.MEDIA_CACHE_CONTROL
+        return response
@@ -0,0 +1,161 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import case, insert, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.http_cache import dumps
+from app.core.images import image_urls
+
+# Produits recalculés par lot (taille des listes IN)
+REFRESH_CHUNK_SIZE = 1000
+
+# Colonnes lues pour les réponses : des tuples plutôt que des objets ORM validés par pydantic
+PRODUCT_COLUMNS = (
+    models.Product.id,
+    models.Product.name,
+    models.Product.description,
+    models.Product.price,
+    models.Product.stock,
+    models.Product.image_url,
+    models.Product.created_at,
+    models.Product.image_key,
+)
+
+CATEGORY_COLUMNS = (
+    models.Category.id,
+    models.Category.name,
+    models.Category.description,
+)
+
+# Catégorie au format de schemas.Category (is_active n'est pas stocké : valeur par défaut)
+def category_payload(row) -> Dict[str, Any]:
+    return {"name": row.name, "description": row.description, "is_active": True, "id": row.id}
+
+# Produits au format de schemas.Product ; les catégories de tous les produits en une requête IN
+def product_payloads(db: Session, rows) -> List[Dict[str, Any]]:
+    categories: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    product_ids = [row.id for row in rows]
+    if product_ids:
+        category_rows = (
+            db.query(models.ProductCategory.product_id, *CATEGORY_COLUMNS)
+            .join(models.Category, models.Category.id == models.ProductCategory.category_id)
+            .filter(models.ProductCategory.product_id.in_(product_ids))
+            .order_by(models.ProductCategory.product_id, models.Category.id)
+        )
+        for row in category_rows:
+            categories[row.product_id].append(category_payload(row))
+
+    return [
+        {
+            "name": row.name,
+            "description": row.description,
+            # Même texte que le Decimal de pydantic (conversion du flottant par str)
+            "price": str(Decimal(str(row.price))),
+            "image_url": row.image_url,
+            "is_active": True,
+            "id": row.id,
+            "categories": categories[row.id],
+            "images": image_urls(row.id, row.image_key) if row.image_key else None,
+            # En dernier : la projection stocke le corps sans le stock (voir listing_body)
+            "stock": row.stock,
+        }
+        for row in rows
+    ]
+
+# Corps JSON d'un produit : corps de la projection (sans le stock) complété par sa colonne stock
+def listing_body(payload: bytes, stock: Optional[int]) -> bytes:
+    return payload[:-1] + b',"stock":' + dumps(stock) + b"}"
+
+def refresh_listings(db: Session, product_ids: Iterable[int]) -> Dict[int, bytes]:
+    """
+    Recalcule la projection `product_listings` des produits donnés, dans la
+    transaction en cours (à appeler avant le commit de l'écriture). Un produit
+    supprimé perd sa ligne. Retourne le corps JSON de chaque produit existant.
+
+    `updated_at` de la projection est la date de réécriture du corps (et non
+    celle du produit) : un renommage de catégorie ou un changement des seuls
+    liens produit-catégorie la font avancer, comme toute autre écriture.
+
+    Les IDs sont traités dans l'ordre croissant : deux écritures concurrentes
+    verrouillent les lignes dans le même ordre.
+    """
+    db.flush()
+    product_ids = sorted(set(product_ids))
+    refreshed_at = datetime.utcnow()
+    bodies: Dict[int, bytes] = {}
+    for start in range(0, len(product_ids), REFRESH_CHUNK_SIZE):
+        chunk = product_ids[start:start + REFRESH_CHUNK_SIZE]
+        db.query(models.ProductListing).filter(
+            models.ProductListing.product_id.in_(chunk)
+        ).delete(synchronize_session=False)
+
+        rows = db.query(*PRODUCT_COLUMNS).filter(models.Product.id.in_(chunk)).all()
+        values = []
+        for row, payload in zip(rows, product_payloads(db, rows)):
+            stock = payload.pop("stock")
+            body = dumps(payload)
+            bodies[row.id] = listing_body(body, stock)
+            values.append({
+                "product_id": row.id,
+                "name": row.name,
+                "price": row.price,
+                "stock": stock,
+                "created_at": row.created_at,
+                "updated_at": refreshed_at,
+                "payload": body.decode("utf-8"),
+            })
+        if values:
+            db.execute(insert(models.ProductListing), values)
+    return bodies
+
+# Fonction pour reporter dans la projection le stock décrémenté par une commande : une seule
+# requête, relative (correcte entre commandes concurrentes), sans recalcul des corps
+def decrement_listing_stock(db: Session, quantities: Dict[int, int]) -> None:
+    quantity = case(quantities, value=models.ProductListing.product_id)
+    db.execute(
+        update(models.ProductListing)
+        .where(models.ProductListing.product_id.in_(list(quantities)))
+        .values(stock=models.ProductListing.stock - quantity, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+# IDs des produits d'une catégorie (avant une modification ou une suppression de la catégorie)
+def category_product_ids(db: Session, category_id: int) -> List[int]:
+    return [
+        product_id
+        for (product_id,) in db.query(models.ProductCategory.product_id).filter(
+            models.ProductCategory.category_id == category_id
+        )
+    ]
+
+def rebuild_listings(db: Session, chunk_size: int = REFRESH_CHUNK_SIZE) -> int:
+    """
+    Reconstruit toute la projection (après une modification manuelle de la base
+    ou un changement du format des réponses), un commit par lot de produits.
+    Retourne le nombre de produits projetés.
+    """
+    # Lignes dont le produit n'existe plus
+    db.query(models.ProductListing).filter(
+        ~models.ProductListing.product_id.in_(db.query(models.Product.id))
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    count, last_id = 0, 0
+    while True:
+        product_ids = [
+            product_id
+            for (product_id,) in db.query(models.Product.id)
+            .filter(models.Product.id > last_id)
+            .order_by(models.Product.id)
+            .limit(chunk_size)
+        ]
+        if not product_ids:
+            return count
+        refresh_listings(db, product_ids)
+        db.commit()
+        count += len(product_ids)
+        last_id = product_ids[-1]
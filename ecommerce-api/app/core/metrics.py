@@ -0,0 +1,223 @@
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+# Bornes des histogrammes (secondes pour les durées, nombre pour les requêtes SQL)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+class Histogram:
+    """Histogramme cumulatif au format Prometheus (non thread-safe : voir Metrics)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterable[Tuple[str, int]]:
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield _format_number(bound), total
+        yield "+Inf", self.count
+
+class RequestStats:
+    """Requêtes SQL d'une requête HTTP, partagées avec les hooks du moteur via un contextvar."""
+
+    __slots__ = ("scope", "queries", "db_time")
+
+    def __init__(self, scope: Scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_time = 0.0
+
+    @property
+    def route(self) -> str:
+        # Le routeur complète le scope : la route est connue dès l'appel de la route
+        return _route_label(self.scope)
+
+# Statistiques de la requête HTTP en cours (copiées dans les threads des routes synchrones)
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+class Metrics:
+    """Registre des métriques du processus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.db_queries: Dict[Tuple[str, str], Histogram] = {}
+        self.db_time: Dict[Tuple[str, str], Histogram] = {}
+        self.slow_queries: Dict[str, int] = {}
+
+    def observe_request(
+        self, method: str, route: str, status: int, duration: float, stats: RequestStats
+    ) -> None:
+        key = (method, route)
+        with self._lock:
+            status_key = (method, route, str(status))
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.db_queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+                self.db_time[key] = Histogram(LATENCY_BUCKETS)
+            self.latency[key].observe(duration)
+            self.db_queries[key].observe(stats.queries)
+            self.db_time[key].observe(stats.db_time)
+
+    def observe_slow_query(self, route: str) -> None:
+        with self._lock:
+            self.slow_queries[route] = self.slow_queries.get(route, 0) + 1
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        """Exposition au format texte Prometheus (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            lines += counter(
+                "http_requests_total", "Requêtes HTTP traitées.",
+                (({"method": m, "route": r, "status": s}, v) for (m, r, s), v in sorted(self.requests.items())),
+            )
+            for name, help_text, histograms in (
+                ("http_request_duration_seconds", "Durée des requêtes HTTP.", self.latency),
+                ("http_request_db_queries", "Requêtes SQL par requête HTTP.", self.db_queries),
+                ("http_request_db_duration_seconds", "Temps passé en base par requête HTTP.", self.db_time),
+            ):
+                lines += _histograms(name, help_text, histograms)
+            lines += counter(
+                "db_slow_queries_total",
+                f"Requêtes SQL de plus de {settings.SLOW_QUERY_THRESHOLD_MS:g} ms.",
+                (({"route": r}, v) for r, v in sorted(self.slow_queries.items())),
+            )
+        lines += extra
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.__init__()
+
+metrics = Metrics()
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+def counter(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    lines += [f"{name}{_labels(labels)} {_format_number(value)}" for labels, value in samples]
+    return lines
+
+def gauge(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    lines += [f"{name}{_labels(labels)} {_format_number(value)}" for labels, value in samples]
+    return lines
+
+def _histograms(name: str, help_text: str, histograms: Dict[Tuple[str, str], Histogram]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (method, route), histogram in sorted(histograms.items()):
+        labels = {"method": method, "route": route}
+        for bound, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {_format_number(histogram.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+    return lines
+
+# Gabarit de la route (/products/{product_id}) plutôt que le chemin : cardinalité bornée
+def _route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        # Versions de FastAPI qui ne renseignent pas scope["route"]
+        app = scope.get("app")
+        for candidate in getattr(getattr(app, "router", None), "routes", ()):
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", "unmatched")
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : durée de chaque requête, statut, nombre de requêtes SQL et
+    temps passé en base, agrégés par gabarit de route.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            metrics.observe_request(
+                scope["method"], stats.route, status, time.perf_counter() - start, stats
+            )
+
+# Hooks SQLAlchemy : comptage, temps en base et journal des requêtes lentes
+def instrument_engine(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+        if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            route = stats.route if stats is not None else "-"
+            metrics.observe_slow_query(route)
+            # Paramètres non journalisés : ils peuvent contenir des données personnelles
+            slow_query_logger.warning(
+                "Requête lente (%.1f ms) [%s] : %s", elapsed * 1000, route, " ".join(statement.split())
+            )
+
+    # Requête en échec : le chronomètre empilé est retiré
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context: Any) -> None:
+        connection = context.connection
+        if connection is not None and connection.info.get("query_start_time"):
+            connection.info["query_start_time"].pop()
@@ -0,0 +1,97 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+# En-tête portant le curseur de la page suivante
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Encodage d'un curseur opaque à partir de la clé de tri et de l'ID du dernier élément
+def encode_cursor(sort: str, order: str, value: Any, last_id: int) -> str:
+    if isinstance(value, datetime):
+        payload = {"s": sort, "o": order, "v": value.isoformat(), "t": "dt", "id": last_id}
+    else:
+        payload = {"s": sort, "o": order, "v": value, "id": last_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+# Décodage d'un curseur ; il doit correspondre au tri demandé
+def decode_cursor(cursor: str, sort: str, order: str) -> Tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value = payload["v"]
+        if payload.get("t") == "dt":
+            value = datetime.fromisoformat(value)
+        last_id = int(payload["id"])
+        cursor_sort, cursor_order = payload["s"], payload["o"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    
+    if cursor_sort != sort or cursor_order != order:
+        raise HTTPException(
+            status_code=400,
+            detail="Le curseur ne correspond pas au tri demandé"
+        )
+    return value, last_id
+
+# Pagination par clé (sort_key, id) ou par décalage si aucun curseur n'est fourni
+def paginate(
+    query: Query,
+    *,
+    sort_column: Any,
+    id_column: Any,
+    sort: str,
+    order: str = "asc",
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> Tuple[List[Any], Optional[str]]:
+    descending = order == "desc"
+    same_column = sort_column is id_column
+    
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort, order)
+        if same_column:
+            query = query.filter(id_column < last_id if descending else id_column > last_id)
+        elif descending:
+            query = query.filter(or_(
+                sort_column < value,
+                and_(sort_column == value, id_column < last_id),
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > value,
+                and_(sort_column == value, id_column > last_id),
+            ))
+    
+    # Ordre total sur (sort_key, id) pour que les pages ne se chevauchent pas
+    if same_column:
+        ordering = [id_column.desc() if descending else id_column.asc()]
+    else:
+        ordering = [
+            sort_column.desc() if descending else sort_column.asc(),
+            id_column.desc() if descending else id_column.asc(),
+        ]
+    query = query.order_by(*ordering)
+    
+    if not cursor and skip:
+        query = query.offset(skip)
+    items = query.limit(limit).all()
+    
+    next_cursor = None
+    if limit and len(items) == limit:
+        last = items[-1]
+        next_cursor = encode_cursor(
+            sort, order, getattr(last, sort_column.key), getattr(last, id_column.key)
+        )
+    return items, next_cursor
+
+# Ajout du curseur suivant à la réponse
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,120 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Sequence
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.database import AsyncSessionLocal, SessionLocal, get_async_read_engine, get_read_engine
+
+EXPORT_COLUMNS = (
+    "id", "name", "description", "price", "stock",
+    "image_url", "created_at", "updated_at",
+)
+
+CSV_COLUMNS = EXPORT_COLUMNS + ("category_ids", "category_names")
+
+def _isoformat(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+# Catégories d'un lot de produits, en une requête IN
+def _categories_statement(product_ids: Sequence[int]):
+    return (
+        select(
+            models.ProductCategory.product_id,
+            models.Category.id,
+            models.Category.name,
+        )
+        .join(models.Category, models.Category.id == models.ProductCategory.category_id)
+        .where(models.ProductCategory.product_id.in_(product_ids))
+        .order_by(models.ProductCategory.product_id, models.Category.id)
+    )
+
+def _group_categories(rows) -> Dict[int, List[Dict[str, Any]]]:
+    categories: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for product_id, category_id, name in rows:
+        categories[product_id].append({"id": category_id, "name": name})
+    return categories
+
+def _categories_for(db: Session, product_ids: Sequence[int]) -> Dict[int, List[Dict[str, Any]]]:
+    return _group_categories(db.execute(_categories_statement(product_ids)))
+
+def _ndjson_chunk(rows, categories) -> bytes:
+    lines = []
+    for row in rows:
+        item = {column: _isoformat(value) for column, value in zip(EXPORT_COLUMNS, row)}
+        item["categories"] = categories.get(row.id, [])
+        lines.append(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+def _csv_chunk(rows, categories) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        product_categories = categories.get(row.id, [])
+        writer.writerow([
+            *(_isoformat(value) for value in row),
+            ";".join(str(category["id"]) for category in product_categories),
+            ";".join(category["name"] for category in product_categories),
+        ])
+    return buffer.getvalue().encode("utf-8")
+
+def _csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(CSV_COLUMNS)
+    return buffer.getvalue().encode("utf-8")
+
+def _export_statement():
+    columns = [getattr(models.Product, column) for column in EXPORT_COLUMNS]
+    return select(*columns).order_by(models.Product.id)
+
+def iter_export(format: str, primary: bool = False) -> Iterator[bytes]:
+    """
+    Export complet du catalogue, produit par morceaux de EXPORT_CHUNK_SIZE produits.
+    
+    Les produits sont lus par un curseur côté serveur (`yield_per`) sur une connexion
+    dédiée ; les catégories de chaque morceau sont chargées par une seconde session,
+    MySQL n'autorisant pas d'autre requête sur une connexion en cours de streaming.
+    Les deux lisent le même réplica (le primaire si `primary` ou sans réplica).
+    """
+    if format == "csv":
+        yield _csv_header()
+    
+    encode = _csv_chunk if format == "csv" else _ndjson_chunk
+    statement = _export_statement()
+    
+    engine = get_read_engine(primary=primary)
+    with engine.connect() as stream_connection, SessionLocal(bind=engine) as db:
+        result = stream_connection.execution_options(
+            yield_per=settings.EXPORT_CHUNK_SIZE
+        ).execute(statement)
+        for rows in result.partitions():
+            categories = _categories_for(db, [row.id for row in rows])
+            yield encode(rows, categories)
+
+async def aiter_export(format: str, primary: bool = False) -> AsyncIterator[bytes]:
+    """
+    Équivalent de `iter_export` pour le mode DB_ASYNC : curseur côté serveur du pilote
+    async (`AsyncConnection.stream`), encodage des morceaux dans le pool de threads.
+    """
+    if format == "csv":
+        yield _csv_header()
+    
+    encode = _csv_chunk if format == "csv" else _ndjson_chunk
+    
+    engine = get_async_read_engine(primary=primary)
+    async with engine.connect() as stream_connection, AsyncSessionLocal(bind=engine) as db:
+        result = await stream_connection.stream(
+            _export_statement(),
+            execution_options={"yield_per": settings.EXPORT_CHUNK_SIZE},
+        )
+        async for rows in result.partitions():
+            category_rows = await db.execute(_categories_statement([row.id for row in rows]))
+            categories = _group_categories(category_rows)
+            yield await run_in_threadpool(encode, rows, categories)
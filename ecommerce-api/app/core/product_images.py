@@ -0,0 +1,107 @@
+import logging
+import os
+import shutil
+from concurrent.futures import Future
+from functools import partial
+from typing import Tuple
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.core.images import (
+    find_original, image_processor, make_variants, original_url, product_image_dir,
+)
+from app.core.listings import refresh_listings
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+def apply_product_image(db: Session, product_id: int, key: str, processed: bool) -> bool:
+    """
+    Enregistre la fin du traitement de l'image `key` d'un produit. Si les
+    variantes sont prêtes, elles remplacent celles du produit (projection
+    recalculée dans la même transaction) ; les fichiers de l'image remplacée,
+    ou d'un traitement en échec ou devenu inutile, sont supprimés.
+    Retourne True si l'image est publiée.
+    """
+    product = (
+        db.query(models.Product)
+        .filter(models.Product.id == product_id)
+        .with_for_update()
+        .first()
+    )
+    if product is None or product.pending_image_key != key:
+        # Produit supprimé, ou image remplacée entre-temps par un téléversement plus récent
+        db.rollback()
+        shutil.rmtree(product_image_dir(product_id, key), ignore_errors=True)
+        return False
+
+    source = find_original(product_image_dir(product_id, key))
+    processed = processed and source is not None
+    previous_key = product.image_key
+    product.pending_image_key = None
+    if processed:
+        product.image_key = key
+        product.image_url = original_url(product_id, key, os.path.splitext(source)[1])
+    refresh_listings(db, [product_id])
+    db.commit()
+
+    catalog_cache.delete(("product", product_id))
+    catalog_cache.invalidate("products", "facets")
+
+    stale_key = previous_key if processed else key
+    if stale_key:
+        shutil.rmtree(product_image_dir(product_id, stale_key), ignore_errors=True)
+    return processed
+
+# Fonction appelée à la fin du traitement dans le pool (thread dédié, hors requête)
+def finish_product_image(product_id: int, key: str, future: Future) -> None:
+    try:
+        future.result()
+        processed = True
+    except Exception:
+        logger.exception("Traitement de l'image %s du produit %s impossible", key, product_id)
+        processed = False
+    try:
+        with SessionLocal() as db:
+            apply_product_image(db, product_id, key, processed)
+    except Exception:
+        logger.exception("Enregistrement de l'image %s du produit %s impossible", key, product_id)
+
+# Envoi de l'original au pool de redimensionnement (ImageProcessingBusyError si saturé)
+def submit_product_image(product_id: int, key: str, source: str) -> Future:
+    return image_processor.process(
+        source, product_image_dir(product_id, key), partial(finish_product_image, product_id, key)
+    )
+
+def process_pending_images(db: Session) -> Tuple[int, int]:
+    """
+    Traite sur place les images restées en attente (arrêt du serveur pendant le
+    traitement). Retourne le nombre d'images publiées et en échec.
+    """
+    pending = db.query(models.Product.id, models.Product.pending_image_key).filter(
+        models.Product.pending_image_key.isnot(None)
+    ).all()
+    db.rollback()
+
+    published = failed = 0
+    for product_id, key in pending:
+        target_dir = product_image_dir(product_id, key)
+        source = find_original(target_dir)
+        processed = False
+        if source is not None:
+            try:
+                make_variants(
+                    source, target_dir, dict(settings.IMAGE_VARIANTS),
+                    settings.IMAGE_FORMAT, settings.IMAGE_QUALITY, settings.IMAGE_MAX_PIXELS,
+                )
+                processed = True
+            except Exception:
+                logger.exception("Traitement de l'image %s du produit %s impossible", key, product_id)
+        if apply_product_image(db, product_id, key, processed):
+            published += 1
+        else:
+            failed += 1
+    return published, failed
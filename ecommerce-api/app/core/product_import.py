@@ -0,0 +1,233 @@
+import codecs
+import csv
+import json
+import secrets
+from typing import Any, Dict, IO, Iterator, List, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.core.listings import refresh_listings
+
+# Taille des blocs lus dans le fichier téléversé
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Séparateurs acceptés pour la colonne category_ids d'un CSV
+_CATEGORY_SEPARATORS = (";", "|", ",")
+
+def _parse_category_ids(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    for separator in _CATEGORY_SEPARATORS:
+        if separator in value:
+            return [part.strip() for part in value.split(separator) if part.strip()]
+    return [value.strip()] if value.strip() else None
+
+# Lecture des lignes d'un flux binaire UTF-8 (BOM éventuel retiré), fins de ligne conservées.
+# Pas de io.TextIOWrapper : le SpooledTemporaryFile d'UploadFile n'a pas `readable()`
+# avant Python 3.11 ; seul "\n" sépare les lignes, comme avec newline=""
+def _iter_lines(stream: IO[bytes]) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    while True:
+        chunk = stream.read(_READ_CHUNK_SIZE)
+        pending += decoder.decode(chunk, final=not chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+        if not chunk:
+            if pending:
+                yield pending
+            return
+
+# Lecture ligne à ligne d'un CSV (en-tête obligatoire) ; retourne (numéro de ligne, données)
+def iter_csv(stream: IO[bytes]) -> Iterator[Tuple[int, Any]]:
+    reader = csv.DictReader(_iter_lines(stream))
+    for row in reader:
+        data = {key: value for key, value in row.items() if key and value not in ("", None)}
+        if "category_ids" in data:
+            data["category_ids"] = _parse_category_ids(data["category_ids"])
+        yield reader.line_num, data
+
+# Lecture ligne à ligne d'un fichier NDJSON (un objet JSON par ligne)
+def iter_ndjson(stream: IO[bytes]) -> Iterator[Tuple[int, Any]]:
+    for line_number, line in enumerate(_iter_lines(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, e
+
+def _format_validation_error(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+class ProductImporter:
+    """
+    Import en flux : validation ligne par ligne et écriture par lots.
+    
+    Seuls le lot courant et l'ensemble des IDs de catégories connus sont gardés
+    en mémoire (aucun objet ORM n'est créé) ; une ligne invalide est signalée
+    sans interrompre l'import.
+    """
+
+    def __init__(self, db: Session, created_by: int):
+        self.db = db
+        self.created_by = created_by
+        self.created = 0
+        self.failed = 0
+        self.errors: List[schemas.ProductImportError] = []
+        self._batch: List[Tuple[int, schemas.ProductCreate]] = []
+        self._known_categories: Set[int] = set()
+        self._last_line = 0
+
+    def _fail(self, line: int, messages: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append(schemas.ProductImportError(line=line, errors=messages))
+
+    def add(self, line: int, data: Any) -> None:
+        self._last_line = line
+        if isinstance(data, Exception):
+            self._fail(line, [f"JSON invalide : {data}"])
+            return
+        if not isinstance(data, dict):
+            self._fail(line, ["Un objet JSON est attendu"])
+            return
+        try:
+            product_in = schemas.ProductCreate(**data)
+        except ValidationError as e:
+            self._fail(line, _format_validation_error(e))
+            return
+        
+        self._batch.append((line, product_in))
+
+    # Lecture et validation jusqu'à un lot complet ; False une fois les lignes épuisées
+    def _read_batch(self, rows: Iterator[Tuple[int, Any]]) -> bool:
+        for line, data in rows:
+            self.add(line, data)
+            if len(self._batch) >= settings.IMPORT_BATCH_SIZE:
+                return True
+        return False
+
+    # Import de toutes les lignes : lecture du fichier et validation hors de la boucle
+    # d'événements en mode async (run_blocking), écriture de chaque lot sur la session
+    def add_all(self, rows: Iterator[Tuple[int, Any]]) -> None:
+        while run_blocking(self._read_batch, rows):
+            self.flush()
+        self.flush()
+
+    # Vérification des catégories du lot en une seule requête IN
+    def _check_categories(self) -> List[Tuple[int, schemas.ProductCreate]]:
+        wanted = {
+            category_id
+            for _, product_in in self._batch
+            for category_id in (product_in.category_ids or [])
+        }
+        unknown = wanted - self._known_categories
+        if unknown:
+            found = self.db.query(models.Category.id).filter(models.Category.id.in_(unknown)).all()
+            self._known_categories.update(category_id for (category_id,) in found)
+        
+        valid = []
+        for line, product_in in self._batch:
+            missing = sorted(set(product_in.category_ids or []) - self._known_categories)
+            if missing:
+                self._fail(line, [f"Catégories non trouvées : {missing}"])
+            else:
+                valid.append((line, product_in))
+        return valid
+
+    # INSERT des produits du lot ; retourne les IDs dans l'ordre des lignes
+    def _insert_products(self, values: List[Dict[str, Any]]) -> List[int]:
+        dialect = self.db.get_bind().dialect
+        if dialect.insert_executemany_returning:
+            # INSERT multi-lignes ; SQLAlchemy renvoie les IDs dans l'ordre des paramètres
+            result = self.db.execute(
+                insert(models.Product).returning(models.Product.id, sort_by_parameter_order=True),
+                values,
+            )
+            return list(result.scalars().all())
+        
+        # MySQL : pas de RETURNING, et les IDs d'un INSERT multi-lignes ne sont pas forcément
+        # consécutifs (auto_increment_increment, innodb_autoinc_lock_mode=2 avec des
+        # insertions concurrentes). Chaque ligne porte une clé lot:rang ; le lot est inséré
+        # en un executemany (INSERT multi-lignes côté pilote), puis les IDs sont relus par
+        # ces clés dans la même transaction.
+        token = secrets.token_hex(8)
+        keys = [f"{token}:{rank}" for rank in range(len(values))]
+        self.db.execute(
+            insert(models.Product),
+            [{**row, "import_key": key} for row, key in zip(values, keys)],
+        )
+        product_ids = dict(
+            self.db.query(models.Product.import_key, models.Product.id)
+            .filter(models.Product.import_key.in_(keys))
+            .all()
+        )
+        return [product_ids[key] for key in keys]
+
+    def _insert(self, rows: List[Tuple[int, schemas.ProductCreate]]) -> None:
+        values = [
+            {
+                "name": product_in.name,
+                "description": product_in.description,
+                "price": product_in.price,
+                "stock": product_in.stock,
+                "image_url": product_in.image_url,
+                "created_by": self.created_by,
+            }
+            for _, product_in in rows
+        ]
+        product_ids = self._insert_products(values)
+        
+        links = [
+            {"product_id": product_id, "category_id": category_id}
+            for product_id, (_, product_in) in zip(product_ids, rows)
+            for category_id in dict.fromkeys(product_in.category_ids or [])
+        ]
+        if links:
+            self.db.execute(insert(models.ProductCategory), links)
+        refresh_listings(self.db, product_ids)
+
+    def flush(self) -> None:
+        if not self._batch:
+            return
+        rows = self._check_categories()
+        self._batch = []
+        if not rows:
+            return
+        
+        try:
+            self._insert(rows)
+            self.db.commit()
+            self.created += len(rows)
+        except SQLAlchemyError:
+            self.db.rollback()
+            # Le lot a échoué : les lignes sont rejouées une à une pour isoler la fautive
+            for line, product_in in rows:
+                try:
+                    self._insert([(line, product_in)])
+                    self.db.commit()
+                    self.created += 1
+                except SQLAlchemyError as e:
+                    self.db.rollback()
+                    self._fail(line, [f"Erreur d'écriture : {e.__class__.__name__}"])
+
+    # Arrêt sur une erreur de lecture : le lot en cours est écrit, l'erreur signalée
+    def abort(self, message: str) -> None:
+        self.flush()
+        self._fail(self._last_line + 1, [message])
+
+    def result(self) -> schemas.ProductImportResult:
+        return schemas.ProductImportResult(
+            created=self.created, failed=self.failed, errors=self.errors
+        )
@@ -0,0 +1,65 @@
+import re
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import Float, Integer, false, or_, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Query
+
+from app import models
+
+# Découpage du terme recherché en mots (lettres accentuées comprises)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Construction d'une requête FTS5 : tous les mots, chacun en préfixe
+def _fts5_query(term: str) -> Optional[str]:
+    words = _WORD_RE.findall(term)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+# Construction d'une requête MySQL en mode booléen : mêmes règles que FTS5
+# (tous les mots requis, chacun en préfixe)
+def _boolean_query(term: str) -> Optional[str]:
+    words = _WORD_RE.findall(term)
+    if not words:
+        return None
+    return " ".join(f"+{word}*" for word in words)
+
+# Filtrage plein texte des produits sur le nom et la description
+def search_products(query: Query, term: str) -> Tuple[Query, Optional[Any]]:
+    """
+    Retourne la requête filtrée et l'expression de pertinence (plus grande = meilleure).
+    
+    MySQL utilise l'index FULLTEXT, SQLite la table virtuelle FTS5 `products_fts` ;
+    les autres bases se rabattent sur un ILIKE sans classement.
+    """
+    dialect = query.session.get_bind().dialect.name
+    
+    if dialect == "mysql":
+        boolean_query = _boolean_query(term)
+        if boolean_query is None:
+            return query.filter(false()), None
+        rank = match(
+            models.Product.name, models.Product.description, against=boolean_query
+        ).in_boolean_mode()
+        return query.filter(rank > 0), rank
+    
+    if dialect == "sqlite":
+        fts_query = _fts5_query(term)
+        if fts_query is None:
+            return query.filter(false()), None
+        fts = text(
+            "SELECT rowid AS product_id, -bm25(products_fts) AS rank "
+            "FROM products_fts WHERE products_fts MATCH :fts_query"
+        ).bindparams(fts_query=fts_query).columns(
+            product_id=Integer, rank=Float
+        ).subquery("fts")
+        query = query.join(fts, fts.c.product_id == models.Product.id)
+        return query, fts.c.rank
+    
+    pattern = f"%{term}%"
+    query = query.filter(or_(
+        models.Product.name.ilike(pattern),
+        models.Product.description.ilike(pattern),
+    ))
+    return query, None
@@ -1,13 +1,76 @@
+import threading
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Optional, Tuple, Union
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.executors import BoundedExecutor
 
-# Configuration du contexte de cryptage
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Configuration du contexte de cryptage ; un hash d'un autre coût est à recalculer
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+class HashingBusyError(Exception):
+    """Trop de hachages en attente : la requête doit être rejetée (503)."""
+
+class PasswordHasher(BoundedExecutor):
+    """
+    Pool dédié et borné pour bcrypt, afin de ne pas bloquer les threads des routes.
+    
+    Le nombre de tâches en cours ou en attente est limité : au-delà, `HashingBusyError`
+    est levée immédiatement au lieu d'accumuler les requêtes.
+    """
+
+    busy_error = HashingBusyError
+    thread_name_prefix = "bcrypt"
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+)
+
+_secret_key: Optional[str] = None
+_secret_key_lock = threading.Lock()
+
+class MissingSecretKeyError(RuntimeError):
+    """Ni SECRET_KEY ni SECRET_KEY_FILE : les instances ne partageraient pas de clé."""
+
+# Lecture de la clé dans le fichier monté SECRET_KEY_FILE
+def _read_secret_key_file(path: str) -> str:
+    try:
+        with open(path) as f:
+            key = f.read().strip()
+    except OSError as e:
+        raise MissingSecretKeyError(f"Fichier de clé secrète illisible : {path} ({e})") from e
+    if not key:
+        raise MissingSecretKeyError(f"Fichier de clé secrète vide : {path}")
+    return key
+
+# Clé de signature des tokens, résolue au premier usage (aucune E/S à l'import) ;
+# appelée au démarrage (lifespan) pour qu'une clé manquante l'arrête aussitôt
+def get_secret_key() -> str:
+    global _secret_key
+    if _secret_key is None:
+        with _secret_key_lock:
+            if _secret_key is None:
+                if settings.SECRET_KEY:
+                    _secret_key = settings.SECRET_KEY
+                elif settings.SECRET_KEY_FILE:
+                    _secret_key = _read_secret_key_file(settings.SECRET_KEY_FILE)
+                else:
+                    raise MissingSecretKeyError(
+                        "Clé secrète manquante : définir SECRET_KEY, ou SECRET_KEY_FILE "
+                        "(fichier monté), avec la même valeur sur toutes les instances"
+                    )
+    return _secret_key
 
 # Fonction pour créer un token d'accès JWT
 def create_access_token(
@@ -24,13 +87,34 @@ def create_access_token(
     to_encode = {"exp": expire, "sub": str(subject)}
     
     # Encodage du token avec la clé secrète
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
+    encoded_jwt = jwt.encode(to_encode, get_secret_key(), algorithm="HS256")
     return encoded_jwt
 
+# Fonctions exécutées dans le pool (au niveau du module pour le mode processus)
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
 # Vérification du mot de passe
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.run(_verify_and_update, plain_password, hashed_password)[0]
+
+# Vérification du mot de passe, avec le nouveau hash si le coût configuré a changé
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return password_hasher.run(_verify_and_update, plain_password, hashed_password)
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return await password_hasher.run_async(_verify_and_update, plain_password, hashed_password)
 
 # Hachage du mot de passe
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return password_hasher.run(_hash, password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run_async(_hash, password)
\ No newline at end of file
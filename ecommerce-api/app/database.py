@@ -1,22 +1,287 @@
-from sqlalchemy import create_engine
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 
 from app.core.config import settings
+from app.core.consistency import reads_from_primary
+from app.core.metrics import instrument_engine
+
+class PoolMetrics:
+    """Temps d'attente cumulés pour obtenir une connexion du pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / attempts * 1000, 3) if attempts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+class _TimedPoolMixin:
+    # Mesure du temps passé à attendre (ou ouvrir) une connexion
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+# Options du pool ; une base SQLite en mémoire garde son pool par défaut
+def _engine_options(uri: str, poolclass: type) -> Dict[str, Any]:
+    url = make_url(uri)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+# État courant d'un pool pour le point de contrôle /ready
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    status: Dict[str, Any] = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.as_dict())
+    return status
+
+class LazySessionMaker(sessionmaker):
+    """
+    sessionmaker dont le moteur n'est créé qu'à l'ouverture de la première session :
+    importer l'application n'ouvre ni moteur ni pool.
+    """
+
+    def __init__(self, get_bind: Callable[[], Any], **kwargs: Any):
+        super().__init__(**kwargs)
+        self._get_bind = get_bind
+
+    def __call__(self, **local_kw: Any) -> Session:
+        if "bind" not in local_kw and self.kw.get("bind") is None:
+            self.configure(bind=self._get_bind())
+        return super().__call__(**local_kw)
+
+class LazyAsyncSessionMaker(async_sessionmaker):
+    """Équivalent asynchrone de `LazySessionMaker`."""
+
+    def __init__(self, get_bind: Callable[[], Any], **kwargs: Any):
+        super().__init__(**kwargs)
+        self._get_bind = get_bind
+
+    def __call__(self, **local_kw: Any) -> AsyncSession:
+        if "bind" not in local_kw and self.kw.get("bind") is None:
+            self.configure(bind=self._get_bind())
+        return super().__call__(**local_kw)
+
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_replica_engines: Optional[List[Engine]] = None
+_async_replica_engines: Optional[List[AsyncEngine]] = None
+_engine_lock = threading.Lock()
+
+# Répartition des lectures entre les réplicas, à tour de rôle
+_replica_counter = itertools.count()
 
-# Création du moteur SQLAlchemy
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+def _create_engine(uri: str) -> Engine:
+    engine = create_engine(uri, **_engine_options(uri, TimedQueuePool))
+    instrument_engine(engine)
+    return engine
+
+def _create_async_engine(uri: str) -> AsyncEngine:
+    engine = create_async_engine(uri, **_engine_options(uri, TimedAsyncAdaptedQueuePool))
+    instrument_engine(engine.sync_engine)
+    return engine
+
+# Moteur SQLAlchemy du primaire, créé au premier usage
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(settings.SQLALCHEMY_DATABASE_URI)
+    return _engine
+
+# Moteur asynchrone, créé au premier usage et uniquement en mode DB_ASYNC
+def get_async_engine() -> Optional[AsyncEngine]:
+    global _async_engine
+    if _async_engine is None and settings.DB_ASYNC:
+        with _engine_lock:
+            if _async_engine is None:
+                _async_engine = _create_async_engine(settings.SQLALCHEMY_ASYNC_DATABASE_URI)
+    return _async_engine
+
+# Moteurs des réplicas en lecture (liste vide sans SQLALCHEMY_REPLICA_URIS)
+def get_replica_engines() -> List[Engine]:
+    global _replica_engines
+    if _replica_engines is None:
+        with _engine_lock:
+            if _replica_engines is None:
+                _replica_engines = [_create_engine(uri) for uri in settings.SQLALCHEMY_REPLICA_URIS]
+    return _replica_engines
+
+def get_async_replica_engines() -> List[AsyncEngine]:
+    global _async_replica_engines
+    if _async_replica_engines is None and settings.DB_ASYNC:
+        with _engine_lock:
+            if _async_replica_engines is None:
+                _async_replica_engines = [
+                    _create_async_engine(uri) for uri in settings.SQLALCHEMY_ASYNC_REPLICA_URIS
+                ]
+    return _async_replica_engines or []
+
+# Moteur pour une lecture : un réplica à tour de rôle, le primaire s'il n'y en a pas
+def get_read_engine(primary: bool = False) -> Engine:
+    replicas = get_replica_engines()
+    if primary or not replicas:
+        return get_engine()
+    return replicas[next(_replica_counter) % len(replicas)]
+
+def get_async_read_engine(primary: bool = False) -> Optional[AsyncEngine]:
+    replicas = get_async_replica_engines()
+    if primary or not replicas:
+        return get_async_engine()
+    return replicas[next(_replica_counter) % len(replicas)]
+
+# Moteurs déjà créés (sans en créer), pour l'état des pools et l'arrêt
+def created_engines() -> Tuple[Optional[Engine], Optional[AsyncEngine]]:
+    return _engine, _async_engine
+
+# Pools des moteurs déjà créés, nommés pour /ready et /metrics (sync, async, replica-1…)
+def created_pools() -> List[Tuple[str, Pool]]:
+    pools = []
+    if _engine is not None:
+        pools.append(("sync", _engine.pool))
+    if _async_engine is not None:
+        pools.append(("async", _async_engine.sync_engine.pool))
+    for index, engine in enumerate(_replica_engines or [], start=1):
+        pools.append((f"replica-{index}", engine.pool))
+    for index, engine in enumerate(_async_replica_engines or [], start=1):
+        pools.append((f"async-replica-{index}", engine.sync_engine.pool))
+    return pools
 
 # Session locale
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = LazySessionMaker(get_engine, autocommit=False, autoflush=False)
+
+# Sessions asynchrones
+AsyncSessionLocal = LazyAsyncSessionMaker(get_async_engine, class_=AsyncSession, autoflush=False)
+
+# Ouverture de connexions à l'avance (primaire et réplicas) pour que les premières
+# requêtes n'attendent pas
+def warm_up_pool(connections: int) -> None:
+    for engine in [get_engine(), *get_replica_engines()]:
+        opened = []
+        try:
+            # Connexions gardées ouvertes ensemble pour en créer réellement `connections`
+            for _ in range(connections):
+                connection = engine.connect()
+                opened.append(connection)
+                connection.execute(text("SELECT 1"))
+        finally:
+            for connection in opened:
+                connection.close()
+
+async def warm_up_async_pool(connections: int) -> None:
+    primary = get_async_engine()
+    if primary is None:
+        return
+    for engine in [primary, *get_async_replica_engines()]:
+        opened = []
+        try:
+            for _ in range(connections):
+                connection = await engine.connect()
+                opened.append(connection)
+                await connection.execute(text("SELECT 1"))
+        finally:
+            for connection in opened:
+                await connection.close()
+
+# Fermeture des connexions des pools (arrêt de l'application)
+async def dispose_engines() -> None:
+    for async_engine in [_async_engine, *(_async_replica_engines or [])]:
+        if async_engine is not None:
+            await async_engine.dispose()
+    for engine in [_engine, *(_replica_engines or [])]:
+        if engine is not None:
+            engine.dispose()
 
 # Classe de base pour les modèles
 Base = declarative_base()
 
-# Fonction de dépendance pour obtenir la session DB
-def get_db():
+# Fonction de dépendance pour obtenir une session sur le primaire (écritures)
+def get_write_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Fonction de dépendance pour obtenir une session de lecture (réplica, ou primaire
+# si le client vient d'écrire)
+def get_read_db(request: Request):
+    db = SessionLocal(bind=get_read_engine(primary=reads_from_primary(request)))
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Équivalents asynchrones pour le mode DB_ASYNC
+async def get_async_write_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db(request: Request):
+    engine = get_async_read_engine(primary=reads_from_primary(request))
+    async with AsyncSessionLocal(bind=engine) as db:
+        yield db
\ No newline at end of file
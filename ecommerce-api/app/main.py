@@ -1,59 +1,234 @@
-from fastapi import FastAPI, Depends
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.database import get_db, Base, engine
+from app.database import (
+    AsyncSessionLocal,
+    SessionLocal,
+    created_pools,
+    dispose_engines,
+    get_write_db,
+    get_engine,
+    get_replica_engines,
+    pool_status,
+    warm_up_async_pool,
+    warm_up_pool,
+)
 from app.core.config import settings
-from app.routers import auth, users, products
+from app.core import security
+from app.core.cache import catalog_cache
+from app.core.carts import run_hold_sweeper
+from app.core.consistency import ReadYourWritesMiddleware
+from app.core.images import ImageProcessingBusyError, MediaFiles, image_processor
+from app.core.metrics import MetricsMiddleware, counter, gauge, metrics
+from app.core.security import HashingBusyError
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.routers import analytics, auth, carts, users, products, orders
+from app.routers.aio import (
+    analytics as analytics_async, auth as auth_async, carts as carts_async, users as users_async,
+    products as products_async, orders as orders_async,
+)
 
-# Création des tables dans la base de données
-Base.metadata.create_all(bind=engine)
+# Le schéma est géré par les migrations Alembic : `alembic upgrade head`
 
-# Création de l'application FastAPI
-app = FastAPI(
-    title="E-commerce API",
-    description="API REST pour un site de vente d'articles en ligne",
-    version="0.1.0",
-)
+logger = logging.getLogger(__name__)
 
-# Configuration CORS
-if settings.BACKEND_CORS_ORIGINS:
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=[str(origin) for origin in settings.BACKEND_CORS_ORIGINS],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
+# Préparation avant la première requête : connexions, cache
+async def warm_up() -> None:
+    try:
+        if settings.DB_ASYNC:
+            await warm_up_async_pool(settings.DB_POOL_WARMUP_CONNECTIONS)
+            if settings.CATALOG_CACHE_WARMUP:
+                async with AsyncSessionLocal() as db:
+                    await db.run_sync(products.warm_catalog_cache)
+        else:
+            await run_in_threadpool(warm_up_pool, settings.DB_POOL_WARMUP_CONNECTIONS)
+            if settings.CATALOG_CACHE_WARMUP:
+                def warm_cache() -> None:
+                    with SessionLocal() as db:
+                        products.warm_catalog_cache(db)
+                await run_in_threadpool(warm_cache)
+    except Exception:
+        # Base indisponible au démarrage : l'application démarre, /ready le signale
+        logger.warning("Préchauffage de la base impossible", exc_info=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clé de signature obligatoire : sans elle, le démarrage échoue ici (MissingSecretKeyError)
+    security.get_secret_key()
+    await warm_up()
+    # Libération des réservations de panier expirées, pendant toute la vie du worker
+    sweeper = asyncio.create_task(run_hold_sweeper())
+    yield
+    sweeper.cancel()
+    try:
+        await sweeper
+    except asyncio.CancelledError:
+        pass
+    # Arrêt : fermeture des connexions et des pools de hachage et d'images
+    # (images non traitées : `python -m app.manage process-images`)
+    security.password_hasher.shutdown()
+    image_processor.shutdown()
+    await dispose_engines()
 
-# Inclusion des routeurs
-app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["authentication"])
-app.include_router(users.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
-app.include_router(products.router, prefix=f"{settings.API_V1_STR}/products", tags=["products"])
+# Pool bcrypt ou d'images saturé : rejet immédiat plutôt qu'une file d'attente sans fin
+async def pool_busy_handler(request: Request, exc: Exception):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporairement surchargé, veuillez réessayer"},
+        headers={"Retry-After": "1"},
+    )
 
-@app.get("/")
 def read_root():
     return {"message": "Bienvenue sur l'API E-commerce"}
 
-@app.get("/health")
-def health_check(db: Session = Depends(get_db)):
+def health_check(db: Session = Depends(get_write_db)):
     """
     Vérification de l'état de l'API et de la connexion à la base de données.
     """
     try:
         # Exécuter une requête simple pour vérifier la connexion à la base de données
-        db.execute("SELECT 1")
+        db.execute(text("SELECT 1"))
         db_status = "ok"
     except Exception as e:
         db_status = f"error: {str(e)}"
-    
+
     return {
         "status": "healthy",
         "api_version": "0.1.0",
         "db_connection": db_status
     }
 
+def readiness_check(response: Response):
+    """
+    Vérification que l'API peut servir du trafic : primaire et réplicas joignables,
+    état des pools.
+    """
+    statuses = {}
+    for name, engine in [("primary", get_engine())] + [
+        (f"replica-{index}", replica) for index, replica in enumerate(get_replica_engines(), start=1)
+    ]:
+        try:
+            # Passe par le pool : échoue si aucune connexion n'est disponible à temps
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            statuses[name] = "ok"
+        except Exception as e:
+            statuses[name] = f"error: {str(e)}"
+            response.status_code = 503
+
+    ready = all(status == "ok" for status in statuses.values())
+    body = {
+        "status": "ready" if ready else "unavailable",
+        "db_connection": statuses.pop("primary"),
+        "pools": {name: pool_status(pool) for name, pool in created_pools()},
+    }
+    if statuses:
+        body["replicas"] = statuses
+    return body
+
+def metrics_endpoint():
+    """
+    Métriques au format texte Prometheus : routes, requêtes SQL, pools et cache.
+    """
+    pools = [(name, pool_status(pool)) for name, pool in created_pools()]
+
+    extra = []
+    for key, help_text in (
+        ("checked_out", "Connexions en cours d'utilisation."),
+        ("checked_in", "Connexions disponibles dans le pool."),
+        ("overflow", "Connexions ouvertes au-delà de la taille du pool."),
+        ("timeouts", "Attentes de connexion expirées depuis le démarrage."),
+        ("wait_max_ms", "Attente maximale pour obtenir une connexion (ms)."),
+    ):
+        extra += gauge(
+            f"db_pool_{key}", help_text,
+            (({"pool": name}, status[key]) for name, status in pools if key in status),
+        )
+    cache = catalog_cache.stats()
+    extra += counter(
+        "catalog_cache_requests_total", "Lectures du cache du catalogue.",
+        [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])],
+    )
+    extra += gauge("catalog_cache_size", "Entrées dans le cache du catalogue.", [({}, cache["size"])])
+
+    return PlainTextResponse(metrics.render(extra), media_type="text/plain; version=0.0.4")
+
+# Fabrique de l'application : aucune connexion n'est ouverte avant le démarrage (lifespan)
+def create_app() -> FastAPI:
+    app = FastAPI(
+        title="E-commerce API",
+        description="API REST pour un site de vente d'articles en ligne",
+        version="0.1.0",
+        lifespan=lifespan,
+    )
+
+    # Configuration CORS
+    if settings.BACKEND_CORS_ORIGINS:
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=[str(origin) for origin in settings.BACKEND_CORS_ORIGINS],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+            expose_headers=[NEXT_CURSOR_HEADER],
+        )
+
+    # Lectures sur le primaire juste après une écriture du même client (réplicas configurés)
+    if settings.SQLALCHEMY_REPLICA_URIS or settings.SQLALCHEMY_ASYNC_REPLICA_URIS:
+        app.add_middleware(ReadYourWritesMiddleware)
+
+    # Mesures par route (durée, requêtes SQL) ; ajouté en dernier pour englober les autres
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
+    app.add_exception_handler(HashingBusyError, pool_busy_handler)
+    app.add_exception_handler(ImageProcessingBusyError, pool_busy_handler)
+
+    # Inclusion des routeurs (versions async si DB_ASYNC est activé)
+    if settings.DB_ASYNC:
+        auth_router, users_router, products_router, orders_router, analytics_router, carts_router = (
+            auth_async.router, users_async.router, products_async.router, orders_async.router,
+            analytics_async.router, carts_async.router,
+        )
+    else:
+        auth_router, users_router, products_router, orders_router, analytics_router, carts_router = (
+            auth.router, users.router, products.router, orders.router, analytics.router, carts.router
+        )
+
+    app.include_router(auth_router, prefix=f"{settings.API_V1_STR}/auth", tags=["authentication"])
+    app.include_router(users_router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
+    app.include_router(products_router, prefix=f"{settings.API_V1_STR}/products", tags=["products"])
+    app.include_router(orders_router, prefix=f"{settings.API_V1_STR}/orders", tags=["orders"])
+    app.include_router(carts_router, prefix=f"{settings.API_V1_STR}/cart", tags=["cart"])
+    app.include_router(analytics_router, prefix=f"{settings.API_V1_STR}/analytics", tags=["analytics"])
+
+    app.add_api_route("/", read_root, methods=["GET"])
+    app.add_api_route("/health", health_check, methods=["GET"])
+    app.add_api_route("/ready", readiness_check, methods=["GET"])
+    if settings.METRICS_ENABLED:
+        app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+    # Images des produits (le répertoire est créé au premier téléversement)
+    if settings.MEDIA_SERVE:
+        app.mount(
+            settings.MEDIA_URL,
+            MediaFiles(directory=settings.MEDIA_ROOT, check_dir=False),
+            name="media",
+        )
+
+    return app
+
+# Application utilisée par `uvicorn app.main:app` (ou `uvicorn --factory app.main:create_app`)
+app = create_app()
+
 # En cas d'exécution en tant que script principal
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,72 @@
+"""
+Commandes d'administration de l'application.
+
+    python -m app.manage rebuild-listings   # reconstruit la projection product_listings
+    python -m app.manage process-images     # traite les images restées en attente
+    python -m app.manage rollup-sales       # ajoute les commandes historiques aux agrégats de ventes
+    python -m app.manage release-holds      # libère les réservations de panier expirées
+"""
+import argparse
+
+from app.core.analytics import backfill_sales
+from app.core.carts import release_expired_holds
+from app.core.listings import rebuild_listings
+from app.core.product_images import process_pending_images
+from app.database import SessionLocal
+
+# Fonction pour reconstruire la projection des produits
+def rebuild_listings_command(args: argparse.Namespace) -> None:
+    with SessionLocal() as db:
+        count = rebuild_listings(db, chunk_size=args.chunk_size)
+    print(f"{count} produits projetés")
+
+# Fonction pour traiter les images téléversées dont le traitement a été interrompu
+def process_images_command(args: argparse.Namespace) -> None:
+    with SessionLocal() as db:
+        published, failed = process_pending_images(db)
+    print(f"{published} images publiées, {failed} en échec")
+
+# Fonction pour rattraper les agrégats de ventes sur les commandes existantes
+def rollup_sales_command(args: argparse.Namespace) -> None:
+    with SessionLocal() as db:
+        count = backfill_sales(db, chunk_size=args.chunk_size)
+    print(f"{count} commandes ajoutées aux agrégats de ventes")
+
+# Fonction pour libérer les réservations expirées sans attendre le balayage des workers
+def release_holds_command(args: argparse.Namespace) -> None:
+    with SessionLocal() as db:
+        count = release_expired_holds(db, chunk_size=args.chunk_size)
+    print(f"{count} réservations de panier libérées")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-listings", help="reconstruire la projection product_listings"
+    )
+    rebuild.add_argument("--chunk-size", type=int, default=1000)
+    rebuild.set_defaults(handler=rebuild_listings_command)
+
+    images = commands.add_parser(
+        "process-images", help="traiter les images de produits restées en attente"
+    )
+    images.set_defaults(handler=process_images_command)
+
+    rollup = commands.add_parser(
+        "rollup-sales", help="ajouter les commandes historiques aux agrégats de ventes"
+    )
+    rollup.add_argument("--chunk-size", type=int, default=1000)
+    rollup.set_defaults(handler=rollup_sales_command)
+
+    holds = commands.add_parser(
+        "release-holds", help="libérer les réservations de panier expirées"
+    )
+    holds.add_argument("--chunk-size", type=int, default=500)
+    holds.set_defaults(handler=release_holds_command)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,7 @@
 # app/models/__init__.py
-from app.models.user import User
\ No newline at end of file
+from app.models.user import User
+from app.models.product import (
+    Product, Category, ProductCategory, ProductListing, Order, OrderItem
+)
+from app.models.sales import SalesDaily, SalesProductDaily, SalesCategoryDaily
+from app.models.cart import CartItem, StockHold
\ No newline at end of file
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, DateTime, Index, Integer
+
+from app.database import Base
+
+# Panier côté serveur : chaque ligne réserve sa quantité jusqu'à `expires_at`
+# (CART_HOLD_SECONDS après le dernier ajout ou la dernière modification).
+# Les réservations ouvertes sont additionnées dans stock_holds : la ligne du
+# produit n'est jamais verrouillée par le panier, seulement lue. Pas de clés
+# étrangères : la suppression d'un produit ou d'un utilisateur n'attend pas
+# les paniers, les lignes orphelines expirent comme les autres.
+
+class CartItem(Base):
+    __tablename__ = "cart_items"
+    __table_args__ = (
+        # Balayage des réservations expirées
+        Index("ix_cart_items_expires_at", "expires_at"),
+    )
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    product_id = Column(Integer, primary_key=True, autoincrement=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+class StockHold(Base):
+    # Quantité réservée par produit, en une ligne : les réservations concurrentes
+    # d'un même produit se sérialisent sur son UPDATE conditionnel
+    __tablename__ = "stock_holds"
+
+    product_id = Column(Integer, primary_key=True, autoincrement=False)
+    held = Column(Integer, nullable=False, default=0)
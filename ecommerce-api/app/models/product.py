@@ -1,21 +1,80 @@
-from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, DateTime
+from sqlalchemy import (
+    Boolean, Column, Integer, String, Float, Text, ForeignKey, DateTime, Index, DDL, event, false,
+)
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Index plein texte utilisé par la recherche (MySQL uniquement)
+        Index(
+            "ix_products_name_description_fulltext",
+            "name",
+            "description",
+            mysql_prefix="FULLTEXT",
+        ).ddl_if(dialect="mysql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), index=True, nullable=False)
     description = Column(Text)
-    price = Column(Float, nullable=False)
+    price = Column(Float, nullable=False, index=True)
     stock = Column(Integer, default=0)
     image_url = Column(String(255))
+    # Image téléversée : clé des variantes servies, et clé d'un téléversement en cours de traitement
+    image_key = Column(String(32))
+    pending_image_key = Column(String(32))
+    # Clé (lot:rang) de la ligne d'import qui a créé le produit (voir app.core.product_import)
+    import_key = Column(String(40), index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     created_by = Column(Integer, ForeignKey("users.id"))
 
+    # Les liens sont écrits via ProductCategory : la relation est en lecture seule
+    categories = relationship(
+        "Category",
+        secondary="product_categories",
+        back_populates="products",
+        order_by="Category.id",
+        viewonly=True,
+    )
+
+# Index FTS5 pour la recherche sous SQLite, maintenu par des triggers
+PRODUCTS_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+for statement in PRODUCTS_FTS_DDL:
+    event.listen(
+        Product.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Product.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS products_fts").execute_if(dialect="sqlite"),
+)
+
 class Category(Base):
     __tablename__ = "categories"
     
@@ -23,8 +82,56 @@ class Category(Base):
     name = Column(String(100), index=True, nullable=False)
     description = Column(String(255))
 
+    products = relationship(
+        "Product",
+        secondary="product_categories",
+        back_populates="categories",
+        viewonly=True,
+    )
+
+class ProductListing(Base):
+    """
+    Projection dénormalisée d'un produit pour les lectures du catalogue : la
+    réponse JSON (catégories comprises) et les colonnes de tri et de filtre.
+    Maintenue dans la transaction de chaque écriture par
+    `app.core.listings.refresh_listings` ; pas de clé étrangère, la ligne est
+    retirée dans la même transaction que le produit.
+
+    Le stock est hors du corps JSON (ajouté à la lecture) : une commande ne
+    met à jour que cette colonne, sans recalculer le corps.
+    """
+    __tablename__ = "product_listings"
+    __table_args__ = (
+        # Tri et pagination par clé (sort_key, product_id) ; filtre par prix
+        Index("ix_product_listings_price_product_id", "price", "product_id"),
+        Index("ix_product_listings_name_product_id", "name", "product_id"),
+        Index("ix_product_listings_created_at_product_id", "created_at", "product_id"),
+    )
+
+    product_id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(255), nullable=False)
+    price = Column(Float, nullable=False)
+    stock = Column(Integer)
+    created_at = Column(DateTime(timezone=True))
+    # Date de la dernière modification du corps ou du stock (Last-Modified de la fiche produit)
+    updated_at = Column(DateTime(timezone=True))
+    # Corps JSON au format de schemas.Product (MEDIUMTEXT sous MySQL : la description
+    # seule peut remplir un TEXT)
+    payload = Column(Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=False)
+
 class ProductCategory(Base):
     __tablename__ = "product_categories"
+    __table_args__ = (
+        # Un lien unique par couple ; sert aussi les recherches par produit
+        Index(
+            "uq_product_categories_product_id_category_id",
+            "product_id",
+            "category_id",
+            unique=True,
+        ),
+        # Filtre des produits par catégorie
+        Index("ix_product_categories_category_id_product_id", "category_id", "product_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -32,6 +139,10 @@ class ProductCategory(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Liste des commandes d'un utilisateur, paginée par ID
+        Index("ix_orders_user_id_id", "user_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -39,12 +150,17 @@ class Order(Base):
     status = Column(String(50), default="pending")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Commande comptée dans les agrégats de ventes (sales_*) ; False : à rattraper
+    # par `python -m app.manage rollup-sales`
+    rolled_up = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    items = relationship("OrderItem", order_by="OrderItem.id", viewonly=True)
 
 class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     unit_price = Column(Float, nullable=False)
\ No newline at end of file
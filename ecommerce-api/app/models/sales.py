@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Date, Float, Index, Integer
+
+from app.database import Base
+
+# Agrégats des ventes par jour (date UTC de la commande), maintenus par
+# `app.core.analytics` dans la transaction de chaque commande. Les compteurs
+# sont répartis sur SALES_ROLLUP_SHARDS lignes (numéro de commande modulo) :
+# les commandes simultanées ne se disputent pas une seule ligne ; les rapports
+# additionnent les parts.
+
+class SalesDaily(Base):
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    shard = Column(Integer, primary_key=True, autoincrement=False)
+    orders = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+class SalesProductDaily(Base):
+    # Réparti aussi : les agrégats sont écrits avant la réservation du stock, sans
+    # le verrou de la ligne du produit (voir orders.place_order)
+    __tablename__ = "sales_product_daily"
+    __table_args__ = (
+        # Ventes d'un produit sur une période
+        Index("ix_sales_product_daily_product_id_day", "product_id", "day"),
+    )
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True, autoincrement=False)
+    shard = Column(Integer, primary_key=True, autoincrement=False)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+class SalesCategoryDaily(Base):
+    __tablename__ = "sales_category_daily"
+
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True, autoincrement=False)
+    shard = Column(Integer, primary_key=True, autoincrement=False)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
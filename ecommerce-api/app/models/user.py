@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy.sql import func
 from sqlalchemy.sql.sqltypes import TIMESTAMP
-from sqlalchemy.sql.expression import text
 
 from app.database import Base
 
@@ -13,4 +13,4 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
-    created_at = Column(TIMESTAMP(timezone=True), server_default=text('NOW()'))
\ No newline at end of file
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
\ No newline at end of file
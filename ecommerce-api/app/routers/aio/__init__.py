@@ -0,0 +1,43 @@
+from typing import Any, Callable, Optional, Type
+
+from fastapi import Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.http_cache import json_response
+
+# Exécution d'une route synchrone sur la session asynchrone : la logique est partagée,
+# les entrées/sorties passent par le pilote async via `AsyncSession.run_sync`. Le corps
+# de la route tourne dans la boucle d'événements : ses parties coûteuses (rendu des
+# pages, fichiers téléversés) passent par `app.core.concurrency.run_blocking`.
+async def run_sync_route(
+    db: AsyncSession,
+    route: Callable[..., Any],
+    schema: Optional[Type[BaseModel]] = None,
+    status_code: int = 200,
+    **kwargs: Any,
+) -> Any:
+    def call(session: Session) -> Any:
+        result = route(db=session, **kwargs)
+        # Conversion dans le contexte de la session : aucun chargement paresseux ensuite
+        if schema is None or isinstance(result, (Response, BaseModel)):
+            return result
+        if isinstance(result, list):
+            return [schema.from_orm(item) for item in result]
+        return schema.from_orm(result)
+
+    result = await db.run_sync(call)
+    # Dictionnaires (paniers, rapports) : validés par FastAPI contre response_model
+    if isinstance(result, Response) or (schema is None and not isinstance(result, BaseModel)):
+        return result
+
+    # Encodage JSON dans le pool de threads : pour une route async, FastAPI le ferait
+    # dans la boucle d'événements
+    response = await run_in_threadpool(json_response, result, status_code)
+    # En-têtes posés par la route sur la réponse injectée (curseur de pagination)
+    injected = kwargs.get("response")
+    if isinstance(injected, Response):
+        response.headers.raw.extend(injected.headers.raw)
+    return response
@@ -0,0 +1,80 @@
+from datetime import date
+from typing import Any, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.core.deps import Principal, get_current_active_superuser_async
+from app.database import get_async_read_db
+from app.routers import analytics
+from app.routers.aio import run_sync_route
+
+router = APIRouter()
+
+@router.get("/revenue", response_model=List[schemas.DailySales])
+async def read_daily_revenue(
+    db: AsyncSession = Depends(get_async_read_db),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Chiffre d'affaires, commandes et unités vendues par jour (jours sans vente omis).
+    """
+    return await run_sync_route(
+        db, analytics.read_daily_revenue,
+        date_from=date_from, date_to=date_to, current_user=current_user,
+    )
+
+@router.get("/products", response_model=List[schemas.ProductSales])
+async def read_top_products(
+    db: AsyncSession = Depends(get_async_read_db),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    sort: Literal["units", "revenue"] = "units",
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Produits les plus vendus sur la période (en unités ou en chiffre d'affaires).
+    """
+    return await run_sync_route(
+        db, analytics.read_top_products,
+        date_from=date_from, date_to=date_to, sort=sort, limit=limit, current_user=current_user,
+    )
+
+@router.get("/products/{product_id}", response_model=List[schemas.ProductDailySales])
+async def read_product_sales(
+    *,
+    db: AsyncSession = Depends(get_async_read_db),
+    product_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Unités vendues et chiffre d'affaires d'un produit par jour (jours sans vente omis).
+    """
+    return await run_sync_route(
+        db, analytics.read_product_sales,
+        product_id=product_id, date_from=date_from, date_to=date_to, current_user=current_user,
+    )
+
+@router.get("/categories", response_model=List[schemas.CategorySales])
+async def read_top_categories(
+    db: AsyncSession = Depends(get_async_read_db),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    sort: Literal["units", "revenue"] = "revenue",
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Catégories les plus vendues sur la période. Un produit de plusieurs
+    catégories compte entièrement dans chacune.
+    """
+    return await run_sync_route(
+        db, analytics.read_top_categories,
+        date_from=date_from, date_to=date_to, sort=sort, limit=limit, current_user=current_user,
+    )
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.core import security
+from app.database import get_async_write_db
+from app.models.user import User
+from app.routers.auth import issue_access_token, login_failed_exception
+
+router = APIRouter(tags=["authentication"])
+
+# 🔑 Route de connexion (mode asynchrone)
+@router.post("/login", response_model=schemas.Token)
+async def login_for_access_token(
+    db: AsyncSession = Depends(get_async_write_db),
+    form_data: OAuth2PasswordRequestForm = Depends()
+):
+    user = await db.scalar(select(User).where(User.username == form_data.username))
+    if not user:
+        raise login_failed_exception()
+    
+    # bcrypt est coûteux en CPU : vérification dans le pool dédié, hors de la boucle
+    valid, new_hash = await security.verify_and_update_password_async(
+        form_data.password, user.hashed_password
+    )
+    if not valid:
+        raise login_failed_exception()
+    user_id = user.id
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+
+    return issue_access_token(user_id)
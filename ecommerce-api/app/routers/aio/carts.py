@@ -0,0 +1,100 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.core.deps import Principal, get_current_active_user_async
+from app.database import get_async_read_db, get_async_write_db
+from app.routers import carts
+from app.routers.aio import run_sync_route
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.Cart)
+async def read_cart(
+    db: AsyncSession = Depends(get_async_write_db),
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Récupérer le panier de l'utilisateur connecté.
+    """
+    return await run_sync_route(db, carts.read_cart, current_user=current_user)
+
+@router.post("/items", response_model=schemas.Cart)
+async def add_cart_item(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    item_in: schemas.CartItemCreate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Ajouter un produit au panier (la quantité s'ajoute à celle déjà réservée).
+    """
+    return await run_sync_route(
+        db, carts.add_cart_item, item_in=item_in, current_user=current_user,
+    )
+
+@router.put("/items/{product_id}", response_model=schemas.Cart)
+async def update_cart_item(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    product_id: int,
+    item_in: schemas.CartItemUpdate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Modifier la quantité d'un produit du panier (la réservation est prolongée).
+    """
+    return await run_sync_route(
+        db, carts.update_cart_item,
+        product_id=product_id, item_in=item_in, current_user=current_user,
+    )
+
+@router.delete("/items/{product_id}", response_model=schemas.Cart)
+async def remove_cart_item(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    product_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Retirer un produit du panier et libérer sa réservation.
+    """
+    return await run_sync_route(
+        db, carts.remove_cart_item, product_id=product_id, current_user=current_user,
+    )
+
+@router.delete("/", response_model=schemas.Cart)
+async def clear_cart(
+    db: AsyncSession = Depends(get_async_write_db),
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Vider le panier et libérer toutes ses réservations.
+    """
+    return await run_sync_route(db, carts.clear_cart, current_user=current_user)
+
+@router.post("/checkout", response_model=schemas.Order, status_code=201)
+async def checkout_cart(
+    db: AsyncSession = Depends(get_async_write_db),
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Commander le contenu du panier : le stock réservé par le panier est utilisé,
+    puis le panier est vidé dans la même transaction.
+    """
+    return await run_sync_route(
+        db, carts.checkout_cart, schemas.Order, status_code=201, current_user=current_user,
+    )
+
+@router.get("/availability", response_model=List[schemas.StockAvailability])
+async def read_stock_availability(
+    db: AsyncSession = Depends(get_async_read_db),
+    ids: str = Query(..., description="IDs des produits séparés par des virgules"),
+) -> Any:
+    """
+    Stock disponible des produits : stock moins les quantités réservées par les
+    paniers (les IDs sans produit sont omis).
+    """
+    return await run_sync_route(db, carts.read_stock_availability, ids=ids)
@@ -0,0 +1,62 @@
+from typing import Any, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.core.deps import Principal, get_current_active_user_async
+from app.database import get_async_write_db
+from app.routers import orders
+from app.routers.aio import run_sync_route
+
+router = APIRouter()
+
+@router.post("/", response_model=schemas.Order, status_code=201)
+async def create_order(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    order_in: schemas.OrderCreate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Passer une commande (décrément atomique du stock).
+    """
+    return await run_sync_route(
+        db, orders.create_order, schemas.Order, status_code=201,
+        order_in=order_in, current_user=current_user,
+    )
+
+@router.get("/", response_model=List[schemas.Order])
+async def read_orders(
+    response: Response,
+    db: AsyncSession = Depends(get_async_write_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Literal["id", "created_at"] = "id",
+    order: Literal["asc", "desc"] = "desc",
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Récupérer les commandes de l'utilisateur connecté.
+    """
+    return await run_sync_route(
+        db, orders.read_orders, schemas.Order,
+        response=response, skip=skip, limit=limit, cursor=cursor,
+        sort=sort, order=order, current_user=current_user,
+    )
+
+@router.get("/{order_id}", response_model=schemas.Order)
+async def read_order(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    order_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Récupérer une commande par son ID.
+    """
+    return await run_sync_route(
+        db, orders.read_order, schemas.Order,
+        order_id=order_id, current_user=current_user,
+    )
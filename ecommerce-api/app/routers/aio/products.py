@@ -0,0 +1,264 @@
+from typing import Any, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, File, Query, Request, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.core.cache import catalog_cache
+from app.core.consistency import reads_from_primary
+from app.core.deps import Principal, get_current_active_superuser_async
+from app.core.product_export import aiter_export
+from app.database import get_async_read_db, get_async_write_db
+from app.routers import products
+from app.routers.aio import run_sync_route
+
+router = APIRouter()
+
+@router.get("/cache/stats")
+async def read_cache_stats(
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Statistiques du cache du catalogue (succès, échecs, taille).
+    """
+    return catalog_cache.stats()
+
+@router.get("/export")
+async def export_products(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Exporter tout le catalogue (avec les catégories) en NDJSON ou CSV, en flux.
+    """
+    return products.export_response(
+        aiter_export(format, primary=reads_from_primary(request)), format
+    )
+
+@router.get("/facets", response_model=schemas.ProductFacets)
+async def read_product_facets(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    price_bucket: float = Query(10, gt=0),
+) -> Any:
+    """
+    Compter les produits par catégorie et par tranche de prix.
+    """
+    return await run_sync_route(
+        db, products.read_product_facets,
+        request=request, category_id=category_id, search=search,
+        min_price=min_price, max_price=max_price, price_bucket=price_bucket,
+    )
+
+@router.get("/batch", response_model=schemas.ProductBatch)
+async def read_products_batch(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    ids: str = Query(..., description="IDs des produits séparés par des virgules"),
+) -> Any:
+    """
+    Récupérer plusieurs produits par leurs IDs (paniers, listes d'envies).
+    """
+    return await run_sync_route(
+        db, products.read_products_batch, request=request, ids=ids,
+    )
+
+@router.get("/", response_model=List[schemas.Product])
+async def read_products(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[Literal["relevance", "id", "price", "name", "created_at"]] = None,
+    order: Literal["asc", "desc"] = "asc",
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> Any:
+    """
+    Récupérer tous les produits.
+    """
+    return await run_sync_route(
+        db, products.read_products,
+        request=request, skip=skip, limit=limit, cursor=cursor, sort=sort,
+        order=order, category_id=category_id, search=search,
+        min_price=min_price, max_price=max_price,
+    )
+
+@router.post("/", response_model=schemas.Product)
+async def create_product(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    product_in: schemas.ProductCreate,
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Créer un nouveau produit.
+    """
+    return await run_sync_route(
+        db, products.create_product,
+        product_in=product_in, current_user=current_user,
+    )
+
+@router.get("/{product_id}", response_model=schemas.Product)
+async def read_product(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    product_id: int,
+) -> Any:
+    """
+    Récupérer un produit par son ID.
+    """
+    return await run_sync_route(
+        db, products.read_product, request=request, product_id=product_id,
+    )
+
+@router.put("/{product_id}", response_model=schemas.Product)
+async def update_product(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    product_id: int,
+    product_in: schemas.ProductUpdate,
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Mettre à jour un produit.
+    """
+    return await run_sync_route(
+        db, products.update_product,
+        product_id=product_id, product_in=product_in, current_user=current_user,
+    )
+
+@router.delete("/{product_id}", response_model=schemas.Product)
+async def delete_product(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    product_id: int,
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Supprimer un produit.
+    """
+    return await run_sync_route(
+        db, products.delete_product,
+        product_id=product_id, current_user=current_user,
+    )
+
+@router.post("/{product_id}/image", response_model=schemas.ProductImageUpload, status_code=202)
+async def upload_product_image(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    product_id: int,
+    file: UploadFile = File(...),
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Téléverser l'image d'un produit.
+    """
+    return await run_sync_route(
+        db, products.upload_product_image,
+        product_id=product_id, file=file, current_user=current_user,
+    )
+
+@router.post("/import", response_model=schemas.ProductImportResult)
+async def import_products(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Importer des produits en masse depuis un fichier CSV ou NDJSON.
+    """
+    return await run_sync_route(
+        db, products.import_products,
+        file=file, format=format, current_user=current_user,
+    )
+
+# Routes pour les catégories
+@router.get("/categories/", response_model=List[schemas.Category])
+async def read_categories(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Literal["id", "name"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+) -> Any:
+    """
+    Récupérer toutes les catégories.
+    """
+    return await run_sync_route(
+        db, products.read_categories,
+        request=request, skip=skip, limit=limit, cursor=cursor, sort=sort, order=order,
+    )
+
+@router.post("/categories/", response_model=schemas.Category)
+async def create_category(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    category_in: schemas.CategoryCreate,
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Créer une nouvelle catégorie.
+    """
+    return await run_sync_route(
+        db, products.create_category, schemas.Category,
+        category_in=category_in, current_user=current_user,
+    )
+
+@router.get("/categories/{category_id}", response_model=schemas.Category)
+async def read_category(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    category_id: int,
+) -> Any:
+    """
+    Récupérer une catégorie par son ID.
+    """
+    return await run_sync_route(
+        db, products.read_category, request=request, category_id=category_id,
+    )
+
+@router.put("/categories/{category_id}", response_model=schemas.Category)
+async def update_category(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    category_id: int,
+    category_in: schemas.CategoryUpdate,
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Mettre à jour une catégorie.
+    """
+    return await run_sync_route(
+        db, products.update_category, schemas.Category,
+        category_id=category_id, category_in=category_in, current_user=current_user,
+    )
+
+@router.delete("/categories/{category_id}", response_model=schemas.Category)
+async def delete_category(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    category_id: int,
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Supprimer une catégorie.
+    """
+    return await run_sync_route(
+        db, products.delete_category, schemas.Category,
+        category_id=category_id, current_user=current_user,
+    )
@@ -0,0 +1,86 @@
+from typing import Any, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.core import security
+from app.core.deps import Principal, get_current_active_superuser_async, get_current_active_user_async
+from app.database import get_async_read_db, get_async_write_db
+from app.routers import users
+from app.routers.aio import run_sync_route
+
+router = APIRouter()
+
+@router.get("/", response_model=List[schemas.User])
+async def read_users(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Literal["id", "username", "created_at"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Récupérer tous les utilisateurs.
+    """
+    return await run_sync_route(
+        db, users.read_users, schemas.User,
+        response=response, skip=skip, limit=limit, cursor=cursor,
+        sort=sort, order=order, current_user=current_user,
+    )
+
+@router.get("/{user_id}", response_model=schemas.User)
+async def read_user_by_id(
+    user_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Any:
+    """
+    Récupérer un utilisateur par son ID.
+    """
+    return await run_sync_route(
+        db, users.read_user_by_id, schemas.User,
+        user_id=user_id, current_user=current_user,
+    )
+
+@router.put("/{user_id}", response_model=schemas.User)
+async def update_user(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    user_id: int,
+    user_in: schemas.UserUpdate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Mettre à jour un utilisateur.
+    """
+    user = await db.run_sync(users.get_user_for_update, user_id, current_user)
+    
+    # Hachage dans le pool dédié, sans bloquer la boucle d'événements
+    hashed_password = None
+    if user_in.password:
+        hashed_password = await security.get_password_hash_async(user_in.password)
+    
+    return await db.run_sync(
+        lambda session: schemas.User.from_orm(
+            users.apply_user_update(session, user, user_in, hashed_password)
+        )
+    )
+
+@router.delete("/{user_id}", response_model=schemas.User)
+async def delete_user(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    user_id: int,
+    current_user: Principal = Depends(get_current_active_superuser_async),
+) -> Any:
+    """
+    Supprimer un utilisateur.
+    """
+    return await run_sync_route(
+        db, users.delete_user, schemas.User,
+        user_id=user_id, current_user=current_user,
+    )
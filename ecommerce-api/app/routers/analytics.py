@@ -0,0 +1,172 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, List, Literal, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.config import settings
+from app.core.deps import Principal, get_current_active_superuser
+from app.database import get_read_db
+
+# Rapports lus dans les agrégats sales_* (jamais dans orders / order_items) :
+# le coût dépend du nombre de jours demandés, pas de l'historique des commandes
+
+router = APIRouter()
+
+# Période d'un rapport, bornes incluses : par défaut les ANALYTICS_DEFAULT_DAYS derniers jours
+def _period(date_from: Optional[date], date_to: Optional[date]) -> Tuple[date, date]:
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(days=settings.ANALYTICS_DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=400,
+            detail="Période invalide : date_from est postérieure à date_to"
+        )
+    if (date_to - date_from).days >= settings.ANALYTICS_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Période limitée à {settings.ANALYTICS_MAX_DAYS} jours"
+        )
+    return date_from, date_to
+
+# Montant arrondi au centime (sommes de flottants)
+def _amount(value: float) -> Decimal:
+    return round(Decimal(str(value or 0)), 2)
+
+@router.get("/revenue", response_model=List[schemas.DailySales])
+def read_daily_revenue(
+    db: Session = Depends(get_read_db),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_user: Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Chiffre d'affaires, commandes et unités vendues par jour (jours sans vente omis).
+    """
+    date_from, date_to = _period(date_from, date_to)
+    rows = (
+        db.query(
+            models.SalesDaily.day,
+            func.sum(models.SalesDaily.orders).label("orders"),
+            func.sum(models.SalesDaily.units).label("units"),
+            func.sum(models.SalesDaily.revenue).label("revenue"),
+        )
+        .filter(models.SalesDaily.day.between(date_from, date_to))
+        .group_by(models.SalesDaily.day)
+        .order_by(models.SalesDaily.day)
+    )
+    return [
+        {"day": row.day, "orders": row.orders, "units": row.units, "revenue": _amount(row.revenue)}
+        for row in rows
+    ]
+
+@router.get("/products", response_model=List[schemas.ProductSales])
+def read_top_products(
+    db: Session = Depends(get_read_db),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    sort: Literal["units", "revenue"] = "units",
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Produits les plus vendus sur la période (en unités ou en chiffre d'affaires).
+    """
+    date_from, date_to = _period(date_from, date_to)
+    units = func.sum(models.SalesProductDaily.units).label("units")
+    revenue = func.sum(models.SalesProductDaily.revenue).label("revenue")
+    rows = (
+        db.query(models.SalesProductDaily.product_id, units, revenue)
+        .filter(models.SalesProductDaily.day.between(date_from, date_to))
+        .group_by(models.SalesProductDaily.product_id)
+        .order_by((units if sort == "units" else revenue).desc(), models.SalesProductDaily.product_id)
+        .limit(limit)
+        .all()
+    )
+    names = dict(
+        db.query(models.Product.id, models.Product.name)
+        .filter(models.Product.id.in_([row.product_id for row in rows]))
+        .all()
+    ) if rows else {}
+    return [
+        {
+            "product_id": row.product_id,
+            "name": names.get(row.product_id),
+            "units": row.units,
+            "revenue": _amount(row.revenue),
+        }
+        for row in rows
+    ]
+
+@router.get("/products/{product_id}", response_model=List[schemas.ProductDailySales])
+def read_product_sales(
+    *,
+    db: Session = Depends(get_read_db),
+    product_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_user: Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Unités vendues et chiffre d'affaires d'un produit par jour (jours sans vente omis).
+    """
+    date_from, date_to = _period(date_from, date_to)
+    rows = (
+        db.query(
+            models.SalesProductDaily.day,
+            func.sum(models.SalesProductDaily.units).label("units"),
+            func.sum(models.SalesProductDaily.revenue).label("revenue"),
+        )
+        .filter(
+            models.SalesProductDaily.product_id == product_id,
+            models.SalesProductDaily.day.between(date_from, date_to),
+        )
+        .group_by(models.SalesProductDaily.day)
+        .order_by(models.SalesProductDaily.day)
+    )
+    return [
+        {"day": row.day, "units": row.units, "revenue": _amount(row.revenue)}
+        for row in rows
+    ]
+
+@router.get("/categories", response_model=List[schemas.CategorySales])
+def read_top_categories(
+    db: Session = Depends(get_read_db),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    sort: Literal["units", "revenue"] = "revenue",
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Catégories les plus vendues sur la période. Un produit de plusieurs
+    catégories compte entièrement dans chacune.
+    """
+    date_from, date_to = _period(date_from, date_to)
+    units = func.sum(models.SalesCategoryDaily.units).label("units")
+    revenue = func.sum(models.SalesCategoryDaily.revenue).label("revenue")
+    rows = (
+        db.query(models.SalesCategoryDaily.category_id, units, revenue)
+        .filter(models.SalesCategoryDaily.day.between(date_from, date_to))
+        .group_by(models.SalesCategoryDaily.category_id)
+        .order_by((units if sort == "units" else revenue).desc(), models.SalesCategoryDaily.category_id)
+        .limit(limit)
+        .all()
+    )
+    names = dict(
+        db.query(models.Category.id, models.Category.name)
+        .filter(models.Category.id.in_([row.category_id for row in rows]))
+        .all()
+    ) if rows else {}
+    return [
+        {
+            "category_id": row.category_id,
+            "name": names.get(row.category_id),
+            "units": row.units,
+            "revenue": _amount(row.revenue),
+        }
+        for row in rows
+    ]
@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from app import schemas
 from app.core import security
 from app.core.config import settings
-from app.database import get_db
+from app.database import get_write_db
 from app.models.user import User
 
 router = APIRouter(tags=["authentication"])
@@ -16,27 +16,40 @@ def authenticate_user(db: Session, username: str, password: str):
     user = db.query(User).filter(User.username == username).first()
     if not user:
         return None
-    if not security.verify_password(password, user.hashed_password):
+    valid, new_hash = security.verify_and_update_password(password, user.hashed_password)
+    if not valid:
         return None
+    # Le coût bcrypt configuré a changé : le hash est recalculé de façon transparente
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
     return user
 
+# ❌ Exception en cas d'identifiants invalides
+def login_failed_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Nom d'utilisateur ou mot de passe incorrect",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+# 🎟️ Création du token d'accès d'un utilisateur authentifié
+def issue_access_token(user_id: int) -> dict:
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = security.create_access_token(
+         subject=str(user_id), expires_delta=access_token_expires
+    )
+
+    return {"access_token": access_token, "token_type": "bearer"}
+
 # 🔑 Route de connexion
 @router.post("/login", response_model=schemas.Token)
 def login_for_access_token(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     user = authenticate_user(db, form_data.username, form_data.password)
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Nom d'utilisateur ou mot de passe incorrect",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-         subject=str(user.id), expires_delta=access_token_expires
-    )
+        raise login_failed_exception()
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    return issue_access_token(user.id)
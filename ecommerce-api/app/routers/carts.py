@@ -0,0 +1,253 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.carts import held_quantities, release_cart_items, reserve_hold, shift_holds
+from app.core.config import settings
+from app.core.deps import Principal, get_current_active_user
+from app.database import get_read_db, get_write_db
+from app.routers.orders import forget_ordered_products, get_order, place_order
+from app.routers.products import parse_product_ids
+
+# Chaque ligne du panier réserve sa quantité pendant CART_HOLD_SECONDS (voir
+# app.models.cart). Ajout et retrait lisent le stock du produit sans verrouiller
+# sa ligne : la réservation est un UPDATE conditionnel de la ligne du produit
+# dans stock_holds (voir reserve_hold), seule ligne verrouillée avec celles du panier.
+
+router = APIRouter()
+
+# Fonction pour sérialiser les modifications du panier d'un utilisateur (ligne users verrouillée)
+def _lock_cart(db: Session, user_id: int) -> None:
+    db.query(models.User.id).filter(models.User.id == user_id).with_for_update().first()
+
+# Fonction pour lire le panier d'un utilisateur avec le nom et le prix actuels des produits
+def _read_cart(db: Session, user_id: int) -> Dict[str, Any]:
+    rows = (
+        db.query(
+            models.CartItem.product_id,
+            models.CartItem.quantity,
+            models.CartItem.expires_at,
+            models.Product.name,
+            models.Product.price,
+        )
+        .outerjoin(models.Product, models.Product.id == models.CartItem.product_id)
+        .filter(models.CartItem.user_id == user_id)
+        .order_by(models.CartItem.product_id)
+        .all()
+    )
+    items = [
+        {
+            "product_id": row.product_id,
+            "name": row.name,
+            "price": Decimal(str(row.price)) if row.price is not None else None,
+            "quantity": row.quantity,
+            "expires_at": row.expires_at,
+        }
+        for row in rows
+    ]
+    return {
+        "items": items,
+        "total": sum(
+            (item["price"] * item["quantity"] for item in items if item["price"] is not None),
+            Decimal(0),
+        ),
+        "expires_at": min((item["expires_at"] for item in items), default=None),
+    }
+
+# Fonction pour fixer la quantité d'une ligne du panier et ajuster sa réservation
+def _set_item(db: Session, user_id: int, product_id: int, quantity: int, add: bool = False) -> None:
+    _lock_cart(db, user_id)
+    # Ligne verrouillée : un balayage en cours la saute au lieu de la supprimer
+    item = (
+        db.query(models.CartItem)
+        .filter(models.CartItem.user_id == user_id, models.CartItem.product_id == product_id)
+        .with_for_update()
+        .first()
+    )
+    previous = item.quantity if item else 0
+    if add:
+        quantity += previous
+
+    if item is None:
+        count = (
+            db.query(func.count(models.CartItem.product_id))
+            .filter(models.CartItem.user_id == user_id)
+            .scalar()
+        )
+        if count >= settings.CART_MAX_ITEMS:
+            db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail=f"Panier limité à {settings.CART_MAX_ITEMS} produits différents"
+            )
+
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.CART_HOLD_SECONDS)
+    if item is None:
+        db.add(models.CartItem(
+            user_id=user_id, product_id=product_id, quantity=quantity, expires_at=expires_at
+        ))
+    else:
+        item.quantity = quantity
+        item.expires_at = expires_at
+    # Une diminution est toujours acceptée, même si le stock a baissé depuis l'ajout
+    if quantity <= previous:
+        shift_holds(db, {product_id: quantity - previous})
+        db.commit()
+        return
+
+    # Lecture simple : la ligne du produit n'est pas verrouillée
+    stock = (
+        db.query(func.coalesce(models.Product.stock, 0))
+        .filter(models.Product.id == product_id)
+        .scalar()
+    )
+    if stock is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Produit non trouvé")
+    if not reserve_hold(db, product_id, quantity - previous, stock):
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Stock insuffisant", "product_ids": [product_id]},
+        )
+    db.commit()
+
+@router.get("/", response_model=schemas.Cart)
+def read_cart(
+    db: Session = Depends(get_write_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Récupérer le panier de l'utilisateur connecté.
+    """
+    return _read_cart(db, current_user.id)
+
+@router.post("/items", response_model=schemas.Cart)
+def add_cart_item(
+    *,
+    db: Session = Depends(get_write_db),
+    item_in: schemas.CartItemCreate,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Ajouter un produit au panier (la quantité s'ajoute à celle déjà réservée).
+    """
+    _set_item(db, current_user.id, item_in.product_id, item_in.quantity, add=True)
+    return _read_cart(db, current_user.id)
+
+@router.put("/items/{product_id}", response_model=schemas.Cart)
+def update_cart_item(
+    *,
+    db: Session = Depends(get_write_db),
+    product_id: int,
+    item_in: schemas.CartItemUpdate,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Modifier la quantité d'un produit du panier (la réservation est prolongée).
+    """
+    _set_item(db, current_user.id, product_id, item_in.quantity)
+    return _read_cart(db, current_user.id)
+
+@router.delete("/items/{product_id}", response_model=schemas.Cart)
+def remove_cart_item(
+    *,
+    db: Session = Depends(get_write_db),
+    product_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retirer un produit du panier et libérer sa réservation.
+    """
+    _lock_cart(db, current_user.id)
+    quantity = (
+        db.query(models.CartItem.quantity)
+        .filter(models.CartItem.user_id == current_user.id, models.CartItem.product_id == product_id)
+        .with_for_update()
+        .scalar()
+    )
+    if quantity is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Produit absent du panier")
+    release_cart_items(db, current_user.id, {product_id: quantity})
+    db.commit()
+    return _read_cart(db, current_user.id)
+
+@router.delete("/", response_model=schemas.Cart)
+def clear_cart(
+    db: Session = Depends(get_write_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Vider le panier et libérer toutes ses réservations.
+    """
+    _lock_cart(db, current_user.id)
+    items = dict(
+        db.query(models.CartItem.product_id, models.CartItem.quantity)
+        .filter(models.CartItem.user_id == current_user.id)
+        .with_for_update()
+        .all()
+    )
+    release_cart_items(db, current_user.id, items)
+    db.commit()
+    return _read_cart(db, current_user.id)
+
+@router.post("/checkout", response_model=schemas.Order, status_code=201)
+def checkout_cart(
+    db: Session = Depends(get_write_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Commander le contenu du panier : le stock réservé par le panier est utilisé,
+    puis le panier est vidé dans la même transaction.
+    """
+    _lock_cart(db, current_user.id)
+    items = dict(
+        db.query(models.CartItem.product_id, models.CartItem.quantity)
+        .filter(models.CartItem.user_id == current_user.id)
+        .order_by(models.CartItem.product_id)
+        .with_for_update()
+        .all()
+    )
+    if not items:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Panier vide")
+
+    # Lignes expirées mais pas encore balayées : leur réservation compte toujours
+    order = place_order(db, current_user.id, items, own_holds=items)
+    release_cart_items(db, current_user.id, items)
+    db.commit()
+    forget_ordered_products(items)
+
+    return get_order(db, order.id)
+
+@router.get("/availability", response_model=List[schemas.StockAvailability])
+def read_stock_availability(
+    db: Session = Depends(get_read_db),
+    ids: str = Query(..., description="IDs des produits séparés par des virgules"),
+) -> Any:
+    """
+    Stock disponible des produits : stock moins les quantités réservées par les
+    paniers (les IDs sans produit sont omis).
+    """
+    product_ids = parse_product_ids(ids)
+    stocks = dict(
+        db.query(models.Product.id, func.coalesce(models.Product.stock, 0))
+        .filter(models.Product.id.in_(product_ids))
+        .all()
+    )
+    held = held_quantities(db, stocks)
+    return [
+        {
+            "product_id": product_id,
+            "stock": stocks[product_id],
+            "held": held.get(product_id, 0),
+            "available": max(stocks[product_id] - held.get(product_id, 0), 0),
+        }
+        for product_id in product_ids if product_id in stocks
+    ]
@@ -0,0 +1,230 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from app import models, schemas
+from app.core.analytics import rollup_orders, sales_day
+from app.core.cache import catalog_cache
+from app.core.carts import held_quantities
+from app.core.deps import Principal, get_current_active_user
+from app.core.listings import decrement_listing_stock
+from app.core.pagination import paginate, set_next_cursor
+from app.database import get_write_db
+
+router = APIRouter()
+
+# Colonnes de tri autorisées pour la pagination par clé
+ORDER_SORT_COLUMNS = {
+    "id": models.Order.id,
+    "created_at": models.Order.created_at,
+}
+
+# Fonction pour regrouper les lignes d'une commande par produit, triées par ID
+def _merge_lines(items: List[schemas.OrderItemCreate]) -> Dict[int, int]:
+    quantities: Dict[int, int] = defaultdict(int)
+    for item in items:
+        quantities[item.product_id] += item.quantity
+    return dict(sorted(quantities.items()))
+
+# Fonction pour décrémenter le stock de toutes les lignes en une seule requête
+def _reserve_stock(
+    db: Session, quantities: Dict[int, int], own_holds: Optional[Dict[int, int]] = None
+) -> bool:
+    """
+    UPDATE conditionnel unique : la ligne n'est modifiée que si son stock suffit.
+    Les lignes sont verrouillées dans l'ordre de la clé primaire (ordre fixe),
+    ce qui évite les interblocages entre commandes concurrentes.
+
+    Le stock réservé par les paniers (stock_holds) n'est pas disponible, sauf
+    la part réservée par le panier commandé (`own_holds`).
+    """
+    quantity = case(quantities, value=models.Product.id)
+    required = quantity + _held_stock()
+    if own_holds:
+        required = required - case(own_holds, value=models.Product.id, else_=0)
+    result = db.execute(
+        update(models.Product)
+        .where(models.Product.id.in_(list(quantities)))
+        .where(models.Product.stock >= required)
+        .values(stock=models.Product.stock - quantity)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == len(quantities)
+
+# Fonction pour la quantité réservée par les paniers sur la ligne produit courante (sous-requête)
+def _held_stock():
+    return func.coalesce(
+        select(models.StockHold.held)
+        .where(models.StockHold.product_id == models.Product.id)
+        .scalar_subquery(),
+        0,
+    )
+
+# Fonction pour expliquer l'échec d'une réservation (produit absent ou stock insuffisant)
+def _reservation_error(
+    db: Session, quantities: Dict[int, int], own_holds: Optional[Dict[int, int]] = None
+) -> HTTPException:
+    stocks = dict(
+        db.query(models.Product.id, func.coalesce(models.Product.stock, 0))
+        .filter(models.Product.id.in_(list(quantities)))
+        .all()
+    )
+    missing = [product_id for product_id in quantities if product_id not in stocks]
+    if missing:
+        return HTTPException(
+            status_code=404,
+            detail=f"Produit avec l'ID {missing[0]} non trouvé",
+        )
+    held = held_quantities(db, quantities)
+    own_holds = own_holds or {}
+    unavailable = [
+        product_id for product_id, quantity in quantities.items()
+        if stocks[product_id] - held.get(product_id, 0) + own_holds.get(product_id, 0) < quantity
+    ]
+    return HTTPException(
+        status_code=409,
+        detail={"message": "Stock insuffisant", "product_ids": unavailable},
+    )
+
+def place_order(
+    db: Session,
+    user_id: int,
+    quantities: Dict[int, int],
+    own_holds: Optional[Dict[int, int]] = None,
+) -> models.Order:
+    """
+    Enregistre une commande dans la transaction en cours (commit par l'appelant).
+
+    Les lignes disputées par les commandes d'un même produit (produit,
+    projection) sont verrouillées en dernier, juste avant le commit : commande
+    et agrégats de ventes (répartis) sont écrits avant la réservation du stock.
+    Les lignes de commande sont insérées après : leur clé étrangère verrouille
+    le produit en partage, et deux commandes du même produit s'interbloqueraient
+    en demandant ensuite le verrou exclusif.
+    """
+    # Prix lus sans verrou, au début de la commande
+    prices = dict(
+        db.query(models.Product.id, models.Product.price)
+        .filter(models.Product.id.in_(list(quantities)))
+        .all()
+    )
+    if len(prices) < len(quantities):
+        db.rollback()
+        raise _reservation_error(db, quantities, own_holds)
+
+    # Date fixée par la base (même now() que la valeur par défaut de la colonne) : le jour des
+    # agrégats de ventes en est tiré. Sur MySQL (pas de RETURNING), l'ID vient de lastrowid au
+    # flush et la date est relue par un SELECT au premier accès, dans la même transaction ;
+    # les bases avec RETURNING (SQLite, PostgreSQL) renvoient les deux avec l'INSERT
+    order = models.Order(
+        user_id=user_id,
+        total_amount=sum(prices[product_id] * quantity for product_id, quantity in quantities.items()),
+        status="pending",
+        created_at=func.now(),
+        rolled_up=True,
+    )
+    db.add(order)
+    db.flush()
+
+    lines = [
+        (order.id, product_id, quantity, prices[product_id])
+        for product_id, quantity in quantities.items()
+    ]
+    # Agrégats de ventes mis à jour dans la même transaction que la commande
+    rollup_orders(db, [(order.id, sales_day(order.created_at), order.total_amount)], lines)
+
+    if not _reserve_stock(db, quantities, own_holds):
+        db.rollback()
+        raise _reservation_error(db, quantities, own_holds)
+
+    db.execute(
+        insert(models.OrderItem),
+        [
+            {"order_id": order_id, "product_id": product_id, "quantity": quantity, "unit_price": unit_price}
+            for order_id, product_id, quantity, unit_price in lines
+        ],
+    )
+    # Seul le stock de la projection change : une requête, sans recalcul des corps
+    decrement_listing_stock(db, quantities)
+    return order
+
+# Fonction pour invalider le cache après le commit d'une commande
+def forget_ordered_products(product_ids: Iterable[int]) -> None:
+    # Seules les fiches produit sont invalidées : les listes suivent le TTL du cache
+    # pour ne pas être vidées à chaque commande sur un produit très demandé
+    for product_id in product_ids:
+        catalog_cache.delete(("product", product_id))
+
+# Fonction pour récupérer une commande avec ses lignes
+def get_order(db: Session, order_id: int) -> Optional[models.Order]:
+    return (
+        db.query(models.Order)
+        .options(selectinload(models.Order.items))
+        .filter(models.Order.id == order_id)
+        .first()
+    )
+
+@router.post("/", response_model=schemas.Order, status_code=201)
+def create_order(
+    *,
+    db: Session = Depends(get_write_db),
+    order_in: schemas.OrderCreate,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Passer une commande (décrément atomique du stock).
+    """
+    quantities = _merge_lines(order_in.items)
+    order = place_order(db, current_user.id, quantities)
+    db.commit()
+    forget_ordered_products(quantities)
+
+    return get_order(db, order.id)
+
+@router.get("/", response_model=List[schemas.Order])
+def read_orders(
+    response: Response,
+    db: Session = Depends(get_write_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Literal["id", "created_at"] = "id",
+    order: Literal["asc", "desc"] = "desc",
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Récupérer les commandes de l'utilisateur connecté.
+    """
+    orders, next_cursor = paginate(
+        db.query(models.Order)
+        .options(selectinload(models.Order.items))
+        .filter(models.Order.user_id == current_user.id),
+        sort_column=ORDER_SORT_COLUMNS[sort],
+        id_column=models.Order.id,
+        sort=sort,
+        order=order,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+    set_next_cursor(response, next_cursor)
+    return orders
+
+@router.get("/{order_id}", response_model=schemas.Order)
+def read_order(
+    *,
+    db: Session = Depends(get_write_db),
+    order_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Récupérer une commande par son ID.
+    """
+    order = get_order(db, order_id)
+    # Les commandes des autres utilisateurs sont masquées (sauf administrateur)
+    if not order or (order.user_id != current_user.id and not current_user.is_superuser):
+        raise HTTPException(status_code=404, detail="Commande non trouvée")
+    return order
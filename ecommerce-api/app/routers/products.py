@@ -1,19 +1,502 @@
-from typing import Any, List, Optional
+import csv
+import secrets
+import shutil
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Literal, Optional, Set
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Integer, case, cast, func, insert
+from sqlalchemy.orm import Session
 
 from app import models, schemas
-from app.core.deps import get_current_active_user, get_current_active_superuser
-from app.database import get_db
+from app.core.cache import MISSING, catalog_cache
+from app.core.config import settings
+from app.core.concurrency import run_blocking
+from app.core.consistency import last_write_at, reads_from_primary
+from app.core.deps import Principal, get_current_active_user, get_current_active_superuser
+from app.core.http_cache import (
+    Representation, conditional_response, dumps, json_response, latest_modification, render,
+    render_body,
+)
+from app.core.images import (
+    IMAGE_CONTENT_TYPES, ImageProcessingBusyError, ImageTooLargeError, InvalidImageError,
+    image_urls, product_image_dir, save_upload,
+)
+from app.core.listings import (
+    CATEGORY_COLUMNS, PRODUCT_COLUMNS, category_payload, category_product_ids, listing_body,
+    product_payloads, refresh_listings,
+)
+from app.core.pagination import NEXT_CURSOR_HEADER, paginate
+from app.core.product_export import iter_export
+from app.core.product_images import apply_product_image, submit_product_image
+from app.core.product_import import ProductImporter, iter_csv, iter_ndjson
+from app.core.search import search_products
+from app.database import get_read_db, get_write_db
 
 router = APIRouter()
 
+# Colonnes de tri autorisées pour la pagination par clé (projection product_listings)
+PRODUCT_SORT_COLUMNS = {
+    "id": models.ProductListing.product_id,
+    "price": models.ProductListing.price,
+    "name": models.ProductListing.name,
+    "created_at": models.ProductListing.created_at,
+}
+
+# Colonnes lues pour une page de produits : le corps JSON est déjà calculé
+LISTING_COLUMNS = (
+    models.ProductListing.product_id,
+    models.ProductListing.name,
+    models.ProductListing.price,
+    models.ProductListing.stock,
+    models.ProductListing.created_at,
+    models.ProductListing.updated_at,
+    models.ProductListing.payload,
+)
+
+CATEGORY_SORT_COLUMNS = {
+    "id": models.Category.id,
+    "name": models.Category.name,
+}
+
+# Lecture d'un produit en tuple (None s'il n'existe pas)
+def _get_product_row(db: Session, product_id: int):
+    return db.query(*PRODUCT_COLUMNS).filter(models.Product.id == product_id).first()
+
+# Réponse d'écriture à partir du corps JSON recalculé par la projection
+def _product_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+# Vérification d'un ensemble de catégories en une requête IN ; retourne les IDs dédoublonnés
+def _check_categories(db: Session, category_ids: List[int]) -> List[int]:
+    wanted = list(dict.fromkeys(category_ids))
+    if not wanted:
+        return wanted
+    
+    found = {
+        category_id
+        for (category_id,) in db.query(models.Category.id).filter(models.Category.id.in_(wanted))
+    }
+    for category_id in wanted:
+        if category_id not in found:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Catégorie avec l'ID {category_id} non trouvée"
+            )
+    return wanted
+
+# Synchronisation des liens produit-catégorie : seules les différences sont écrites
+def _set_product_categories(
+    db: Session,
+    product_id: int,
+    category_ids: List[int],
+    current: Optional[Set[int]] = None,
+) -> None:
+    if current is None:
+        current = {
+            category_id
+            for (category_id,) in db.query(models.ProductCategory.category_id).filter(
+                models.ProductCategory.product_id == product_id
+            )
+        }
+    
+    removed = current - set(category_ids)
+    added = [category_id for category_id in category_ids if category_id not in current]
+    
+    if removed:
+        db.query(models.ProductCategory).filter(
+            models.ProductCategory.product_id == product_id,
+            models.ProductCategory.category_id.in_(removed),
+        ).delete(synchronize_session=False)
+    if added:
+        db.execute(
+            insert(models.ProductCategory),
+            [{"product_id": product_id, "category_id": category_id} for category_id in added],
+        )
+
+# Application des filtres de la liste des produits ; retourne aussi l'expression de pertinence.
+# Les colonnes filtrées sont celles de `products` ou, pour les pages, de `product_listings`.
+def _filter_products(
+    query,
+    *,
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    id_column: Any = models.Product.id,
+    price_column: Any = models.Product.price,
+):
+    # Filtrage par catégorie
+    if category_id:
+        query = query.join(
+            models.ProductCategory, models.ProductCategory.product_id == id_column
+        ).filter(models.ProductCategory.category_id == category_id)
+    
+    # Recherche plein texte sur le nom et la description (index de la table products)
+    rank = None
+    if search:
+        if id_column is not models.Product.id:
+            query = query.join(models.Product, models.Product.id == id_column)
+        query, rank = search_products(query, search)
+    
+    # Filtrage par prix
+    if min_price is not None:
+        query = query.filter(price_column >= min_price)
+    if max_price is not None:
+        query = query.filter(price_column <= max_price)
+    
+    return query, rank
+
+# Corps d'une page de produits : concaténation des corps JSON de la projection
+def _render_products_page(products: List[Any], next_cursor: Optional[str]) -> Representation:
+    # Pas de Last-Modified : une suppression ou un produit qui sort des filtres
+    # change la page sans faire avancer la date d'aucune des lignes renvoyées
+    return render_body(
+        b"[" + b",".join(
+            listing_body(product.payload.encode("utf-8"), product.stock) for product in products
+        ) + b"]",
+        headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None,
+    )
+
+# Lecture d'une page de produits, sérialisée une fois pour pouvoir être mise en cache
+def _list_products(
+    db: Session,
+    *,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    sort: str,
+    order: str,
+    category_id: Optional[int],
+    search: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+) -> Representation:
+    # Une seule lecture de la projection : les corps JSON des produits sont concaténés
+    query, rank = _filter_products(
+        db.query(*LISTING_COLUMNS),
+        category_id=category_id,
+        search=search,
+        min_price=min_price,
+        max_price=max_price,
+        id_column=models.ProductListing.product_id,
+        price_column=models.ProductListing.price,
+    )
+    
+    # Pagination (la pertinence n'est pas une colonne : pas de curseur possible)
+    if sort == "relevance":
+        ordering = [models.ProductListing.product_id]
+        if rank is not None:
+            ordering.insert(0, rank.desc())
+        products = query.order_by(*ordering).offset(skip).limit(limit).all()
+        next_cursor = None
+    else:
+        products, next_cursor = paginate(
+            query,
+            sort_column=PRODUCT_SORT_COLUMNS[sort],
+            id_column=models.ProductListing.product_id,
+            sort=sort,
+            order=order,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+        )
+    
+    return run_blocking(_render_products_page, products, next_cursor)
+
+# Lecture du cache du catalogue. Un client qui vient d'écrire (cookie signé, voir
+# app.core.consistency) n'est servi que par une entrée aux données postérieures à son
+# écriture ; les autres clients voient toutes les entrées.
+def _cached(request: Optional[Request], key: tuple) -> Any:
+    since = last_write_at(request) if request is not None else None
+    return catalog_cache.get(key, since=since)
+
+# Date des données lues à partir de maintenant, pour le cache : une lecture sur un réplica
+# peut manquer les écritures des READ_YOUR_WRITES_SECONDS précédentes
+def _read_freshness(request: Optional[Request]) -> float:
+    if request is None or reads_from_primary(request):
+        return time.time()
+    return time.time() - settings.READ_YOUR_WRITES_SECONDS
+
+# Clé de cache d'une page de produits (mêmes paramètres que la route)
+def _products_cache_key(
+    skip, limit, cursor, sort, order, category_id, search, min_price, max_price
+) -> tuple:
+    return (
+        "products", skip, limit, cursor, sort, order,
+        category_id, search, min_price, max_price,
+    )
+
+# Lecture d'une page de catégories, sérialisée pour le cache
+def _list_categories(
+    db: Session,
+    *,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    sort: str,
+    order: str,
+) -> Representation:
+    categories, next_cursor = paginate(
+        db.query(*CATEGORY_COLUMNS),
+        sort_column=CATEGORY_SORT_COLUMNS[sort],
+        id_column=models.Category.id,
+        sort=sort,
+        order=order,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+    return run_blocking(
+        lambda: render(
+            [category_payload(category) for category in categories],
+            headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None,
+        )
+    )
+
+# Calcul des facettes (catégories, tranches de prix) par requêtes agrégées
+def _product_facets(
+    db: Session,
+    *,
+    category_id: Optional[int],
+    search: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    price_bucket: float,
+) -> Representation:
+    """
+    Chaque facette ignore son propre filtre pour pouvoir proposer les autres
+    valeurs : les catégories sont comptées sans `category_id`, les tranches de
+    prix sans `min_price`/`max_price`. `total` applique tous les filtres.
+    """
+    def matching_ids(**filters):
+        query, _ = _filter_products(db.query(models.Product.id), search=search, **filters)
+        return query.subquery()
+    
+    # Total avec tous les filtres
+    matching = matching_ids(category_id=category_id, min_price=min_price, max_price=max_price)
+    total = db.query(func.count()).select_from(matching).scalar()
+    
+    # Nombre de produits par catégorie
+    in_category = matching_ids(min_price=min_price, max_price=max_price)
+    categories = (
+        db.query(models.Category.id, models.Category.name, func.count(models.ProductCategory.product_id))
+        .join(models.ProductCategory, models.ProductCategory.category_id == models.Category.id)
+        .join(in_category, in_category.c.id == models.ProductCategory.product_id)
+        .group_by(models.Category.id, models.Category.name)
+        .order_by(models.Category.id)
+        .all()
+    )
+    
+    # Histogramme des prix : tranche = partie entière inférieure de prix / largeur
+    # (CAST arrondit sur MySQL ; SQLite n'a FLOOR qu'avec les fonctions mathématiques)
+    in_price = matching_ids(category_id=category_id)
+    ratio = models.Product.price / price_bucket
+    if db.get_bind().dialect.name == "sqlite":
+        truncated = cast(ratio, Integer)
+        bucket = (truncated - case((ratio < truncated, 1), else_=0)).label("bucket")
+    else:
+        bucket = func.floor(ratio).label("bucket")
+    buckets = (
+        db.query(bucket, func.count(models.Product.id))
+        .join(in_price, in_price.c.id == models.Product.id)
+        .group_by(bucket)
+        .order_by(bucket)
+        .all()
+    )
+    
+    # FLOOR d'un flottant reste un flottant (MySQL, PostgreSQL)
+    step = Decimal(str(price_bucket))
+    return run_blocking(lambda: render(schemas.ProductFacets(
+        total=total,
+        categories=[
+            schemas.CategoryFacet(id=facet_id, name=name, count=count)
+            for facet_id, name, count in categories
+        ],
+        price_buckets=[
+            schemas.PriceBucket(min=int(index) * step, max=(int(index) + 1) * step, count=count)
+            for index, count in buckets
+        ],
+    )))
+
+# Représentations de produits par ID, depuis le cache ; les absents du cache sont lus
+# ensemble dans la projection (une requête). Les IDs inconnus n'apparaissent pas dans le résultat.
+def _product_representations(
+    db: Session, product_ids: List[int], request: Optional[Request] = None
+) -> Dict[int, Representation]:
+    representations: Dict[int, Representation] = {}
+    uncached = []
+    for product_id in product_ids:
+        representation = _cached(request, ("product", product_id))
+        if representation is MISSING:
+            uncached.append(product_id)
+        else:
+            representations[product_id] = representation
+    
+    if uncached:
+        version = catalog_cache.snapshot()
+        fresh_as_of = _read_freshness(request)
+        rows = db.query(*LISTING_COLUMNS).filter(
+            models.ProductListing.product_id.in_(uncached)
+        ).all()
+        rendered = run_blocking(lambda: {
+            row.product_id: render_body(
+                listing_body(row.payload.encode("utf-8"), row.stock),
+                last_modified=latest_modification([row]),
+            )
+            for row in rows
+        })
+        for product_id, representation in rendered.items():
+            catalog_cache.set(("product", product_id), representation, version, fresh_as_of)
+            representations[product_id] = representation
+    
+    return representations
+
+# Lecture de la liste d'IDs d'une requête groupée ("3,1,2"), dédoublonnée dans l'ordre
+def parse_product_ids(ids: str) -> List[int]:
+    try:
+        product_ids = [int(value) for value in ids.split(",")]
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Liste d'IDs invalide : entiers séparés par des virgules attendus"
+        )
+    product_ids = list(dict.fromkeys(product_ids))
+    if len(product_ids) > settings.PRODUCT_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Au plus {settings.PRODUCT_BATCH_MAX_IDS} produits par requête"
+        )
+    return product_ids
+
+# Invalidation du cache après une écriture sur un produit
+def _invalidate_product(product_id: int) -> None:
+    catalog_cache.delete(("product", product_id))
+    catalog_cache.invalidate("products", "facets")
+
+# Invalidation du cache après une écriture sur une catégorie (les produits l'embarquent)
+def _invalidate_category(category_id: int) -> None:
+    catalog_cache.delete(("category", category_id))
+    catalog_cache.invalidate("categories", "product", "products", "facets")
+
+# Pré-remplissage du cache avec les premières pages par défaut du catalogue (démarrage)
+def warm_catalog_cache(db: Session) -> None:
+    version = catalog_cache.snapshot()
+    catalog_cache.set(
+        _products_cache_key(0, 100, None, "id", "asc", None, None, None, None),
+        _list_products(
+            db, skip=0, limit=100, cursor=None, sort="id", order="asc",
+            category_id=None, search=None, min_price=None, max_price=None,
+        ),
+        version,
+    )
+    catalog_cache.set(
+        ("categories", 0, 100, None, "id", "asc"),
+        _list_categories(db, skip=0, limit=100, cursor=None, sort="id", order="asc"),
+        version,
+    )
+
+# Réponse en flux d'un export (itérateur sync ou async des morceaux)
+def export_response(chunks: Any, format: str) -> StreamingResponse:
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+@router.get("/cache/stats")
+def read_cache_stats(
+    current_user: Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Statistiques du cache du catalogue (succès, échecs, taille).
+    """
+    return catalog_cache.stats()
+
+@router.get("/export")
+def export_products(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Exporter tout le catalogue (avec les catégories) en NDJSON ou CSV, en flux.
+    """
+    return export_response(iter_export(format, primary=reads_from_primary(request)), format)
+
+@router.get("/facets", response_model=schemas.ProductFacets)
+def read_product_facets(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    price_bucket: float = Query(10, gt=0),
+) -> Any:
+    """
+    Compter les produits par catégorie et par tranche de prix.
+    
+    Accepte les mêmes filtres que la liste des produits ; `price_bucket`
+    fixe la largeur des tranches de l'histogramme des prix.
+    """
+    cache_key = ("facets", category_id, search, min_price, max_price, price_bucket)
+    representation = _cached(request, cache_key)
+    if representation is MISSING:
+        version = catalog_cache.snapshot()
+        fresh_as_of = _read_freshness(request)
+        representation = _product_facets(
+            db,
+            category_id=category_id,
+            search=search,
+            min_price=min_price,
+            max_price=max_price,
+            price_bucket=price_bucket,
+        )
+        catalog_cache.set(cache_key, representation, version, fresh_as_of)
+    
+    return conditional_response(request, representation)
+
+@router.get("/batch", response_model=schemas.ProductBatch)
+def read_products_batch(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    ids: str = Query(..., description="IDs des produits séparés par des virgules"),
+) -> Any:
+    """
+    Récupérer plusieurs produits par leurs IDs (paniers, listes d'envies).
+    
+    Les produits sont renvoyés dans l'ordre des IDs demandés ; les IDs sans
+    produit sont listés dans `missing`. Au plus une requête SQL, quel que
+    soit le nombre d'IDs.
+    """
+    product_ids = parse_product_ids(ids)
+    representations = _product_representations(db, product_ids, request)
+    
+    # Corps assemblé à partir des représentations individuelles (déjà sérialisées)
+    found = [
+        representations[product_id] for product_id in product_ids if product_id in representations
+    ]
+    missing = [product_id for product_id in product_ids if product_id not in representations]
+    body = (
+        b'{"items":[' + b",".join(representation.body for representation in found)
+        + b'],"missing":' + dumps(missing) + b"}"
+    )
+    # Pas de Last-Modified (voir _list_products) : un produit supprimé passe dans `missing`
+    return conditional_response(request, render_body(body))
+
 @router.get("/", response_model=List[schemas.Product])
 def read_products(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[Literal["relevance", "id", "price", "name", "created_at"]] = None,
+    order: Literal["asc", "desc"] = "asc",
     category_id: Optional[int] = None,
     search: Optional[str] = None,
     min_price: Optional[float] = None,
@@ -21,58 +504,63 @@ def read_products(
 ) -> Any:
     """
     Récupérer tous les produits.
-    """
-    query = db.query(models.Product)
     
-    # Filtrage par catégorie
-    if category_id:
-        query = query.join(models.ProductCategory).filter(
-            models.ProductCategory.category_id == category_id
+    Sans `cursor`, la pagination se fait par décalage (`skip`) ; l'en-tête
+    `X-Next-Cursor` permet ensuite de poursuivre par clé (sort_key, id).
+    Avec `search` et sans `sort`, les résultats sont triés par pertinence
+    (nom et description) ; ce tri se pagine par décalage uniquement (400
+    avec `cursor`).
+    """
+    if sort is None:
+        sort = "relevance" if search else "id"
+    if sort == "relevance" and not search:
+        raise HTTPException(
+            status_code=400,
+            detail="Le tri par pertinence nécessite un terme de recherche"
+        )
+    if sort == "relevance" and cursor:
+        raise HTTPException(
+            status_code=400,
+            detail="Le tri par pertinence se pagine par décalage (skip) : curseur non accepté"
         )
     
-    # Recherche par nom
-    if search:
-        query = query.filter(models.Product.name.ilike(f"%{search}%"))
-    
-    # Filtrage par prix
-    if min_price is not None:
-        query = query.filter(models.Product.price >= min_price)
-    if max_price is not None:
-        query = query.filter(models.Product.price <= max_price)
-    
-    # Pagination
-    products = query.offset(skip).limit(limit).all()
-    
-    # Récupération des catégories pour chaque produit
-    result = []
-    for product in products:
-        # Récupération des catégories liées au produit
-        categories = db.query(models.Category).join(
-            models.ProductCategory,
-            models.ProductCategory.category_id == models.Category.id
-        ).filter(
-            models.ProductCategory.product_id == product.id
-        ).all()
-        
-        # Conversion du produit en dictionnaire
-        product_dict = {c.name: getattr(product, c.name) for c in product.__table__.columns}
-        product_dict["categories"] = categories
-        
-        result.append(product_dict)
+    cache_key = _products_cache_key(
+        skip, limit, cursor, sort, order, category_id, search, min_price, max_price
+    )
+    representation = _cached(request, cache_key)
+    if representation is MISSING:
+        version = catalog_cache.snapshot()
+        fresh_as_of = _read_freshness(request)
+        representation = _list_products(
+            db,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            order=order,
+            category_id=category_id,
+            search=search,
+            min_price=min_price,
+            max_price=max_price,
+        )
+        catalog_cache.set(cache_key, representation, version, fresh_as_of)
     
-    return result
+    return conditional_response(request, representation)
 
 @router.post("/", response_model=schemas.Product)
 def create_product(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     product_in: schemas.ProductCreate,
-    current_user: models.User = Depends(get_current_active_superuser),
+    current_user: Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Créer un nouveau produit.
     """
-    # Création du produit
+    # Vérification des catégories avant toute écriture
+    category_ids = _check_categories(db, product_in.category_ids or [])
+    
+    # Création du produit et de ses liens dans une seule transaction
     product = models.Product(
         name=product_in.name,
         description=product_in.description,
@@ -82,81 +570,44 @@ def create_product(
         created_by=current_user.id,
     )
     db.add(product)
-    db.commit()
-    db.refresh(product)
-    
-    # Ajout des catégories si spécifiées
-    if product_in.category_ids:
-        for category_id in product_in.category_ids:
-            # Vérification si la catégorie existe
-            category = db.query(models.Category).filter(models.Category.id == category_id).first()
-            if not category:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Catégorie avec l'ID {category_id} non trouvée"
-                )
-            
-            # Création de la relation produit-catégorie
-            product_category = models.ProductCategory(
-                product_id=product.id,
-                category_id=category_id
-            )
-            db.add(product_category)
-        
-        db.commit()
+    db.flush()
     
-    # Récupération des catégories pour la réponse
-    categories = db.query(models.Category).join(
-        models.ProductCategory,
-        models.ProductCategory.category_id == models.Category.id
-    ).filter(
-        models.ProductCategory.product_id == product.id
-    ).all()
+    _set_product_categories(db, product.id, category_ids, current=set())
+    bodies = refresh_listings(db, [product.id])
+    db.commit()
     
-    # Création de la réponse
-    response = schemas.Product.from_orm(product)
-    response.categories = categories
+    catalog_cache.invalidate("products", "facets")
     
-    return response
+    return _product_response(bodies[product.id])
 
 @router.get("/{product_id}", response_model=schemas.Product)
 def read_product(
     *,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     product_id: int,
 ) -> Any:
     """
     Récupérer un produit par son ID.
     """
-    product = db.query(models.Product).filter(models.Product.id == product_id).first()
+    representations = _product_representations(db, [product_id], request)
+    representation = representations.get(product_id)
     
-    if not product:
+    if representation is None:
         raise HTTPException(
             status_code=404,
             detail="Produit non trouvé"
         )
     
-    # Récupération des catégories pour la réponse
-    categories = db.query(models.Category).join(
-        models.ProductCategory,
-        models.ProductCategory.category_id == models.Category.id
-    ).filter(
-        models.ProductCategory.product_id == product.id
-    ).all()
-    
-    # Création de la réponse
-    response = schemas.Product.from_orm(product)
-    response.categories = categories
-    
-    return response
+    return conditional_response(request, representation)
 
 @router.put("/{product_id}", response_model=schemas.Product)
 def update_product(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     product_id: int,
     product_in: schemas.ProductUpdate,
-    current_user: models.User = Depends(get_current_active_superuser),
+    current_user: Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Mettre à jour un produit.
@@ -169,6 +620,11 @@ def update_product(
             detail="Produit non trouvé"
         )
     
+    # Vérification des catégories avant toute écriture
+    category_ids = None
+    if product_in.category_ids is not None:
+        category_ids = _check_categories(db, product_in.category_ids)
+    
     # Mise à jour des attributs du produit
     if product_in.name is not None:
         product.name = product_in.name
@@ -182,60 +638,29 @@ def update_product(
         product.image_url = product_in.image_url
     
     db.add(product)
-    db.commit()
-    db.refresh(product)
     
-    # Mise à jour des catégories si spécifiées
-    if product_in.category_ids is not None:
-        # Suppression des anciennes relations
-        db.query(models.ProductCategory).filter(
-            models.ProductCategory.product_id == product.id
-        ).delete()
-        
-        # Ajout des nouvelles relations
-        for category_id in product_in.category_ids:
-            # Vérification si la catégorie existe
-            category = db.query(models.Category).filter(models.Category.id == category_id).first()
-            if not category:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Catégorie avec l'ID {category_id} non trouvée"
-                )
-            
-            # Création de la relation produit-catégorie
-            product_category = models.ProductCategory(
-                product_id=product.id,
-                category_id=category_id
-            )
-            db.add(product_category)
-        
-        db.commit()
+    # Mise à jour des catégories si spécifiées (seuls les liens modifiés sont écrits)
+    if category_ids is not None:
+        _set_product_categories(db, product.id, category_ids)
     
-    # Récupération des catégories pour la réponse
-    categories = db.query(models.Category).join(
-        models.ProductCategory,
-        models.ProductCategory.category_id == models.Category.id
-    ).filter(
-        models.ProductCategory.product_id == product.id
-    ).all()
+    bodies = refresh_listings(db, [product.id])
+    db.commit()
     
-    # Création de la réponse
-    response = schemas.Product.from_orm(product)
-    response.categories = categories
+    _invalidate_product(product.id)
     
-    return response
+    return _product_response(bodies[product.id])
 
 @router.delete("/{product_id}", response_model=schemas.Product)
 def delete_product(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     product_id: int,
-    current_user: models.User = Depends(get_current_active_superuser),
+    current_user: Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Supprimer un produit.
     """
-    product = db.query(models.Product).filter(models.Product.id == product_id).first()
+    product = _get_product_row(db, product_id)
     
     if not product:
         raise HTTPException(
@@ -243,36 +668,148 @@ def delete_product(
             detail="Produit non trouvé"
         )
     
+    # La réponse est construite avant la suppression des catégories du produit
+    response = product_payloads(db, [product])[0]
+    
     # Suppression des relations produit-catégorie
     db.query(models.ProductCategory).filter(
-        models.ProductCategory.product_id == product.id
+        models.ProductCategory.product_id == product_id
     ).delete()
     
-    # Suppression du produit
-    db.delete(product)
+    # Suppression du produit et de sa ligne de projection
+    db.query(models.Product).filter(models.Product.id == product_id).delete()
+    refresh_listings(db, [product_id])
+    db.commit()
+    
+    _invalidate_product(product_id)
+    shutil.rmtree(product_image_dir(product_id), ignore_errors=True)
+    
+    return json_response(response)
+
+@router.post("/{product_id}/image", response_model=schemas.ProductImageUpload, status_code=202)
+def upload_product_image(
+    *,
+    db: Session = Depends(get_write_db),
+    product_id: int,
+    file: UploadFile = File(...),
+    current_user: Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Téléverser l'image d'un produit.
+    
+    L'original est enregistré sur le disque ; les variantes redimensionnées sont
+    générées en arrière-plan et apparaissent dans `images` une fois prêtes.
+    """
+    extension = IMAGE_CONTENT_TYPES.get(file.content_type)
+    if extension is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Type d'image non supporté (JPEG, PNG, WebP ou GIF)"
+        )
+    
+    product = db.query(models.Product).filter(models.Product.id == product_id).first()
+    
+    if not product:
+        raise HTTPException(
+            status_code=404,
+            detail="Produit non trouvé"
+        )
+    
+    # Une clé par téléversement : les URL publiées ne changent jamais de contenu
+    key = secrets.token_hex(8)
+    try:
+        source = run_blocking(save_upload, file.file, product_image_dir(product_id, key), extension)
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Un téléversement plus récent remplace celui en cours de traitement
+    product.pending_image_key = key
     db.commit()
     
-    return product
+    try:
+        submit_product_image(product_id, key, source)
+    except ImageProcessingBusyError:
+        # Pool saturé : le téléversement est annulé, le client réessaie (503)
+        apply_product_image(db, product_id, key, processed=False)
+        raise
+    
+    return {"product_id": product_id, "images": image_urls(product_id, key)}
+
+@router.post("/import", response_model=schemas.ProductImportResult)
+def import_products(
+    *,
+    db: Session = Depends(get_write_db),
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    current_user: Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Importer des produits en masse depuis un fichier CSV ou NDJSON.
+    
+    Le fichier est lu en flux et écrit par lots ; les lignes invalides sont
+    signalées avec leur numéro sans interrompre l'import.
+    """
+    if format is None:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".csv") or file.content_type == "text/csv":
+            format = "csv"
+        elif filename.endswith((".ndjson", ".jsonl")) or file.content_type in (
+            "application/x-ndjson", "application/jsonl"
+        ):
+            format = "ndjson"
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail="Format non reconnu : préciser format=csv ou format=ndjson"
+            )
+    
+    rows = iter_csv(file.file) if format == "csv" else iter_ndjson(file.file)
+    importer = ProductImporter(db, created_by=current_user.id)
+    try:
+        importer.add_all(rows)
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Fichier mal encodé ou tronqué : les lignes déjà lues sont conservées
+        importer.abort(f"Fichier illisible : {e}")
+    
+    if importer.created:
+        catalog_cache.invalidate("products", "facets")
+    
+    return importer.result()
 
 # Routes pour les catégories
 @router.get("/categories/", response_model=List[schemas.Category])
 def read_categories(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Literal["id", "name"] = "id",
+    order: Literal["asc", "desc"] = "asc",
 ) -> Any:
     """
     Récupérer toutes les catégories.
     """
-    categories = db.query(models.Category).offset(skip).limit(limit).all()
-    return categories
+    cache_key = ("categories", skip, limit, cursor, sort, order)
+    representation = _cached(request, cache_key)
+    if representation is MISSING:
+        version = catalog_cache.snapshot()
+        fresh_as_of = _read_freshness(request)
+        representation = _list_categories(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort, order=order
+        )
+        catalog_cache.set(cache_key, representation, version, fresh_as_of)
+    
+    return conditional_response(request, representation)
 
 @router.post("/categories/", response_model=schemas.Category)
 def create_category(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     category_in: schemas.CategoryCreate,
-    current_user: models.User = Depends(get_current_active_superuser),
+    current_user: Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Créer une nouvelle catégorie.
@@ -281,34 +818,44 @@ def create_category(
     db.add(category)
     db.commit()
     db.refresh(category)
+    catalog_cache.invalidate("categories")
     return category
 
 @router.get("/categories/{category_id}", response_model=schemas.Category)
 def read_category(
     *,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     category_id: int,
 ) -> Any:
     """
     Récupérer une catégorie par son ID.
     """
-    category = db.query(models.Category).filter(models.Category.id == category_id).first()
-    
-    if not category:
-        raise HTTPException(
-            status_code=404,
-            detail="Catégorie non trouvée"
-        )
+    cache_key = ("category", category_id)
+    representation = _cached(request, cache_key)
+    if representation is MISSING:
+        version = catalog_cache.snapshot()
+        fresh_as_of = _read_freshness(request)
+        category = db.query(*CATEGORY_COLUMNS).filter(models.Category.id == category_id).first()
+        
+        if not category:
+            raise HTTPException(
+                status_code=404,
+                detail="Catégorie non trouvée"
+            )
+        
+        representation = render(category_payload(category))
+        catalog_cache.set(cache_key, representation, version, fresh_as_of)
     
-    return category
+    return conditional_response(request, representation)
 
 @router.put("/categories/{category_id}", response_model=schemas.Category)
 def update_category(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     category_id: int,
     category_in: schemas.CategoryUpdate,
-    current_user: models.User = Depends(get_current_active_superuser),
+    current_user: Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Mettre à jour une catégorie.
@@ -328,17 +875,21 @@ def update_category(
         category.description = category_in.description
     
     db.add(category)
+    # Les produits de la catégorie embarquent son nom et sa description
+    refresh_listings(db, category_product_ids(db, category.id))
     db.commit()
     db.refresh(category)
     
+    _invalidate_category(category.id)
+    
     return category
 
 @router.delete("/categories/{category_id}", response_model=schemas.Category)
 def delete_category(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     category_id: int,
-    current_user: models.User = Depends(get_current_active_superuser),
+    current_user: Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Supprimer une catégorie.
@@ -351,13 +902,20 @@ def delete_category(
             detail="Catégorie non trouvée"
         )
     
-    # Suppression des relations produit-catégorie
+    # La réponse est construite avant la suppression (l'objet est détaché après le commit)
+    response = schemas.Category.from_orm(category)
+    
+    # Suppression des relations produit-catégorie ; les produits concernés sont reprojetés
+    product_ids = category_product_ids(db, category.id)
     db.query(models.ProductCategory).filter(
         models.ProductCategory.category_id == category.id
     ).delete()
     
     # Suppression de la catégorie
     db.delete(category)
+    refresh_listings(db, product_ids)
     db.commit()
     
-    return category
\ No newline at end of file
+    _invalidate_category(category_id)
+    
+    return response
\ No newline at end of file
@@ -1,41 +1,67 @@
-from typing import Any, List
+from typing import Any, List, Literal, Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException
-from fastapi.encoders import jsonable_encoder
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app import models, schemas
-from app.core.deps import get_current_active_superuser, get_current_active_user
+from app.core.deps import (
+    Principal,
+    get_current_active_superuser,
+    get_current_active_user,
+    invalidate_principal,
+)
 from app.core import security
-from app.database import get_db
+from app.core.pagination import paginate, set_next_cursor
+from app.database import get_read_db, get_write_db
 
 router = APIRouter()
 
+# Colonnes de tri autorisées pour la pagination par clé
+USER_SORT_COLUMNS = {
+    "id": models.User.id,
+    "username": models.User.username,
+    "created_at": models.User.created_at,
+}
+
 @router.get("/", response_model=List[schemas.User])
 def read_users(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(get_current_active_superuser),
+    cursor: Optional[str] = None,
+    sort: Literal["id", "username", "created_at"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    current_user: Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Récupérer tous les utilisateurs.
     """
-    users = db.query(models.User).offset(skip).limit(limit).all()
+    users, next_cursor = paginate(
+        db.query(models.User),
+        sort_column=USER_SORT_COLUMNS[sort],
+        id_column=models.User.id,
+        sort=sort,
+        order=order,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+    set_next_cursor(response, next_cursor)
     return users
 
 @router.get("/{user_id}", response_model=schemas.User)
 def read_user_by_id(
     user_id: int,
-    current_user: models.User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db),
 ) -> Any:
     """
     Récupérer un utilisateur par son ID.
     """
     user = db.query(models.User).filter(models.User.id == user_id).first()
     
-    if user == current_user:
+    if user is not None and user.id == current_user.id:
         return user
     
     if not current_user.is_superuser:
@@ -50,17 +76,8 @@ def read_user_by_id(
     
     return user
 
-@router.put("/{user_id}", response_model=schemas.User)
-def update_user(
-    *,
-    db: Session = Depends(get_db),
-    user_id: int,
-    user_in: schemas.UserUpdate,
-    current_user: models.User = Depends(get_current_active_user),
-) -> Any:
-    """
-    Mettre à jour un utilisateur.
-    """
+# Récupération de l'utilisateur à modifier, avec contrôle des droits
+def get_user_for_update(db: Session, user_id: int, current_user: Principal) -> models.User:
     user = db.query(models.User).filter(models.User.id == user_id).first()
     
     if not user:
@@ -73,28 +90,56 @@ def update_user(
             status_code=400, detail="L'utilisateur n'a pas les privilèges suffisants"
         )
     
-    user_data = jsonable_encoder(user)
+    return user
+
+# Application des modifications ; le mot de passe arrive déjà haché (pool bcrypt)
+def apply_user_update(
+    db: Session,
+    user: models.User,
+    user_in: schemas.UserUpdate,
+    hashed_password: Optional[str] = None,
+) -> models.User:
     update_data = user_in.dict(exclude_unset=True)
+    update_data.pop("password", None)
     
-    for field in user_data:
-        if field in update_data:
-            if field == "password" and update_data[field]:
-                setattr(user, "hashed_password", security.get_password_hash(update_data[field]))
-            elif field != "password":
-                setattr(user, field, update_data[field])
+    for field, value in update_data.items():
+        setattr(user, field, value)
+    if hashed_password:
+        user.hashed_password = hashed_password
     
     db.add(user)
     db.commit()
     db.refresh(user)
     
+    invalidate_principal(user.id)
+    
     return user
 
+@router.put("/{user_id}", response_model=schemas.User)
+def update_user(
+    *,
+    db: Session = Depends(get_write_db),
+    user_id: int,
+    user_in: schemas.UserUpdate,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Mettre à jour un utilisateur.
+    """
+    user = get_user_for_update(db, user_id, current_user)
+    
+    hashed_password = None
+    if user_in.password:
+        hashed_password = security.get_password_hash(user_in.password)
+    
+    return apply_user_update(db, user, user_in, hashed_password)
+
 @router.delete("/{user_id}", response_model=schemas.User)
 def delete_user(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     user_id: int,
-    current_user: models.User = Depends(get_current_active_superuser),
+    current_user: Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Supprimer un utilisateur.
@@ -109,4 +154,6 @@ def delete_user(
     db.delete(user)
     db.commit()
     
+    invalidate_principal(user_id)
+    
     return user
\ No newline at end of file
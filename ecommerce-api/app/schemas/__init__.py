@@ -1,4 +1,11 @@
 from app.schemas.token import Token, TokenPayload
 from app.schemas.user import User, UserCreate, UserUpdate, UserInDB
-from app.schemas.product import Product, ProductCreate, ProductUpdate, ProductInDB
-from app.schemas.category import Category, CategoryCreate, CategoryUpdate, CategoryInDB
\ No newline at end of file
+from app.schemas.product import (
+    Product, ProductCreate, ProductUpdate, ProductInDB, ProductBatch,
+    ProductImageUpload, ProductImportError, ProductImportResult, CategoryFacet, PriceBucket,
+    ProductFacets,
+)
+from app.schemas.category import Category, CategoryCreate, CategoryUpdate, CategoryInDB
+from app.schemas.order import Order, OrderCreate, OrderItem, OrderItemCreate
+from app.schemas.analytics import DailySales, ProductSales, ProductDailySales, CategorySales
+from app.schemas.cart import Cart, CartItem, CartItemCreate, CartItemUpdate, StockAvailability
\ No newline at end of file
@@ -0,0 +1,29 @@
+from datetime import date
+from decimal import Decimal
+from pydantic import BaseModel
+from typing import Optional
+
+class DailySales(BaseModel):
+    day: date
+    orders: int
+    units: int
+    revenue: Decimal
+
+class ProductSales(BaseModel):
+    product_id: int
+    # None si le produit a été supprimé depuis
+    name: Optional[str] = None
+    units: int
+    revenue: Decimal
+
+class ProductDailySales(BaseModel):
+    day: date
+    units: int
+    revenue: Decimal
+
+class CategorySales(BaseModel):
+    category_id: int
+    # None si la catégorie a été supprimée depuis
+    name: Optional[str] = None
+    units: int
+    revenue: Decimal
@@ -0,0 +1,33 @@
+from datetime import datetime
+from decimal import Decimal
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class CartItemCreate(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
+
+class CartItemUpdate(BaseModel):
+    quantity: int = Field(..., gt=0)
+
+class CartItem(BaseModel):
+    product_id: int
+    # None si le produit a été supprimé depuis l'ajout au panier
+    name: Optional[str] = None
+    price: Optional[Decimal] = None
+    quantity: int
+    # Fin de la réservation du stock de la ligne
+    expires_at: datetime
+
+class Cart(BaseModel):
+    items: List[CartItem] = []
+    total: Decimal = Decimal(0)
+    # Première réservation à expirer (None si le panier est vide)
+    expires_at: Optional[datetime] = None
+
+class StockAvailability(BaseModel):
+    product_id: int
+    stock: int
+    # Quantité réservée par les paniers
+    held: int
+    available: int
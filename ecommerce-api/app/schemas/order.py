@@ -0,0 +1,31 @@
+from datetime import datetime
+from decimal import Decimal
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class OrderItemCreate(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
+
+class OrderCreate(BaseModel):
+    items: List[OrderItemCreate] = Field(..., min_length=1)
+
+class OrderItem(BaseModel):
+    id: int
+    product_id: int
+    quantity: int
+    unit_price: Decimal
+    
+    class Config:
+        from_attributes = True
+
+class Order(BaseModel):
+    id: int
+    user_id: int
+    total_amount: Decimal
+    status: str
+    created_at: Optional[datetime] = None
+    items: List[OrderItem] = []
+    
+    class Config:
+        from_attributes = True
\ No newline at end of file
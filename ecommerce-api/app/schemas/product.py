@@ -1,23 +1,28 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 from decimal import Decimal
 
+from app.schemas.category import Category
+
 class ProductBase(BaseModel):
     name: str
     description: Optional[str] = None
     price: Decimal
     stock: int = 0
+    image_url: Optional[str] = None
     is_active: bool = True
 
 class ProductCreate(ProductBase):
-    pass
+    category_ids: Optional[List[int]] = None
 
 class ProductUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     price: Optional[Decimal] = None
     stock: Optional[int] = None
+    image_url: Optional[str] = None
     is_active: Optional[bool] = None
+    category_ids: Optional[List[int]] = None
 
 class ProductInDBBase(ProductBase):
     id: int
@@ -26,7 +31,46 @@ class ProductInDBBase(ProductBase):
         from_attributes = True  # Changé de orm_mode à from_attributes
 
 class Product(ProductInDBBase):
-    pass
+    categories: List[Category] = []
+    # URL des variantes de l'image téléversée (nom -> URL), None sans image traitée
+    images: Optional[Dict[str, str]] = None
 
 class ProductInDB(ProductInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+class ProductBatch(BaseModel):
+    # Produits trouvés, dans l'ordre des IDs demandés
+    items: List[Product] = []
+    # IDs demandés sans produit correspondant
+    missing: List[int] = []
+
+class ProductImageUpload(BaseModel):
+    product_id: int
+    # URL des variantes, servies une fois le traitement en arrière-plan terminé
+    images: Dict[str, str]
+
+class ProductImportError(BaseModel):
+    line: int
+    errors: List[str]
+
+class ProductImportResult(BaseModel):
+    created: int
+    failed: int
+    # Limité à IMPORT_MAX_REPORTED_ERRORS entrées
+    errors: List[ProductImportError] = []
+
+class CategoryFacet(BaseModel):
+    id: int
+    name: str
+    count: int
+
+class PriceBucket(BaseModel):
+    # Intervalle [min, max[
+    min: Decimal
+    max: Decimal
+    count: int
+
+class ProductFacets(BaseModel):
+    total: int
+    categories: List[CategoryFacet] = []
+    price_buckets: List[PriceBucket] = []
\ No newline at end of file
@@ -0,0 +1,368 @@
+"""
+Banc d'essai des routes de l'API (auth, users, products, orders).
+
+Une base est créée par les migrations et remplie selon les tailles demandées,
+puis chaque scénario est mesuré de deux façons :
+
+- en processus (TestClient, requêtes séquentielles) : latences et nombre de
+  requêtes SQL par requête HTTP ;
+- en HTTP, contre un serveur uvicorn lancé pour l'occasion, par un générateur
+  de charge concurrent (connexions persistantes, un thread par client).
+
+Pour chaque scénario : p50/p95/p99 (ms), débit (req/s) et réponses en erreur.
+Les résultats sont enregistrés en JSON et peuvent être comparés à un run
+précédent :
+
+    python -m benchmarks.bench_api --products 20000 --json avant.json
+    python -m benchmarks.bench_api --products 20000 --json apres.json --compare avant.json
+    python -m benchmarks.bench_api --mode inprocess --scenarios products.list products.get
+
+Sans --database-url, une base SQLite temporaire est utilisée. Une base
+indiquée est vidée puis recréée : ne jamais viser une base réelle.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import quote, urlencode
+
+from benchmarks import seed
+
+PASSWORD = "motdepasse123"
+API = "/api/v1"
+
+# Scénarios : (nom, rôle, méthode, fonction rng -> (chemin, corps JSON ou formulaire))
+# Rôle : None (anonyme), "user" (utilisateur 2) ou "admin" (utilisateur 1)
+def _scenarios(sizes):
+    products, categories, users = sizes["products"], sizes["categories"], sizes["users"]
+
+    def product_id(rng):
+        return rng.randint(1, products)
+
+    # Début d'une période de rapport se terminant aujourd'hui (date UTC)
+    def since(days):
+        return (datetime.utcnow().date() - timedelta(days=days - 1)).isoformat()
+
+    return [
+        ("auth.login", None, "POST", lambda rng: (
+            f"{API}/auth/login", {"form": {"username": f"user{rng.randint(2, users)}", "password": PASSWORD}}
+        )),
+        ("users.list", "admin", "GET", lambda rng: (f"{API}/users/?limit=50", None)),
+        ("users.get", "admin", "GET", lambda rng: (f"{API}/users/{rng.randint(1, users)}", None)),
+        ("products.list", None, "GET", lambda rng: (f"{API}/products/?limit=50", None)),
+        ("products.list_offset", None, "GET", lambda rng: (
+            f"{API}/products/?limit=50&skip={rng.randint(0, max(products - 50, 0))}", None
+        )),
+        ("products.list_category", None, "GET", lambda rng: (
+            f"{API}/products/?limit=50&category_id={rng.randint(1, categories)}", None
+        )),
+        ("products.list_price", None, "GET", lambda rng: (
+            f"{API}/products/?limit=50&min_price={rng.randint(0, 900)}&max_price=1000&sort=price", None
+        )),
+        ("products.search", None, "GET", lambda rng: (
+            f"{API}/products/?limit=20&search={quote(rng.choice(seed.WORDS))}", None
+        )),
+        ("products.facets", None, "GET", lambda rng: (
+            f"{API}/products/facets?category_id={rng.randint(1, categories)}", None
+        )),
+        ("products.get", None, "GET", lambda rng: (f"{API}/products/{product_id(rng)}", None)),
+        # Panier de 30 articles en une requête
+        ("products.batch", None, "GET", lambda rng: (
+            f"{API}/products/batch?ids={','.join(str(product_id(rng)) for _ in range(30))}", None
+        )),
+        ("categories.list", None, "GET", lambda rng: (f"{API}/products/categories/", None)),
+        ("orders.list", "user", "GET", lambda rng: (f"{API}/orders/?limit=20", None)),
+        ("orders.create", "user", "POST", lambda rng: (
+            f"{API}/orders/", {"json": {"items": [{"product_id": product_id(rng), "quantity": 1}]}}
+        )),
+        # Panier borné à 50 produits différents ; le stock n'est lu, jamais verrouillé
+        ("cart.set_item", "user", "PUT", lambda rng: (
+            f"{API}/cart/items/{rng.randint(1, min(products, 50))}", {"json": {"quantity": 1}}
+        )),
+        ("cart.availability", None, "GET", lambda rng: (
+            f"{API}/cart/availability?ids={','.join(str(product_id(rng)) for _ in range(30))}", None
+        )),
+        ("analytics.revenue", "admin", "GET", lambda rng: (
+            f"{API}/analytics/revenue?date_from={since(365)}", None
+        )),
+        ("analytics.products", "admin", "GET", lambda rng: (
+            f"{API}/analytics/products?date_from={since(90)}", None
+        )),
+        ("analytics.categories", "admin", "GET", lambda rng: (f"{API}/analytics/categories", None)),
+        ("products.update", "admin", "PUT", lambda rng: (
+            f"{API}/products/{product_id(rng)}", {"json": {"price": round(rng.uniform(1, 1000), 2)}}
+        )),
+    ]
+
+def _summary(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+
+    def percentile(fraction):
+        if not latencies:
+            return 0.0
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000, 2)
+
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round((len(latencies) + errors) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else 0.0,
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+def _tokens():
+    from app.core.security import create_access_token
+    return {"admin": create_access_token(1), "user": create_access_token(2)}
+
+# Mesure en processus : une requête à la fois, requêtes SQL comptées sur le moteur
+def run_inprocess(scenarios, iterations, login_iterations):
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from app.database import get_engine
+    from app.main import create_app
+
+    queries = [0]
+
+    def count(*args):
+        queries[0] += 1
+
+    tokens = _tokens()
+    results = {}
+    with TestClient(create_app()) as client:
+        event.listen(get_engine(), "before_cursor_execute", count)
+        for name, role, method, build in scenarios:
+            rng = random.Random(name)
+            count_for = login_iterations if name == "auth.login" else iterations
+            headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+            latencies, errors = [], 0
+            queries[0] = 0
+            started = time.perf_counter()
+            for _ in range(count_for):
+                path, body = build(rng)
+                start = time.perf_counter()
+                response = client.request(
+                    method, path, headers=headers,
+                    json=(body or {}).get("json"), data=(body or {}).get("form"),
+                )
+                elapsed = time.perf_counter() - start
+                if response.status_code < 400:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+            result = _summary(latencies, errors, time.perf_counter() - started)
+            result["queries_per_request"] = round(queries[0] / count_for, 2)
+            results[name] = result
+            print(_line(name, result, queries=True))
+        event.remove(get_engine(), "before_cursor_execute", count)
+    return results
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _start_server(port, workers, env):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=seed.ROOT, env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Le serveur uvicorn n'a pas démarré")
+
+# Mesure HTTP : `clients` connexions persistantes en parallèle pendant `duration` secondes
+def run_http(scenarios, port, clients, duration, login_clients):
+    tokens = _tokens()
+    results = {}
+    for name, role, method, build in scenarios:
+        latencies, errors = [], [0]
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def client(index):
+            rng = random.Random(f"{name}-{index}")
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            base_headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+            while time.perf_counter() < deadline:
+                path, body = build(rng)
+                headers = dict(base_headers)
+                payload = None
+                if body and "json" in body:
+                    payload = json.dumps(body["json"])
+                    headers["Content-Type"] = "application/json"
+                elif body and "form" in body:
+                    payload = urlencode(body["form"])
+                    headers["Content-Type"] = "application/x-www-form-urlencoded"
+                start = time.perf_counter()
+                try:
+                    connection.request(method, path, body=payload, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status < 400
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                    ok = False
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors[0] += 1
+            connection.close()
+
+        count = login_clients if name == "auth.login" else clients
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(count)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result = _summary(latencies, errors[0], time.perf_counter() - started)
+        result["clients"] = count
+        results[name] = result
+        print(_line(name, result))
+    return results
+
+def _header(queries=False):
+    columns = f"{'scénario':<24} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'erreurs':>8}"
+    return columns + (f" {'SQL/req':>8}" if queries else "")
+
+def _line(name, result, queries=False):
+    line = (
+        f"{name:<24} {result['throughput_rps']:>9} {result['p50_ms']:>9} "
+        f"{result['p95_ms']:>9} {result['p99_ms']:>9} {result['errors']:>8}"
+    )
+    return line + (f" {result['queries_per_request']:>8}" if queries else "")
+
+# Comparaison avec un run précédent : variation en % (positif = plus lent / moins de débit)
+def compare(baseline, current):
+    print(f"\nComparaison avec {baseline['started_at']} ({baseline.get('git_commit') or '?'})")
+    print(f"{'mode':<10} {'scénario':<24} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'SQL/req':>8}")
+    for mode in ("inprocess", "http"):
+        for name, result in current.get(mode, {}).items():
+            before = baseline.get(mode, {}).get(name)
+            if not before:
+                continue
+
+            def delta(key, inverse=False):
+                if not before.get(key):
+                    return "-"
+                change = (result[key] - before[key]) / before[key] * 100
+                return f"{-change if inverse else change:+.0f}%"
+
+            queries = ""
+            if "queries_per_request" in result and "queries_per_request" in before:
+                queries = f"{result['queries_per_request'] - before['queries_per_request']:+.1f}"
+            print(
+                f"{mode:<10} {name:<24} {delta('p50_ms'):>8} {delta('p95_ms'):>8} "
+                f"{delta('p99_ms'):>8} {delta('throughput_rps', inverse=True):>8} {queries:>8}"
+            )
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=seed.ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="base de test (SQLite temporaire par défaut)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--mode", choices=["inprocess", "http", "both"], default="both")
+    parser.add_argument("--scenarios", nargs="+", help="noms des scénarios (tous par défaut)")
+    parser.add_argument("--iterations", type=int, default=200, help="requêtes par scénario en processus")
+    parser.add_argument("--clients", type=int, default=16, help="clients HTTP concurrents")
+    parser.add_argument("--duration", type=float, default=5.0, help="secondes par scénario HTTP")
+    parser.add_argument("--workers", type=int, default=1, help="workers uvicorn")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--no-cache", action="store_true", help="désactiver le cache du catalogue")
+    parser.add_argument("--json", dest="json_path", help="fichier où écrire les résultats")
+    parser.add_argument("--compare", help="résultats JSON d'un run précédent")
+    args = parser.parse_args()
+
+    # La configuration est lue à l'import de l'application : environnement fixé avant
+    url = seed.database_url(args.database_url)
+    os.environ.update(
+        SQLALCHEMY_DATABASE_URI=url,
+        SECRET_KEY="bench-" + os.urandom(16).hex(),
+        BCRYPT_ROUNDS=str(args.bcrypt_rounds),
+        CATALOG_CACHE_MAX_SIZE="0" if args.no_cache else os.environ.get("CATALOG_CACHE_MAX_SIZE", "1024"),
+    )
+
+    sizes = {"users": max(args.users, 2), "categories": args.categories, "products": args.products}
+    seed.seed(
+        url, users=sizes["users"], categories=args.categories,
+        products=args.products, orders=args.orders, password=PASSWORD,
+    )
+
+    scenarios = _scenarios(sizes)
+    if args.scenarios:
+        unknown = set(args.scenarios) - {name for name, *_ in scenarios}
+        if unknown:
+            parser.error(f"scénarios inconnus : {', '.join(sorted(unknown))}")
+        scenarios = [scenario for scenario in scenarios if scenario[0] in args.scenarios]
+
+    import sqlalchemy
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "database": url.split("@")[-1] if args.database_url else "sqlite (temporaire)",
+        "config": {key: value for key, value in vars(args).items() if key not in ("json_path", "compare")},
+    }
+
+    if args.mode in ("inprocess", "both"):
+        print(f"\nEn processus ({args.iterations} requêtes par scénario)")
+        print(_header(queries=True))
+        # Connexions peu nombreuses : bcrypt domine, on limite leur nombre
+        report["inprocess"] = run_inprocess(scenarios, args.iterations, max(args.iterations // 10, 5))
+
+    if args.mode in ("http", "both"):
+        port = _free_port()
+        server = _start_server(port, args.workers, dict(os.environ))
+        try:
+            print(f"\nHTTP ({args.clients} clients, {args.duration}s par scénario, {args.workers} worker(s))")
+            print(_header())
+            report["http"] = run_http(scenarios, port, args.clients, args.duration, min(args.clients, 4))
+        finally:
+            server.terminate()
+            server.wait()
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Débit du traitement des images de produits (variantes redimensionnées).
+
+Génère des photos synthétiques puis produit leurs variantes (IMAGE_VARIANTS,
+IMAGE_FORMAT, IMAGE_QUALITY) avec `app.core.images.make_variants` : d'abord
+en série dans le processus courant (ce que coûterait un traitement dans la
+requête), puis via le pool de processus `ImageProcessor` pour chaque nombre de
+workers demandé. Le script affiche les images traitées par seconde et les
+latences de traitement.
+
+    python -m benchmarks.bench_images --images 40 --size 3000x2000 --workers 1 2 4
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from PIL import Image
+
+from app.core.config import settings
+from app.core.images import ImageProcessor, make_variants
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+# Photo synthétique : dégradé et bruit, pour que l'encodeur ait du détail à compresser
+def make_source(path, width, height, fmt):
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 64)
+    image = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.FLIP_LEFT_RIGHT)))
+    image.save(path, format=fmt, quality=90)
+
+def _variant_args(source, target_dir):
+    return (
+        source, target_dir, dict(settings.IMAGE_VARIANTS),
+        settings.IMAGE_FORMAT, settings.IMAGE_QUALITY, settings.IMAGE_MAX_PIXELS,
+    )
+
+def run_inline(sources, workdir):
+    latencies = []
+    started = time.perf_counter()
+    for index, source in enumerate(sources):
+        target_dir = os.path.join(workdir, "inline", str(index))
+        os.makedirs(target_dir)
+        start = time.perf_counter()
+        make_variants(*_variant_args(source, target_dir))
+        latencies.append(time.perf_counter() - start)
+    return time.perf_counter() - started, latencies
+
+def run_pool(sources, workdir, workers):
+    processor = ImageProcessor(workers=workers, max_pending=len(sources))
+    # Démarrage des processus hors mesure
+    warm_dir = os.path.join(workdir, f"warm-{workers}")
+    os.makedirs(warm_dir)
+    processor.run(make_variants, *_variant_args(sources[0], warm_dir))
+
+    latencies = []
+    done = threading.Semaphore(0)
+    started = time.perf_counter()
+    for index, source in enumerate(sources):
+        target_dir = os.path.join(workdir, f"pool-{workers}", str(index))
+        os.makedirs(target_dir)
+        submitted = time.perf_counter()
+
+        def callback(future, submitted=submitted):
+            future.result()
+            latencies.append(time.perf_counter() - submitted)
+            done.release()
+
+        processor.process(source, target_dir, callback)
+    for _ in sources:
+        done.acquire()
+    elapsed = time.perf_counter() - started
+    processor.shutdown()
+    return elapsed, latencies
+
+def summarize(name, workers, elapsed, latencies):
+    return {
+        "mode": name,
+        "workers": workers,
+        "images": len(latencies),
+        "images_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=40)
+    parser.add_argument("--size", default="3000x2000", help="dimensions des originaux (LxH)")
+    parser.add_argument("--source-format", choices=["JPEG", "PNG"], default="JPEG")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--json", dest="json_path", help="fichier où écrire les résultats")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.lower().split("x"))
+    workdir = tempfile.mkdtemp(prefix="bench_images_")
+    try:
+        # Quelques originaux distincts, réutilisés : la génération n'est pas mesurée
+        sources = []
+        extension = ".jpg" if args.source_format == "JPEG" else ".png"
+        for index in range(min(args.images, 8)):
+            path = os.path.join(workdir, f"source-{index}{extension}")
+            make_source(path, width, height, args.source_format)
+            sources.append(path)
+        sources = [sources[index % len(sources)] for index in range(args.images)]
+        original_kb = round(os.path.getsize(sources[0]) / 1024)
+
+        results = [summarize("série", 1, *run_inline(sources, workdir))]
+        for workers in args.workers:
+            results.append(summarize("pool", workers, *run_pool(sources, workdir, workers)))
+
+        variant_sizes = {
+            name: os.path.getsize(os.path.join(workdir, "inline", "0", f"{name}.{settings.IMAGE_FORMAT}"))
+            for name in settings.IMAGE_VARIANTS
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"originaux {width}x{height} {args.source_format} ({original_kb} Ko), "
+          f"variantes {settings.IMAGE_FORMAT} q{settings.IMAGE_QUALITY}: "
+          + ", ".join(f"{name} {size} octets" for name, size in variant_sizes.items()))
+    print(f"{'mode':<6} {'workers':>7} {'images/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for result in results:
+        print(f"{result['mode']:<6} {result['workers']:>7} {result['images_per_s']:>9} "
+              f"{result['p50_ms']:>8} {result['p95_ms']:>8}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(
+                {"original_kb": original_kb, "variant_bytes": variant_sizes, "results": results},
+                f, indent=2, ensure_ascii=False,
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Débit de connexion (vérification bcrypt) selon le coût configuré.
+
+Simule des requêtes de connexion concurrentes passant par le pool de hachage
+dédié de `app.core.security` et affiche, pour chaque coût, le nombre de
+connexions par seconde, les latences et le nombre de requêtes rejetées (503).
+
+    python -m benchmarks.bench_login --rounds 8 10 12 --clients 16 --duration 5
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+
+from passlib.context import CryptContext
+
+from app.core import security
+from app.core.security import HashingBusyError, PasswordHasher
+
+PASSWORD = "motdepasse123"
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def run(rounds, clients, duration, workers, max_pending):
+    # Contexte au coût demandé, utilisé par les fonctions exécutées dans le pool
+    security.pwd_context = CryptContext(
+        schemes=["bcrypt"],
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+    hashed = security.pwd_context.hash(PASSWORD)
+    hasher = PasswordHasher(workers=workers, max_pending=max_pending)
+    security.password_hasher = hasher
+
+    latencies = []
+    rejected = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        nonlocal rejected
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                valid, _ = security.verify_and_update_password(PASSWORD, hashed)
+                assert valid
+            except HashingBusyError:
+                with lock:
+                    rejected += 1
+                # Un client rejeté réessaie après une courte pause, comme avec Retry-After
+                time.sleep(0.01)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    hasher.shutdown()
+
+    return {
+        "rounds": rounds,
+        "clients": clients,
+        "workers": workers,
+        "max_pending": max_pending,
+        "logins": len(latencies),
+        "logins_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else 0.0,
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+        "rejected": rejected,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[4, 8, 10, 12])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=security.settings.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=security.settings.PASSWORD_HASH_MAX_PENDING)
+    parser.add_argument("--json", dest="json_path", help="fichier où écrire les résultats")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'coût':>5} {'connexions/s':>13} {'p50 ms':>8} {'p95 ms':>8} {'rejets':>7}")
+    for rounds in args.rounds:
+        result = run(rounds, args.clients, args.duration, args.workers, args.max_pending)
+        results.append(result)
+        print(
+            f"{result['rounds']:>5} {result['logins_per_s']:>13} "
+            f"{result['p50_ms']:>8} {result['p95_ms']:>8} {result['rejected']:>7}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
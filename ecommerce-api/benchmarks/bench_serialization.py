@@ -0,0 +1,99 @@
+"""
+Coût de sérialisation par produit d'une page de la liste des produits.
+
+Compare, sur une base SQLite remplie par les migrations, l'ancien chemin
+(objets ORM avec `selectinload`, `schemas.Product.from_orm`, `jsonable_encoder`
+puis `json.dumps`) au chemin actuel (colonnes lues en tuples, dictionnaires
+construits directement, encodage orjson). Le script affiche la médiane du
+temps par produit, requêtes SQL comprises puis encodage JSON seul.
+
+    python -m benchmarks.bench_serialization --page-size 100 --repeat 200
+"""
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks import seed
+
+def old_page(db, models, schemas, limit):
+    from sqlalchemy.orm import selectinload
+    products = (
+        db.query(models.Product)
+        .options(selectinload(models.Product.categories))
+        .order_by(models.Product.id)
+        .limit(limit)
+        .all()
+    )
+    return [schemas.Product.from_orm(product) for product in products]
+
+def old_encode(items):
+    from fastapi.encoders import jsonable_encoder
+    return json.dumps(
+        jsonable_encoder(items), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+def new_page(db, models, limit):
+    from app.core.listings import PRODUCT_COLUMNS, product_payloads
+    rows = db.query(*PRODUCT_COLUMNS).order_by(models.Product.id).limit(limit).all()
+    return product_payloads(db, rows)
+
+def measure(function, repeat, items):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) / items * 1e6)
+    return round(statistics.median(samples), 2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--json", dest="json_path", help="fichier où écrire les résultats")
+    args = parser.parse_args()
+
+    url = seed.database_url()
+    seed.seed(url, products=args.products, orders=0)
+
+    # Les modules de l'application lisent la configuration à l'import
+    from app.core.config import settings
+    settings.SQLALCHEMY_DATABASE_URI = url
+    from app import models, schemas
+    from app.core.http_cache import dumps
+    from app.database import SessionLocal
+
+    limit = args.page_size
+    with SessionLocal() as db:
+        old_items = old_page(db, models, schemas, limit)
+        new_items = new_page(db, models, limit)
+        # Les deux chemins doivent produire exactement le même JSON
+        assert old_encode(old_items) == dumps(new_items), "corps JSON différents"
+
+        result = {
+            "page_size": limit,
+            "avant": {
+                "page_us_per_item": measure(
+                    lambda: old_encode(old_page(db, models, schemas, limit)), args.repeat, limit
+                ),
+                "encode_us_per_item": measure(lambda: old_encode(old_items), args.repeat, limit),
+            },
+            "après": {
+                "page_us_per_item": measure(
+                    lambda: dumps(new_page(db, models, limit)), args.repeat, limit
+                ),
+                "encode_us_per_item": measure(lambda: dumps(new_items), args.repeat, limit),
+            },
+        }
+
+    print(f"{'chemin':<8} {'page µs/produit':>16} {'encodage µs/produit':>20}")
+    for name in ("avant", "après"):
+        print(f"{name:<8} {result[name]['page_us_per_item']:>16} {result[name]['encode_us_per_item']:>20}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
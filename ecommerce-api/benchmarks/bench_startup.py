@@ -0,0 +1,103 @@
+"""
+Temps de démarrage de l'application : import, lifespan et première requête.
+
+Chaque mesure est faite dans un nouvel interpréteur (démarrage à froid, comme
+un worker lancé par l'autoscaler) sur une base SQLite remplie par les
+migrations. Le script affiche la médiane et le maximum de :
+
+- l'import de `app.main` (doit rester sans E/S) ;
+- le démarrage (lifespan : clé, connexions, cache) ;
+- la première et la deuxième requête sur la liste des produits.
+
+    python -m benchmarks.bench_startup --runs 10
+    python -m benchmarks.bench_startup --no-warmup   # sans préchauffage, pour comparer
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import seed
+
+# Code exécuté dans chaque interpréteur neuf ; affiche les durées en JSON
+CHILD = """
+import json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from app import database
+engine_at_import = database.created_engines() != (None, None)
+from fastapi.testclient import TestClient
+client = TestClient(app.main.app)
+before_startup = time.perf_counter()
+with client:
+    started = time.perf_counter()
+    assert client.get("/api/v1/products/").status_code == 200
+    first = time.perf_counter()
+    assert client.get("/api/v1/products/?skip=1").status_code == 200
+    second = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (started - before_startup) * 1000,
+    "first_request_ms": (first - started) * 1000,
+    "second_request_ms": (second - first) * 1000,
+    "engine_at_import": engine_at_import,
+}))
+"""
+
+METRICS = ["import_ms", "startup_ms", "first_request_ms", "second_request_ms"]
+
+def run(runs, warmup, env):
+    env = dict(env, CATALOG_CACHE_WARMUP=str(warmup).lower())
+    if not warmup:
+        env["DB_POOL_WARMUP_CONNECTIONS"] = "0"
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD],
+            cwd=seed.ROOT, env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    result = {"runs": runs, "warmup": warmup}
+    for metric in METRICS:
+        values = [sample[metric] for sample in samples]
+        result[metric] = {
+            "median": round(statistics.median(values), 1),
+            "max": round(max(values), 1),
+        }
+    result["engine_at_import"] = any(sample["engine_at_import"] for sample in samples)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false")
+    parser.add_argument("--json", dest="json_path", help="fichier où écrire les résultats")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    url = seed.database_url(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    seed.seed(url, products=args.products, orders=0)
+    env = dict(
+        os.environ,
+        SQLALCHEMY_DATABASE_URI=url,
+        SECRET_KEY="bench-" + os.urandom(16).hex(),
+    )
+
+    result = run(args.runs, args.warmup, env)
+    print(f"{'mesure':<20} {'médiane ms':>11} {'max ms':>9}")
+    for metric in METRICS:
+        print(f"{metric:<20} {result[metric]['median']:>11} {result[metric]['max']:>9}")
+    print(f"moteur créé à l'import : {'oui' if result['engine_at_import'] else 'non'}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
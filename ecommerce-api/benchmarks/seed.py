@@ -0,0 +1,153 @@
+"""
+Création et remplissage d'une base de test par les migrations Alembic.
+
+Utilisé par les scripts de `benchmarks` : la base est créée par
+`alembic upgrade head` (mêmes index qu'en production) puis remplie en masse
+avec des données synthétiques reproductibles (graine fixe).
+"""
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import Engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = [
+    "chaise", "table", "lampe", "bureau", "canapé", "étagère", "tapis", "miroir",
+    "coussin", "fauteuil", "vase", "horloge", "rideau", "tabouret", "armoire", "lit",
+    "chêne", "noyer", "métal", "velours", "lin", "verre", "rotin", "marbre",
+]
+
+# Fonction pour obtenir l'URL de la base de test (SQLite temporaire par défaut)
+def database_url(url: Optional[str] = None) -> str:
+    return url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+# Fonction pour créer le schéma par les migrations
+def migrate(url: str) -> None:
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    command.upgrade(config, "head")
+
+def _insert_chunks(connection, table, rows, chunk_size=5000):
+    for start in range(0, len(rows), chunk_size):
+        connection.execute(insert(table), rows[start:start + chunk_size])
+
+# Fonction pour remplir la base avec des données synthétiques
+def seed(
+    url: str,
+    *,
+    users: int = 100,
+    categories: int = 50,
+    products: int = 10000,
+    categories_per_product: int = 3,
+    orders: int = 5000,
+    lines_per_order: int = 3,
+    order_history_days: int = 365,
+    password: Optional[str] = None,
+    seed: int = 42,
+) -> Engine:
+    """
+    Crée le schéma puis insère les lignes ; retourne un moteur sur la base.
+    Sans `password`, les mots de passe ne sont pas de vrais hachages : aucun
+    compte n'est utilisable pour se connecter. L'utilisateur 1 est administrateur.
+    """
+    from app.database import Base
+
+    # Un seul hachage (coûteux) partagé par tous les comptes
+    hashed_password = "-"
+    if password:
+        from app.core.security import pwd_context
+        hashed_password = pwd_context.hash(password)
+
+    migrate(url)
+    rng = random.Random(seed)
+    tables = Base.metadata.tables
+    engine = create_engine(url)
+
+    with engine.begin() as connection:
+        _insert_chunks(connection, tables["users"], [
+            {
+                "id": i,
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "hashed_password": hashed_password,
+                "is_active": True,
+                "is_admin": i == 1,
+            }
+            for i in range(1, users + 1)
+        ])
+        _insert_chunks(connection, tables["categories"], [
+            {"id": i, "name": f"Catégorie {i}", "description": None}
+            for i in range(1, categories + 1)
+        ])
+        _insert_chunks(connection, tables["products"], [
+            {
+                "id": i,
+                "name": " ".join(rng.sample(WORDS, 3)) + f" {i}",
+                "description": " ".join(rng.choices(WORDS, k=12)),
+                "price": round(rng.uniform(1, 1000), 2),
+                "stock": rng.randint(0, 500),
+                "created_by": 1,
+            }
+            for i in range(1, products + 1)
+        ])
+        _insert_chunks(connection, tables["product_categories"], [
+            {"product_id": product_id, "category_id": category_id}
+            for product_id in range(1, products + 1)
+            for category_id in rng.sample(range(1, categories + 1), min(categories_per_product, categories))
+        ])
+        order_items = [
+            {
+                "order_id": order_id,
+                "product_id": product_id,
+                "quantity": rng.randint(1, 3),
+                "unit_price": 10,
+            }
+            for order_id in range(1, orders + 1)
+            for product_id in rng.sample(range(1, products + 1), min(lines_per_order, products))
+        ]
+        totals = {}
+        for item in order_items:
+            totals[item["order_id"]] = totals.get(item["order_id"], 0) + item["quantity"] * item["unit_price"]
+        # Commandes réparties sur les `order_history_days` derniers jours, par date croissante
+        now = datetime.utcnow()
+        _insert_chunks(connection, tables["orders"], [
+            {
+                "id": i,
+                "user_id": rng.randint(1, users),
+                "total_amount": totals.get(i, 0),
+                "status": "pending",
+                "created_at": now - timedelta(seconds=order_history_days * 86400 * (orders - i) // orders),
+            }
+            for i in range(1, orders + 1)
+        ])
+        _insert_chunks(connection, tables["order_items"], order_items)
+
+    # Projection des produits, maintenue en production par les routes d'écriture
+    from sqlalchemy.orm import Session
+    from app.core.listings import rebuild_listings
+    with Session(engine) as db:
+        rebuild_listings(db)
+
+    # Agrégats de ventes des commandes insérées, comme `python -m app.manage rollup-sales`
+    from app.core.analytics import backfill_sales
+    with Session(engine) as db:
+        backfill_sales(db)
+
+    # Statistiques à jour : le planificateur choisit ses index comme en production
+    with engine.begin() as connection:
+        if engine.dialect.name == "sqlite":
+            connection.execute(text("ANALYZE"))
+        elif engine.dialect.name == "mysql":
+            connection.execute(text(
+                "ANALYZE TABLE users, categories, products, product_categories, product_listings, "
+                "orders, order_items, sales_daily, sales_product_daily, sales_category_daily"
+            ))
+    return engine
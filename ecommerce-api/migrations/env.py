@@ -0,0 +1,69 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app import models  # noqa: F401  (enregistre les tables dans les métadonnées)
+from app.core.config import settings
+from app.database import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# Une URL passée explicitement (tests, scripts) prime sur la configuration de l'application
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", settings.SQLALCHEMY_DATABASE_URI.replace("%", "%%"))
+
+target_metadata = Base.metadata
+
+# Objets propres à un dialecte, gérés à la main dans les migrations
+def include_object_for(dialect_name: str):
+    def include_object(object, name, type_, reflected, compare_to):
+        if type_ == "table" and name.startswith("products_fts"):
+            return False
+        if type_ == "index" and name == "ix_products_name_description_fulltext":
+            return dialect_name == "mysql"
+        return True
+    return include_object
+
+def run_migrations_offline() -> None:
+    """
+    Génère le SQL des migrations sans connexion (alembic upgrade --sql).
+    """
+    url = config.get_main_option("sqlalchemy.url")
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        include_object=include_object_for(url.split(":", 1)[0].split("+", 1)[0]),
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    """
+    Applique les migrations sur la base configurée.
+    """
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object_for(connection.dialect.name),
+            # SQLite ne sait pas modifier une table en place : recréation par lots
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,132 @@
+"""Schéma initial (tables créées jusqu'ici par create_all)
+
+Une base déjà créée par l'ancien `create_all` se rattache avec
+`alembic stamp 0001` avant `alembic upgrade head` : l'index de recherche
+plein texte qui lui manque (FULLTEXT sous MySQL, FTS5 sous SQLite) est créé
+par 0008.
+
+Revision ID: 0001
+Revises:
+Create Date: 2023-06-12 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Index FTS5 de la recherche sous SQLite, maintenu par des triggers
+PRODUCTS_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("username", sa.String(255), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("is_admin", sa.Boolean()),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("stock", sa.Integer()),
+        sa.Column("image_url", sa.String(255)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id")),
+    )
+    op.create_index("ix_products_id", "products", ["id"])
+    op.create_index("ix_products_name", "products", ["name"])
+
+    op.create_table(
+        "categories",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("description", sa.String(255)),
+    )
+    op.create_index("ix_categories_id", "categories", ["id"])
+    op.create_index("ix_categories_name", "categories", ["name"])
+
+    op.create_table(
+        "product_categories",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id"), nullable=False),
+    )
+    op.create_index("ix_product_categories_id", "product_categories", ["id"])
+
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("total_amount", sa.Float(), nullable=False),
+        sa.Column("status", sa.String(50)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_orders_id", "orders", ["id"])
+
+    op.create_table(
+        "order_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id"), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("unit_price", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_order_items_id", "order_items", ["id"])
+
+    # Recherche plein texte : FULLTEXT sous MySQL, FTS5 sous SQLite
+    dialect = op.get_bind().dialect.name
+    if dialect == "mysql":
+        op.create_index(
+            "ix_products_name_description_fulltext",
+            "products",
+            ["name", "description"],
+            mysql_prefix="FULLTEXT",
+        )
+    elif dialect == "sqlite":
+        for statement in PRODUCTS_FTS_DDL:
+            op.execute(statement)
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS products_fts")
+    op.drop_table("order_items")
+    op.drop_table("orders")
+    op.drop_table("product_categories")
+    op.drop_table("categories")
+    op.drop_table("products")
+    op.drop_table("users")
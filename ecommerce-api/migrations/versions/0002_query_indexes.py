@@ -0,0 +1,51 @@
+"""Index correspondant aux filtres et jointures des routeurs
+
+- product_categories : un lien unique par (product_id, category_id), qui sert
+  aussi le chargement des catégories d'une page de produits, et un index
+  (category_id, product_id) pour le filtre par catégorie ;
+- products.price : filtres min_price/max_price et tri par prix ;
+- orders (user_id, id) : liste paginée des commandes d'un utilisateur ;
+- order_items.order_id : chargement des lignes d'une commande.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2023-06-12 10:30:00
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Suppression des liens en double (le plus ancien est conservé) avant l'index unique
+    op.execute(
+        """DELETE FROM product_categories WHERE id NOT IN (
+            SELECT keep_id FROM (
+                SELECT MIN(id) AS keep_id FROM product_categories
+                GROUP BY product_id, category_id
+            ) AS kept
+        )"""
+    )
+    op.create_index(
+        "uq_product_categories_product_id_category_id",
+        "product_categories",
+        ["product_id", "category_id"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_product_categories_category_id_product_id",
+        "product_categories",
+        ["category_id", "product_id"],
+    )
+    op.create_index("ix_products_price", "products", ["price"])
+    op.create_index("ix_orders_user_id_id", "orders", ["user_id", "id"])
+    op.create_index("ix_order_items_order_id", "order_items", ["order_id"])
+
+def downgrade() -> None:
+    op.drop_index("ix_order_items_order_id", table_name="order_items")
+    op.drop_index("ix_orders_user_id_id", table_name="orders")
+    op.drop_index("ix_products_price", table_name="products")
+    op.drop_index("ix_product_categories_category_id_product_id", table_name="product_categories")
+    op.drop_index("uq_product_categories_product_id_category_id", table_name="product_categories")
@@ -0,0 +1,112 @@
+"""Projection dénormalisée product_listings pour les lectures du catalogue
+
+Une ligne par produit : le corps JSON de la réponse (catégories comprises) et
+les colonnes de tri et de filtre des pages de produits. La table est remplie
+ici à partir des données existantes ; l'application la maintient ensuite dans
+la transaction de chaque écriture (`python -m app.manage rebuild-listings`
+pour la reconstruire).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2023-06-19 09:00:00
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+import orjson
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+CHUNK_SIZE = 1000
+
+product_listings = sa.table(
+    "product_listings",
+    sa.column("product_id", sa.Integer()),
+    sa.column("name", sa.String()),
+    sa.column("price", sa.Float()),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+    sa.column("updated_at", sa.DateTime(timezone=True)),
+    sa.column("payload", sa.Text()),
+)
+
+# Remplissage initial ; même format que schemas.Product (figé à cette révision)
+def _backfill(connection) -> None:
+    last_id = 0
+    while True:
+        products = connection.execute(sa.text(
+            "SELECT id, name, description, price, stock, image_url, created_at, updated_at "
+            "FROM products WHERE id > :last_id ORDER BY id LIMIT :limit"
+        ).columns(
+            # Dates converties comme par le modèle (SQLite les stocke en texte)
+            created_at=sa.DateTime(timezone=True), updated_at=sa.DateTime(timezone=True),
+        ), {"last_id": last_id, "limit": CHUNK_SIZE}).all()
+        if not products:
+            return
+
+        categories = defaultdict(list)
+        links = connection.execute(sa.text(
+            "SELECT pc.product_id, c.id, c.name, c.description "
+            "FROM product_categories pc JOIN categories c ON c.id = pc.category_id "
+            "WHERE pc.product_id > :first_id AND pc.product_id <= :last_id "
+            "ORDER BY pc.product_id, c.id"
+        ), {"first_id": last_id, "last_id": products[-1].id})
+        for product_id, category_id, name, description in links:
+            categories[product_id].append(
+                {"name": name, "description": description, "is_active": True, "id": category_id}
+            )
+
+        connection.execute(product_listings.insert(), [
+            {
+                "product_id": row.id,
+                "name": row.name,
+                "price": row.price,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+                "payload": orjson.dumps({
+                    "name": row.name,
+                    "description": row.description,
+                    "price": str(Decimal(str(row.price))),
+                    "stock": row.stock,
+                    "image_url": row.image_url,
+                    "is_active": True,
+                    "id": row.id,
+                    "categories": categories[row.id],
+                }).decode("utf-8"),
+            }
+            for row in products
+        ])
+        last_id = products[-1].id
+
+def upgrade() -> None:
+    op.create_table(
+        "product_listings",
+        sa.Column("product_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        # Un TEXT MySQL (64 Ko) ne suffit pas toujours : la description est déjà un TEXT
+        sa.Column("payload", sa.Text().with_variant(mysql.MEDIUMTEXT(), "mysql"), nullable=False),
+    )
+    op.create_index(
+        "ix_product_listings_price_product_id", "product_listings", ["price", "product_id"]
+    )
+    op.create_index(
+        "ix_product_listings_name_product_id", "product_listings", ["name", "product_id"]
+    )
+    op.create_index(
+        "ix_product_listings_created_at_product_id", "product_listings", ["created_at", "product_id"]
+    )
+    _backfill(op.get_bind())
+
+def downgrade() -> None:
+    op.drop_index("ix_product_listings_created_at_product_id", table_name="product_listings")
+    op.drop_index("ix_product_listings_name_product_id", table_name="product_listings")
+    op.drop_index("ix_product_listings_price_product_id", table_name="product_listings")
+    op.drop_table("product_listings")
@@ -0,0 +1,63 @@
+"""Images téléversées des produits
+
+- products.image_key : clé (répertoire sous MEDIA_ROOT) des variantes servies ;
+- products.pending_image_key : téléversement en cours de traitement ;
+- product_listings.payload : nouveau champ `images` (null pour les produits
+  existants, aucun n'ayant d'image téléversée).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2023-06-26 09:00:00
+"""
+import orjson
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+CHUNK_SIZE = 1000
+
+product_listings = sa.table(
+    "product_listings",
+    sa.column("product_id", sa.Integer()),
+    sa.column("payload", sa.Text()),
+)
+
+# Réécriture des corps JSON par lots de produits
+def _rewrite_payloads(connection, change) -> None:
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(product_listings.c.product_id, product_listings.c.payload)
+            .where(product_listings.c.product_id > last_id)
+            .order_by(product_listings.c.product_id)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            return
+        updates = []
+        for product_id, payload in rows:
+            body = orjson.loads(payload)
+            change(body)
+            updates.append({"key": product_id, "payload": orjson.dumps(body).decode("utf-8")})
+        connection.execute(
+            product_listings.update()
+            .where(product_listings.c.product_id == sa.bindparam("key"))
+            .values(payload=sa.bindparam("payload")),
+            updates,
+        )
+        last_id = rows[-1].product_id
+
+def upgrade() -> None:
+    op.add_column("products", sa.Column("image_key", sa.String(32), nullable=True))
+    op.add_column("products", sa.Column("pending_image_key", sa.String(32), nullable=True))
+    _rewrite_payloads(op.get_bind(), lambda body: body.setdefault("images", None))
+
+def downgrade() -> None:
+    _rewrite_payloads(op.get_bind(), lambda body: body.pop("images", None))
+    # Pas de batch_alter_table : sous SQLite, la table recréée perdrait les triggers FTS
+    op.drop_column("products", "pending_image_key")
+    op.drop_column("products", "image_key")
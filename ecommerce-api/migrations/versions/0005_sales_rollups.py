@@ -0,0 +1,61 @@
+"""Agrégats des ventes pour les rapports d'analyse
+
+- sales_daily, sales_product_daily, sales_category_daily : compteurs par jour
+  (commandes, unités, chiffre d'affaires), tenus à jour par le passage de
+  commande ;
+- orders.rolled_up : commande déjà comptée dans les agrégats.
+
+Les commandes existantes ne sont pas agrégées ici (table orders parcourue
+entière) : `python -m app.manage rollup-sales` les ajoute par lots, pendant
+que l'application tourne.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2023-07-03 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "sales_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("shard", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+    )
+    op.create_table(
+        "sales_product_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("product_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+    )
+    op.create_index(
+        "ix_sales_product_daily_product_id_day", "sales_product_daily", ["product_id", "day"]
+    )
+    op.create_table(
+        "sales_category_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("category_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("shard", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+    )
+    op.add_column(
+        "orders",
+        sa.Column("rolled_up", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+def downgrade() -> None:
+    op.drop_column("orders", "rolled_up")
+    op.drop_table("sales_category_daily")
+    op.drop_index("ix_sales_product_daily_product_id_day", table_name="sales_product_daily")
+    op.drop_table("sales_product_daily")
+    op.drop_table("sales_daily")
@@ -0,0 +1,38 @@
+"""Panier côté serveur avec réservations de stock temporaires
+
+- cart_items : lignes de panier par utilisateur, chacune réservant sa
+  quantité jusqu'à expires_at ;
+- stock_holds : quantité réservée par produit, répartie en plusieurs lignes.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2023-07-10 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "cart_items",
+        sa.Column("user_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("product_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_cart_items_expires_at", "cart_items", ["expires_at"])
+    op.create_table(
+        "stock_holds",
+        sa.Column("product_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("shard", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("held", sa.Integer(), nullable=False),
+    )
+
+def downgrade() -> None:
+    op.drop_table("stock_holds")
+    op.drop_index("ix_cart_items_expires_at", table_name="cart_items")
+    op.drop_table("cart_items")
@@ -0,0 +1,112 @@
+"""Moins de travail sous le verrou du produit au passage de commande
+
+- product_listings.stock : stock du produit, sorti du corps JSON (payload) ;
+  une commande ne met à jour que cette colonne ;
+- sales_product_daily : clé primaire (day, product_id, shard), les ventes
+  d'un produit étant écrites avant la réservation du stock. Les lignes
+  existantes deviennent la part 0.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2023-07-17 09:00:00
+"""
+import orjson
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+CHUNK_SIZE = 1000
+
+product_listings = sa.table(
+    "product_listings",
+    sa.column("product_id", sa.Integer()),
+    sa.column("stock", sa.Integer()),
+    sa.column("payload", sa.Text()),
+)
+
+# Réécriture des corps JSON par lots de produits ; `change` modifie le corps et retourne le stock
+def _rewrite_payloads(connection, change) -> None:
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(product_listings.c.product_id, product_listings.c.stock, product_listings.c.payload)
+            .where(product_listings.c.product_id > last_id)
+            .order_by(product_listings.c.product_id)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            return
+        updates = []
+        for product_id, stock, payload in rows:
+            body = orjson.loads(payload)
+            stock = change(body, stock)
+            updates.append({
+                "key": product_id, "stock": stock, "payload": orjson.dumps(body).decode("utf-8"),
+            })
+        connection.execute(
+            product_listings.update()
+            .where(product_listings.c.product_id == sa.bindparam("key"))
+            .values(stock=sa.bindparam("stock"), payload=sa.bindparam("payload")),
+            updates,
+        )
+        last_id = rows[-1].product_id
+
+def _move_stock_out(body, stock):
+    return body.pop("stock", None)
+
+# Stock remis à sa place d'avant 0007, entre price et image_url
+def _move_stock_in(body, stock):
+    items = list(body.items())
+    body.clear()
+    for key, value in items:
+        if key == "image_url":
+            body["stock"] = stock
+        body[key] = value
+    return None
+
+# Recréation de sales_product_daily avec ou sans la colonne shard (changement de clé primaire)
+def _recreate_sales_product_daily(sharded: bool) -> None:
+    op.drop_index("ix_sales_product_daily_product_id_day", table_name="sales_product_daily")
+    op.rename_table("sales_product_daily", "sales_product_daily_old")
+    columns = [
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("product_id", sa.Integer(), primary_key=True, autoincrement=False),
+    ]
+    if sharded:
+        columns.append(sa.Column("shard", sa.Integer(), primary_key=True, autoincrement=False))
+    op.create_table(
+        "sales_product_daily",
+        *columns,
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+    )
+    if sharded:
+        op.execute(
+            "INSERT INTO sales_product_daily (day, product_id, shard, units, revenue) "
+            "SELECT day, product_id, 0, units, revenue FROM sales_product_daily_old"
+        )
+    else:
+        op.execute(
+            "INSERT INTO sales_product_daily (day, product_id, units, revenue) "
+            "SELECT day, product_id, SUM(units), SUM(revenue) FROM sales_product_daily_old "
+            "GROUP BY day, product_id"
+        )
+    op.drop_table("sales_product_daily_old")
+    op.create_index(
+        "ix_sales_product_daily_product_id_day", "sales_product_daily", ["product_id", "day"]
+    )
+
+def upgrade() -> None:
+    op.add_column("product_listings", sa.Column("stock", sa.Integer(), nullable=True))
+    _rewrite_payloads(op.get_bind(), _move_stock_out)
+    _recreate_sales_product_daily(sharded=True)
+
+def downgrade() -> None:
+    _recreate_sales_product_daily(sharded=False)
+    _rewrite_payloads(op.get_bind(), _move_stock_in)
+    # Pas de batch_alter_table (voir 0004) ; DROP COLUMN natif depuis SQLite 3.35
+    op.drop_column("product_listings", "stock")
@@ -0,0 +1,63 @@
+"""Index de recherche plein texte des bases rattachées par `alembic stamp 0001`
+
+Une base créée par l'ancien `create_all` n'a ni l'index FULLTEXT (MySQL) ni
+la table FTS5 `products_fts` et ses triggers (SQLite), que 0001 crée pour une
+base neuve. Ils sont créés ici s'ils manquent ; sans effet sinon.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2023-07-24 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+FULLTEXT_INDEX = "ix_products_name_description_fulltext"
+
+# Même DDL que 0001
+PRODUCTS_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        indexes = {index["name"] for index in sa.inspect(connection).get_indexes("products")}
+        if FULLTEXT_INDEX not in indexes:
+            op.create_index(FULLTEXT_INDEX, "products", ["name", "description"], mysql_prefix="FULLTEXT")
+    elif dialect == "sqlite":
+        exists = connection.execute(sa.text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+        )).first()
+        for statement in PRODUCTS_FTS_DDL:
+            op.execute(statement)
+        # Table créée sur des produits existants : indexation de ceux-ci
+        if exists is None:
+            op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+def downgrade() -> None:
+    # Index créés par 0001 pour les bases neuves : conservés
+    pass
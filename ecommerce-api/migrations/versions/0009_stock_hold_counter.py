@@ -0,0 +1,43 @@
+"""Une ligne de stock_holds par produit
+
+La réservation d'un panier devient un UPDATE conditionnel de la ligne du
+produit (quantité réservée + ajout <= stock) : les parts par utilisateur
+(colonne shard) sont additionnées en une seule ligne.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2023-07-31 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# Recréation de stock_holds avec ou sans la colonne shard (changement de clé primaire) ;
+# au retour vers les parts, la quantité réservée de chaque produit va dans la part 0
+def _recreate_stock_holds(sharded: bool) -> None:
+    op.rename_table("stock_holds", "stock_holds_old")
+    columns = [sa.Column("product_id", sa.Integer(), primary_key=True, autoincrement=False)]
+    if sharded:
+        columns.append(sa.Column("shard", sa.Integer(), primary_key=True, autoincrement=False))
+    op.create_table("stock_holds", *columns, sa.Column("held", sa.Integer(), nullable=False))
+    if sharded:
+        op.execute(
+            "INSERT INTO stock_holds (product_id, shard, held) "
+            "SELECT product_id, 0, held FROM stock_holds_old"
+        )
+    else:
+        op.execute(
+            "INSERT INTO stock_holds (product_id, held) "
+            "SELECT product_id, SUM(held) FROM stock_holds_old GROUP BY product_id"
+        )
+    op.drop_table("stock_holds_old")
+
+def upgrade() -> None:
+    _recreate_stock_holds(sharded=False)
+
+def downgrade() -> None:
+    _recreate_stock_holds(sharded=True)
@@ -0,0 +1,26 @@
+"""Clé d'import des produits
+
+- products.import_key : clé (lot:rang) de la ligne d'import qui a créé le
+  produit. Sans RETURNING (MySQL), les IDs d'un lot inséré en un INSERT
+  multi-lignes sont relus par ces clés.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2023-08-07 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column("products", sa.Column("import_key", sa.String(40), nullable=True))
+    op.create_index("ix_products_import_key", "products", ["import_key"])
+
+def downgrade() -> None:
+    op.drop_index("ix_products_import_key", table_name="products")
+    # Pas de batch_alter_table (voir 0004) ; DROP COLUMN natif depuis SQLite 3.35
+    op.drop_column("products", "import_key")
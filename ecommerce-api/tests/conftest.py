@@ -0,0 +1,82 @@
+from typing import Callable, Iterator, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import database
+from app.core import deps, security
+from app.core.cache import catalog_cache, principal_cache, token_cache
+from app.core.config import settings
+from benchmarks import seed
+
+# Utilisateurs des bases de test (l'utilisateur 1 est administrateur, voir benchmarks.seed)
+ADMIN = deps.Principal(1, "user1", "user1@example.com", True, True)
+BUYER = deps.Principal(2, "user2", "user2@example.com", True, False)
+OTHER_BUYER = deps.Principal(3, "user3", "user3@example.com", True, False)
+
+# Oubli des moteurs et des sessions liées : chaque test repart de sa propre configuration
+def _reset_engines(monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in ("_engine", "_async_engine", "_replica_engines", "_async_replica_engines"):
+        monkeypatch.setattr(database, name, None)
+    monkeypatch.setitem(database.SessionLocal.kw, "bind", None)
+    monkeypatch.setitem(database.AsyncSessionLocal.kw, "bind", None)
+
+def _dispose_engines() -> None:
+    for engine in [database._engine, *(database._replica_engines or [])]:
+        if engine is not None:
+            engine.dispose()
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch) -> Iterator[str]:
+    """
+    Base SQLite créée par les migrations et remplie d'un petit jeu de données
+    (5 utilisateurs, 3 catégories, 20 produits, sans commande).
+    """
+    url = f"sqlite:///{tmp_path / 'primary.db'}"
+    seed.seed(url, users=5, categories=3, products=20, orders=0).dispose()
+    monkeypatch.setattr(settings, "SQLALCHEMY_DATABASE_URI", url)
+    monkeypatch.setattr(settings, "SQLALCHEMY_REPLICA_URIS", [])
+    monkeypatch.setattr(settings, "DB_ASYNC", False)
+    monkeypatch.setattr(settings, "CATALOG_CACHE_WARMUP", False)
+    monkeypatch.setattr(settings, "SECRET_KEY", "test-secret-key")
+    monkeypatch.setattr(security, "_secret_key", None)
+    _reset_engines(monkeypatch)
+    for cache in (catalog_cache, principal_cache, token_cache):
+        cache.clear()
+    yield url
+    _dispose_engines()
+
+# Application de test ; `login(principal)` choisit l'utilisateur authentifié des requêtes suivantes
+@pytest.fixture
+def app(database_url) -> FastAPI:
+    from app.main import create_app
+
+    return create_app()
+
+@pytest.fixture
+def login(app) -> Callable[[deps.Principal], None]:
+    # Seul le décodage du token est remplacé (routes sync et async) : les contrôles
+    # actif / administrateur s'appliquent
+    def login(principal: deps.Principal) -> None:
+        app.dependency_overrides[deps.get_current_user] = lambda: principal
+        app.dependency_overrides[deps.get_current_user_async] = lambda: principal
+    return login
+
+@pytest.fixture
+def client(app) -> Iterator[TestClient]:
+    with TestClient(app) as client:
+        yield client
+
+# Clients supplémentaires (cookies séparés) sur la même application
+@pytest.fixture
+def make_client(app) -> Iterator[Callable[[], TestClient]]:
+    clients: List[TestClient] = []
+
+    def make_client() -> TestClient:
+        client = TestClient(app)
+        clients.append(client)
+        return client
+    yield make_client
+    for client in clients:
+        client.close()
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.concurrency import run_blocking
+from app.core.config import async_database_uri, settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from tests.conftest import ADMIN, BUYER
+
+PRODUCTS_URL = "/api/v1/products/"
+
+# Application en mode DB_ASYNC sur la même base SQLite (pilote aiosqlite)
+@pytest.fixture(autouse=True)
+def async_mode(database_url, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "DB_ASYNC", True)
+    monkeypatch.setattr(settings, "SQLALCHEMY_ASYNC_DATABASE_URI", async_database_uri(database_url))
+
+def test_async_uri_follows_sync_uri():
+    assert async_database_uri("mysql+pymysql://u:p@db/shop") == "mysql+aiomysql://u:p@db/shop"
+    assert async_database_uri("sqlite:///shop.db") == "sqlite+aiosqlite:///shop.db"
+
+def test_blocking_work_runs_off_event_loop(database_url):
+    async def main():
+        engine = create_async_engine(async_database_uri(database_url))
+        try:
+            async with engine.connect() as connection:
+                return threading.get_ident(), await connection.run_sync(
+                    lambda _: run_blocking(threading.get_ident)
+                )
+        finally:
+            await engine.dispose()
+
+    loop_thread, worker_thread = asyncio.run(main())
+    assert worker_thread != loop_thread
+
+def test_async_catalog_and_order(client, login):
+    response = client.get(PRODUCTS_URL, params={"limit": 5})
+    assert response.status_code == 200, response.text
+    assert [product["id"] for product in response.json()] == [1, 2, 3, 4, 5]
+    assert client.get("/api/v1/products/facets").json()["total"] == 20
+
+    login(BUYER)
+    response = client.post("/api/v1/orders/", json={"items": [{"product_id": 1, "quantity": 1}]})
+    assert response.status_code == 201, response.text
+    assert response.json()["items"][0]["product_id"] == 1
+
+    # En-tête posé par la route partagée sur la réponse injectée
+    login(ADMIN)
+    response = client.get("/api/v1/users/", params={"limit": 2})
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 2 and NEXT_CURSOR_HEADER in response.headers
+
+def test_async_export_and_import(client, login):
+    login(ADMIN)
+
+    response = client.get("/api/v1/products/export")
+    assert response.status_code == 200, response.text
+    lines = response.text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == list(range(1, 21))
+
+    content = "name,price,stock,category_ids\nLampe async,12.50,3,1\n".encode("utf-8")
+    response = client.post(
+        f"{PRODUCTS_URL}import", files={"file": ("products.csv", content, "text/csv")}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["created"] == 1
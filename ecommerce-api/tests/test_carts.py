@@ -0,0 +1,60 @@
+import threading
+
+from fastapi import HTTPException
+
+from app import models
+from app.core.carts import held_quantities
+from app.database import SessionLocal
+from app.routers.carts import _set_item
+from tests.conftest import BUYER
+
+CART_URL = "/api/v1/cart/items"
+
+def _set_stock(product_id, stock):
+    with SessionLocal() as db:
+        db.query(models.Product).filter(models.Product.id == product_id).update({"stock": stock})
+        db.commit()
+
+def _held(product_id):
+    with SessionLocal() as db:
+        return held_quantities(db, [product_id]).get(product_id, 0)
+
+def test_concurrent_adds_never_hold_more_than_stock(database_url):
+    _set_stock(1, 2)
+    users = range(10, 18)
+    barrier = threading.Barrier(len(users))
+    results = {}
+
+    def add(user_id):
+        with SessionLocal() as db:
+            barrier.wait()
+            try:
+                _set_item(db, user_id, 1, 1, add=True)
+                results[user_id] = 200
+            except HTTPException as error:
+                results[user_id] = error.status_code
+
+    threads = [threading.Thread(target=add, args=(user_id,)) for user_id in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results.values()) == [200, 200] + [409] * (len(users) - 2)
+    assert _held(1) == 2
+
+def test_cart_hold_limits_and_release(client, login):
+    _set_stock(1, 3)
+    login(BUYER)
+
+    assert client.post(CART_URL, json={"product_id": 1, "quantity": 2}).status_code == 200
+    response = client.post(CART_URL, json={"product_id": 1, "quantity": 2})
+    assert response.status_code == 409, response.text
+    assert client.put(f"{CART_URL}/1", json={"quantity": 3}).status_code == 200
+    assert _held(1) == 3
+    # Diminution acceptée même si le stock a baissé entre-temps
+    _set_stock(1, 0)
+    assert client.put(f"{CART_URL}/1", json={"quantity": 1}).status_code == 200
+    assert _held(1) == 1
+    assert client.delete(f"{CART_URL}/1").status_code == 200
+    assert _held(1) == 0
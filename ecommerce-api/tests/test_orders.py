@@ -0,0 +1,46 @@
+from app import models
+from app.database import SessionLocal
+from tests.conftest import ADMIN, BUYER, OTHER_BUYER
+
+ORDERS_URL = "/api/v1/orders/"
+
+def _stocks(product_id):
+    with SessionLocal() as db:
+        return (
+            db.query(models.Product.stock).filter(models.Product.id == product_id).scalar(),
+            db.query(models.ProductListing.stock)
+            .filter(models.ProductListing.product_id == product_id)
+            .scalar(),
+        )
+
+def test_order_updates_listing_stock_and_sales(client, login):
+    stock, listed = _stocks(1)
+    assert stock == listed and stock >= 3
+
+    login(BUYER)
+    first = client.post(ORDERS_URL, json={"items": [{"product_id": 1, "quantity": 2}]})
+    login(OTHER_BUYER)
+    second = client.post(ORDERS_URL, json={"items": [{"product_id": 1, "quantity": 1}]})
+
+    assert (first.status_code, second.status_code) == (201, 201), second.text
+    assert _stocks(1) == (stock - 3, stock - 3)
+    # Fiche produit servie par la projection : le stock ajouté au corps est à jour
+    assert client.get("/api/v1/products/1").json()["stock"] == stock - 3
+
+    # Les deux commandes tombent dans des parts différentes des agrégats : la lecture les somme
+    login(ADMIN)
+    sales = client.get("/api/v1/analytics/products/1").json()
+    assert [row["units"] for row in sales] == [3]
+    # Jour des ventes tiré de la date fixée par la base (celle renvoyée avec la commande)
+    assert sales[0]["day"] == first.json()["created_at"][:10]
+
+def test_order_beyond_stock_leaves_listing_untouched(client, login):
+    stock, _ = _stocks(2)
+    login(BUYER)
+
+    response = client.post(ORDERS_URL, json={"items": [{"product_id": 2, "quantity": stock + 1}]})
+
+    assert response.status_code == 409, response.text
+    assert _stocks(2) == (stock, stock)
+    with SessionLocal() as db:
+        assert db.query(models.Order).count() == 0
@@ -0,0 +1,113 @@
+import io
+import json
+
+from app import models
+from app.core.product_import import iter_csv, iter_ndjson
+from app.database import SessionLocal
+from tests.conftest import ADMIN
+
+IMPORT_URL = "/api/v1/products/import"
+
+class ReadOnlyStream:
+    """Flux réduit à read(), comme le SpooledTemporaryFile d'UploadFile avant Python 3.11."""
+
+    def __init__(self, content: bytes):
+        self._buffer = io.BytesIO(content)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._buffer.read(size)
+
+def _imported(names):
+    with SessionLocal() as db:
+        products = db.query(models.Product).filter(models.Product.name.in_(names)).all()
+        return {
+            product.name: (product.description, product.stock, sorted(c.id for c in product.categories))
+            for product in products
+        }
+
+def test_import_csv_upload(client, login):
+    login(ADMIN)
+    content = (
+        "name,description,price,stock,category_ids\r\n"
+        "Lampe importée,,12.50,3,1;2\r\n"
+        '"Table, chêne","ligne 1\nligne 2",99,1,\r\n'
+        "Prix invalide,,abc,1,\r\n"
+        "Catégorie inconnue,,10,1,999\r\n"
+    ).encode("utf-8-sig")
+
+    response = client.post(IMPORT_URL, files={"file": ("products.csv", content, "text/csv")})
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["created"], result["failed"]) == (2, 2)
+    # Numéros de ligne du fichier (la description sur deux lignes décale les suivantes)
+    assert [error["line"] for error in result["errors"]] == [5, 6]
+    assert _imported(["Lampe importée", "Table, chêne"]) == {
+        "Lampe importée": (None, 3, [1, 2]),
+        "Table, chêne": ("ligne 1\nligne 2", 1, []),
+    }
+
+def test_import_ndjson_upload(client, login):
+    login(ADMIN)
+    lines = [
+        json.dumps({"name": "Chaise importée", "price": 45, "stock": 7, "category_ids": [3]}),
+        "",
+        "{pas du json",
+        json.dumps({"name": "Tabouret importé", "price": 20}, ensure_ascii=False),
+        json.dumps(["pas", "un", "objet"]),
+    ]
+    content = "\r\n".join(lines).encode("utf-8")
+
+    response = client.post(IMPORT_URL, files={"file": ("products.ndjson", content, "application/x-ndjson")})
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["created"], result["failed"]) == (2, 2)
+    assert [error["line"] for error in result["errors"]] == [3, 5]
+    assert _imported(["Chaise importée", "Tabouret importé"]) == {
+        "Chaise importée": (None, 7, [3]),
+        "Tabouret importé": (None, 0, []),
+    }
+
+def test_import_rejects_invalid_utf8(client, login):
+    login(ADMIN)
+    content = "name,price\nValide,10\n".encode("utf-8") + b"Mal \xff encod\xe9,10\n"
+
+    response = client.post(IMPORT_URL, files={"file": ("products.csv", content, "text/csv")})
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["failed"] == 1
+    assert result["errors"][0]["errors"][0].startswith("Fichier illisible")
+
+def test_readers_need_only_read():
+    csv_rows = list(iter_csv(ReadOnlyStream("\ufeffname,price\nA,1\nB,2".encode("utf-8"))))
+    ndjson_rows = list(iter_ndjson(ReadOnlyStream(b'{"name": "A"}\n\n{"name": "B"}')))
+
+    assert csv_rows == [(2, {"name": "A", "price": "1"}), (3, {"name": "B", "price": "2"})]
+    assert ndjson_rows == [(1, {"name": "A"}), (3, {"name": "B"})]
+
+# Chemin MySQL (pas de RETURNING) : une ligne par INSERT, IDs lus un à un
+def test_import_without_returning_links_categories(client, login, monkeypatch):
+    from app.database import get_engine
+
+    monkeypatch.setattr(get_engine().dialect, "insert_executemany_returning", False)
+    login(ADMIN)
+    content = "".join(
+        json.dumps({"name": f"Sans RETURNING {i}", "price": 10, "category_ids": [i % 3 + 1]}) + "\n"
+        for i in range(5)
+    ).encode("utf-8")
+
+    response = client.post(IMPORT_URL, files={"file": ("products.ndjson", content, "application/x-ndjson")})
+
+    assert response.json()["created"] == 5
+    assert _imported([f"Sans RETURNING {i}" for i in range(5)]) == {
+        f"Sans RETURNING {i}": (None, 0, [i % 3 + 1]) for i in range(5)
+    }
+    # Un seul INSERT pour le lot (executemany), IDs relus par les clés d'import
+    with SessionLocal() as db:
+        keys = [
+            key for (key,) in db.query(models.Product.import_key)
+            .filter(models.Product.name.like("Sans RETURNING %"))
+        ]
+    assert len({key.split(":")[0] for key in keys}) == 1
@@ -0,0 +1,35 @@
+from app import models
+from app.database import SessionLocal
+
+def _set_prices(prices):
+    with SessionLocal() as db:
+        for product_id, price in prices.items():
+            db.query(models.Product).filter(models.Product.id == product_id).update({"price": price})
+        db.query(models.Product).filter(models.Product.id.notin_(list(prices))).delete(
+            synchronize_session=False
+        )
+        db.commit()
+
+def test_facet_price_buckets_round_down(client):
+    # 9.99 / 10 s'arrondit à 1 : la tranche doit rester [0, 10)
+    _set_prices({1: 0.5, 2: 9.99, 3: 10, 4: 19.99, 5: 25})
+
+    response = client.get("/api/v1/products/facets", params={"price_bucket": 10})
+
+    assert response.status_code == 200, response.text
+    buckets = [(float(b["min"]), float(b["max"]), b["count"]) for b in response.json()["price_buckets"]]
+    assert buckets == [(0, 10, 2), (10, 20, 2), (20, 30, 1)]
+
+def test_search_matches_word_prefixes(client):
+    with SessionLocal() as db:
+        db.query(models.Product).filter(models.Product.id == 1).update(
+            {"name": "Chaise pliante", "description": "Hêtre massif"}
+        )
+        db.commit()
+
+    # Mots partiels, comme sur MySQL en mode booléen (+mot*) : tous requis
+    response = client.get("/api/v1/products/", params={"search": "chai pli"})
+    assert response.status_code == 200, response.text
+    assert [product["id"] for product in response.json()] == [1]
+    response = client.get("/api/v1/products/", params={"search": "chai introuvable"})
+    assert response.json() == []
@@ -0,0 +1,73 @@
+import shutil
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import models
+from app.core.config import settings
+from app.core.consistency import READ_PRIMARY_COOKIE
+from app.core.security import get_password_hash
+from app.database import SessionLocal
+from tests.conftest import ADMIN
+
+PRODUCT_URL = "/api/v1/products/1"
+
+# Réplica jamais synchronisé : copie du primaire où le produit 1 porte un autre nom,
+# pour savoir quelle base a servi une lecture
+@pytest.fixture(autouse=True)
+def replica_url(database_url, tmp_path, monkeypatch) -> str:
+    replica = tmp_path / "replica.db"
+    shutil.copy(database_url[len("sqlite:///"):], replica)
+    url = f"sqlite:///{replica}"
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "UPDATE product_listings SET payload = json_set(payload, '$.name', 'Sur le réplica') "
+            "WHERE product_id = 1"
+        ))
+    engine.dispose()
+    monkeypatch.setattr(settings, "SQLALCHEMY_REPLICA_URIS", [url])
+    return url
+
+def _name(client) -> str:
+    response = client.get(PRODUCT_URL)
+    assert response.status_code == 200, response.text
+    return response.json()["name"]
+
+def test_reads_go_to_replica(client):
+    assert _name(client) == "Sur le réplica"
+    assert READ_PRIMARY_COOKIE not in client.cookies
+
+def test_writer_reads_own_write(client, make_client, login):
+    reader = make_client()
+    login(ADMIN)
+
+    response = client.put(PRODUCT_URL, json={"name": "Renommé"})
+
+    assert response.status_code == 200, response.text
+    assert READ_PRIMARY_COOKIE in client.cookies
+    # Un autre client relit le réplica (en retard) et remet sa valeur dans le cache...
+    assert _name(reader) == "Sur le réplica"
+    assert READ_PRIMARY_COOKIE not in reader.cookies
+    # ...que l'auteur de l'écriture ne voit pas : il lit le primaire
+    assert _name(client) == "Renommé"
+
+def test_forged_cookie_is_ignored(client):
+    # Instant non signé (ou mal signé) : les lectures restent sur le réplica
+    client.cookies.set(READ_PRIMARY_COOKIE, f"{time.time() + 60:.3f}")
+    assert _name(client) == "Sur le réplica"
+    client.cookies.set(READ_PRIMARY_COOKIE, f"{time.time() + 60:.3f}.{'0' * 64}")
+    assert _name(client) == "Sur le réplica"
+
+def test_login_sets_no_cookie(client):
+    with SessionLocal() as db:
+        user = db.query(models.User).first()
+        user.hashed_password = get_password_hash("secret")
+        username = user.username
+        db.commit()
+
+    response = client.post("/api/v1/auth/login", data={"username": username, "password": "secret"})
+
+    assert response.status_code == 200, response.text
+    assert READ_PRIMARY_COOKIE not in client.cookies
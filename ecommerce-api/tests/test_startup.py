@@ -0,0 +1,22 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import security
+from app.core.config import settings
+
+def test_startup_fails_without_secret_key(app, monkeypatch):
+    monkeypatch.setattr(settings, "SECRET_KEY", None)
+    monkeypatch.setattr(settings, "SECRET_KEY_FILE", None)
+
+    with pytest.raises(security.MissingSecretKeyError, match="SECRET_KEY"):
+        with TestClient(app):
+            pass
+
+def test_secret_key_read_from_mounted_file(app, tmp_path, monkeypatch):
+    key_file = tmp_path / "secret_key"
+    key_file.write_text("cle-partagee\n")
+    monkeypatch.setattr(settings, "SECRET_KEY", None)
+    monkeypatch.setattr(settings, "SECRET_KEY_FILE", str(key_file))
+
+    with TestClient(app):
+        assert security.get_secret_key() == "cle-partagee"